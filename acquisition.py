@@ -0,0 +1,91 @@
+"""
+Standalone acquisition daemon.
+
+Owns the instrument connection, records every run to disk and publishes the
+live stream in a shared-memory ring. GUIs attach to it read-only with
+``python main.py --attach <name>``, and acquisition keeps going when they close.
+
+    python acquisition.py --host 127.0.0.1 --port 65432 --name tts_station
+    python acquisition.py --port 6340 --labview array --labview-rate 1000 --hours 1
+"""
+import argparse
+import signal
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from utils.ingest import IngestEngine, Station
+from utils.labview import LAYOUTS, LabVIEWParser
+from utils.ring_buffer import MAX_CAPACITY, ring_capacity
+from utils.sample_store import SampleStore
+from utils.shm_ring import SharedRingBuffer
+from utils.telemetry_bus import TelemetryBus
+
+CHANNELS = ("pressure", "temperature")
+RUNS_DIR = Path(__file__).resolve().parent / "runs"
+
+
+class AcquisitionDaemon:
+    def __init__(self, name, host, port, hours, rate_hz, labview_layout=None, labview_rate_hz=None):
+        self.stopped = threading.Event()
+
+        run_dir = RUNS_DIR / datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.store = SampleStore(run_dir, channels=CHANNELS)
+        self.ring = SharedRingBuffer.create(
+            name, CHANNELS, capacity=ring_capacity(hours, rate_hz),
+            metadata={"store": str(run_dir), "host": host, "port": port},
+        )
+
+        # Same ingest engine as the GUI, writing into the shared ring instead
+        self.engine = IngestEngine(TelemetryBus())
+        parser = LabVIEWParser(len(CHANNELS), labview_layout, labview_rate_hz) if labview_layout else None
+        self.engine.add_station(Station(name, host, port, self.ring, self.store, parser=parser))
+        print(f"[Daemon] ✅ Ring '{name}' ready, recording to {run_dir}")
+
+    def run(self):
+        self.engine.start()
+        try:
+            # Short waits keep the main thread responsive to signals
+            while not self.stopped.wait(0.5):
+                pass
+        finally:
+            # Unlinking only removes the name; the mapping stays valid for a
+            # writer that is still running, unlike close()
+            self.ring.unlink()
+            if self.engine.stop():
+                self.store.close()
+                self.ring.close()
+                print("[Daemon] ⏹️ Stopped")
+            else:
+                print("[Daemon] ⚠️ Ingest did not stop; exiting without closing the store or ring")
+
+    def stop(self, *args):
+        self.stopped.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Target Testing Station acquisition daemon")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=65432)
+    parser.add_argument("--name", default="tts_station", help="shared memory name GUIs attach to")
+    parser.add_argument("--hours", type=float, default=12,
+                        help=f"hours of history kept in the ring, up to {MAX_CAPACITY:,} samples "
+                             "(the run's store keeps everything)")
+    parser.add_argument("--rate", type=float,
+                        help="fastest expected sample rate (Hz) the ring is sized for; "
+                             "defaults to --labview-rate, or 10")
+    parser.add_argument("--labview", choices=LAYOUTS, metavar="LAYOUT",
+                        help=f"read the LabVIEW VI's flattened blocks ({' or '.join(LAYOUTS)}) instead of negotiating")
+    parser.add_argument("--labview-rate", type=float, metavar="HZ",
+                        help="samples per second per channel, to time \"array\" blocks (which carry no timing)")
+    args = parser.parse_args()
+
+    rate_hz = args.rate or args.labview_rate or 10
+    daemon = AcquisitionDaemon(args.name, args.host, args.port, args.hours, rate_hz, args.labview, args.labview_rate)
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
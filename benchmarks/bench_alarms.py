@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: the alarm engine on a simulator-like noisy stream.
+
+The stream is test_server.py's waveform (exponential decay, a 5 psi
+sinusoid, 1.5 psi noise, clamped to 0-145 psi) on a time axis in seconds,
+so the physical signal is the same at every sample rate. On top of it:
+
+    30.0-31.0 s   pressure pinned at the 145 psi clamp (Over Pressure,
+                  and Pressure Rate on the steps into and out of it)
+    60.0-60.5 s   a 40 psi drop (Pressure Rate)
+    80.0-90.0 s   temperature at 45 °C (Over Temperature)
+    100.0 s       a link gap marker
+
+At 1 Hz the pin is a single reading, which debounce ignores by design, and
+the rate is taken between consecutive readings (the engine says so once).
+
+It prints the transitions for each rate and checks that every batch
+split gives the same ones, then the cost of evaluating one batch, which
+is what a batch adds to its arrival-to-alarm latency.
+
+Run from the repo root:
+    python -m benchmarks.bench_alarms
+"""
+import time
+
+import numpy as np
+
+from utils.alarms import AlarmEngine
+
+SECONDS = 120
+RATES_HZ = (1, 10, 500, 1000)
+SPLITS = (1, 7, 100, 1000)
+CHANNELS = ("pressure", "temperature")
+
+
+def make_stream(rate_hz, seed=0):
+    rng = np.random.default_rng(seed)
+    n = SECONDS * rate_hz
+    seconds = np.arange(n) / rate_hz
+    pressure = 100 * np.exp(-0.03 * seconds) + 5 * np.sin(seconds / 2) + rng.normal(0, 1.5, n) + 40
+    pressure[(seconds >= 30) & (seconds < 31)] = 145
+    drop = (seconds >= 60) & (seconds < 60.5)
+    pressure[drop] -= 80 * (seconds[drop] - 60)
+    pressure[seconds >= 60.5] -= 40
+    pressure = np.clip(pressure, 0, 145)
+    temperature = 25 + np.sin(seconds / 8) + rng.normal(0, 0.5, n)
+    temperature[(seconds >= 80) & (seconds < 90)] = 45 + rng.normal(0, 0.5, np.count_nonzero((seconds >= 80) & (seconds < 90)))
+    values = np.column_stack((pressure, temperature))
+    values[np.searchsorted(seconds, 100.0)] = np.nan
+    return (seconds * 1e9).astype(np.int64), values
+
+
+def replay(times, values, split):
+    engine = AlarmEngine(CHANNELS)
+    transitions = []
+    costs = []
+    for i in range(0, len(times), split):
+        start = time.perf_counter()
+        transitions += engine.evaluate(times[i:i + split], values[i:i + split])
+        costs.append(time.perf_counter() - start)
+    return transitions, np.array(costs)
+
+
+def main():
+    for rate_hz in RATES_HZ:
+        times, values = make_stream(rate_hz)
+        reference, _ = replay(times, values, len(times))
+        print(f"{rate_hz} Hz, {len(times):,} samples:")
+        for transition in reference:
+            print(f"    {transition.t / 1e9:8.3f} s  {transition.name:<18} {transition.value}")
+        for split in SPLITS:
+            if split >= len(times):
+                continue
+            transitions, costs = replay(times, values, split)
+            same = "same transitions" if transitions == reference else "DIFFERENT transitions"
+            print(f"    {split:>5}-row batches: {same}, per batch mean {costs.mean() * 1e3:.3f} ms, "
+                  f"p95 {np.percentile(costs, 95) * 1e3:.3f} ms, max {costs.max() * 1e3:.3f} ms, "
+                  f"{len(times) / costs.sum():>12,.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: legacy one-line-per-recv parsing vs. the stream framer,
+and the text framer vs. batch decoding of the binary protocol.
+
+Run from the repo root:
+    python -m benchmarks.bench_framing
+"""
+import random
+import time
+
+from utils.framing import TelemetryParser
+from utils.protocol import BinaryFrameParser, encode_frames
+
+N_LINES = 200_000
+
+
+def make_stream(n_lines):
+    rng = random.Random(0)
+    lines = [
+        f"pressure={rng.uniform(0, 145):.2f},temperature={rng.uniform(20, 30):.2f}\n"
+        for _ in range(n_lines)
+    ]
+    return "".join(lines).encode()
+
+
+def split_like_tcp(stream, min_size=1, max_size=1024):
+    """Cuts the stream at random offsets, the way coalesced/split segments arrive."""
+    rng = random.Random(1)
+    chunks = []
+    i = 0
+    while i < len(stream):
+        size = rng.randint(min_size, max_size)
+        chunks.append(stream[i:i + size])
+        i += size
+    return chunks
+
+
+def legacy_parse(data):
+    # Verbatim copy of the old listen_to_socket body
+    decoded = data.decode().strip()
+    parts = decoded.split(',')
+    pressure = float(parts[0].split('=')[1])
+    temperature = float(parts[1].split('=')[1])
+    return pressure, temperature
+
+
+def bench_legacy_best_case(stream):
+    # The old path only works when every recv is exactly one line, so give it that
+    lines = stream.splitlines(keepends=True)
+    start = time.perf_counter()
+    for line in lines:
+        legacy_parse(line)
+    return len(lines), time.perf_counter() - start
+
+
+def bench_legacy_real_chunks(chunks):
+    ok = errors = 0
+    for chunk in chunks:
+        try:
+            legacy_parse(chunk)
+            ok += 1
+        except Exception:
+            errors += 1
+    return ok, errors
+
+
+def bench_framer(chunks):
+    parser = TelemetryParser()
+    count = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        count += len(parser.feed(chunk))
+    return count, parser.malformed, time.perf_counter() - start
+
+
+def make_binary_stream(n_frames, value_size):
+    rng = random.Random(0)
+    values = [(rng.uniform(0, 145), rng.uniform(20, 30)) for _ in range(n_frames)]
+    return encode_frames(0, [i * 0.001 for i in range(n_frames)], values, value_size)
+
+
+def bench_binary(chunks, value_size):
+    parser = BinaryFrameParser(2, value_size)
+    count = 0
+    start = time.perf_counter()
+    for chunk in chunks:
+        count += len(parser.feed(chunk))
+    return count, parser.lost, time.perf_counter() - start
+
+
+def main():
+    stream = make_stream(N_LINES)
+    chunks = split_like_tcp(stream)
+
+    n, elapsed = bench_legacy_best_case(stream)
+    print(f"legacy (one line per recv):   {n / elapsed:>12,.0f} lines/s")
+
+    ok, errors = bench_legacy_real_chunks(chunks)
+    print(f"legacy (real TCP chunks):     {ok:,} chunks parsed, {errors:,} crashed, "
+          f"{N_LINES - ok:,} of {N_LINES:,} samples lost")
+
+    n, malformed, elapsed = bench_framer(chunks)
+    print(f"framer (real TCP chunks):     {n / elapsed:>12,.0f} lines/s "
+          f"({n:,} samples, {malformed} malformed)")
+
+    for value_size in (4, 8):
+        binary_chunks = split_like_tcp(make_binary_stream(N_LINES, value_size))
+        n, lost, elapsed = bench_binary(binary_chunks, value_size)
+        print(f"binary float{value_size * 8} (real TCP chunks): {n / elapsed:>12,.0f} frames/s "
+              f"({n:,} samples, {lost} lost)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: Tk calls and widget churn per gauge update.
+
+Counts every call the SystemMetrics and TargetChamber gauges make into the Tcl
+interpreter for a changed value and for an unchanged one. Needs a display.
+
+Run from the repo root:
+    python -m benchmarks.bench_gauges
+"""
+import time
+import tkinter as tk
+
+from pages.dashboard import SystemMetrics
+from pages.live_data import TargetChamber
+
+N_UPDATES = 500
+
+
+class CountingTk:
+    """Wraps the Tcl interpreter so every call made through it is counted."""
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tkapp.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tkapp, name)
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def measure(name, widget, update, values):
+    counter = widget.tk
+    widgets_before = count_widgets(widget)
+
+    counter.calls = 0
+    start = time.perf_counter()
+    for value in values:
+        update(value)
+    elapsed = time.perf_counter() - start
+    calls_changed = counter.calls / len(values)
+
+    counter.calls = 0
+    for _ in values:
+        update(values[-1])
+    calls_unchanged = counter.calls / len(values)
+
+    churn = count_widgets(widget) - widgets_before
+    print(f"{name:<16} {calls_changed:6.1f} Tk calls/update (changing), "
+          f"{calls_unchanged:4.1f} (unchanged), "
+          f"{elapsed / len(values) * 1e6:7.1f} µs/update, widget churn {churn}")
+
+
+def main():
+    root = tk.Tk()
+    root.tk = CountingTk(root.tk)
+    container = tk.Frame(root, width=1440, height=900)
+    container.pack()
+
+    metrics = SystemMetrics(container)
+    chamber = TargetChamber(container)
+    root.update()
+
+    values = [20 + (i % 100) for i in range(N_UPDATES)]
+    measure("SystemMetrics", metrics, lambda v: metrics.embed_metrics_frame_dynamic(v / 4, v, v * 1e-7), values)
+    measure("TargetChamber", chamber, lambda v: chamber.embed_vertical_metrics(v / 4, v), values)
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Scaling check for the ingest engine: threads, memory and throughput with
+1 to 32 stations, each fed by its own local TCP server.
+
+Memory per station is the touched part of its ring buffer (with transparent
+huge pages, a few 2 MB pages until it fills); the thread count should not move.
+
+Run from the repo root:
+    python -m benchmarks.bench_ingest
+"""
+import asyncio
+import resource
+import threading
+import time
+
+from utils.ingest import IngestEngine, Station
+from utils.ring_buffer import RingBuffer
+from utils.telemetry_bus import TelemetryBus
+
+STATION_COUNTS = (1, 4, 16, 32)
+RATE_HZ = 100
+DURATION = 3.0
+CAPACITY = 12 * 3600 * 10
+
+
+async def serve(port_ready):
+    async def handle(reader, writer):
+        i = 0
+        try:
+            while True:
+                writer.write(f"pressure={100 - i * 0.001:.3f},temperature=25.00\n".encode())
+                await writer.drain()
+                i += 1
+                await asyncio.sleep(1 / RATE_HZ)
+        except (ConnectionError, asyncio.CancelledError):
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port_ready(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def start_servers(n):
+    ports = []
+    ready = threading.Event()
+
+    def port_ready(port):
+        ports.append(port)
+        if len(ports) == n:
+            ready.set()
+
+    loop = asyncio.new_event_loop()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        for _ in range(n):
+            loop.create_task(serve(port_ready))
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return ports
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    for n in STATION_COUNTS:
+        ports = start_servers(n)
+        threads_before = threading.active_count()
+        rss_before = max_rss_mb()
+
+        engine = IngestEngine(TelemetryBus())
+        stations = [
+            engine.add_station(Station(f"Station {i + 1}", "127.0.0.1", port, RingBuffer(("pressure", "temperature"), CAPACITY)))
+            for i, port in enumerate(ports)
+        ]
+        engine.start()
+        # Count from once every station is connected, over a measured interval
+        while any(s.connects == 0 for s in stations):
+            time.sleep(0.01)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        received_start = sum(s.samples.count for s in stations)
+        time.sleep(DURATION)
+        received = sum(s.samples.count for s in stations) - received_start
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        threads = threading.active_count() - threads_before
+        engine.stop()
+
+        print(
+            f"{n:>3} stations: {received / elapsed:8.0f} samples/s "
+            f"(max {n * RATE_HZ}), "
+            f"+{threads} thread(s), "
+            f"+{max_rss_mb() - rss_before:5.1f} MB peak RSS, "
+            f"{cpu / elapsed * 100:5.1f}% CPU (incl. test servers)"
+        )
+
+
+if __name__ == "__main__":
+    main()
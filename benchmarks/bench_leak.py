@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: temperature-compensated leak fit, bulk and streaming, and
+how it holds up against a warming chamber and outliers compared with the
+plain least-squares slope.
+
+Run from the repo root:
+    python -m benchmarks.bench_leak
+"""
+import time
+
+import numpy as np
+
+from utils.leak import StreamingLeak, compensate, leak_fit
+from utils.trend import fit_line
+
+RATE_HZ = 1000
+SECONDS = 600
+RUNS = 64
+TRUE_SLOPE = -0.002  # Pa/s of compensated pressure
+
+
+def make_run(rng, n):
+    """A slow leak in a chamber warming 2 °C over the run, with noise and spikes."""
+    t = np.arange(n) / RATE_HZ
+    temperature = 22.0 + 2.0 * t / t[-1]
+    pressure = (101_325.0 + TRUE_SLOPE * t) / compensate(1.0, temperature)
+    pressure += rng.normal(0, 0.05, n)
+    spikes = rng.choice(n, n // 1000, replace=False)
+    pressure[spikes] += rng.normal(0, 50, len(spikes))
+    return t, pressure, temperature
+
+
+def bench_bulk(t, pressure, temperature):
+    start = time.perf_counter()
+    fit = leak_fit(t, pressure, temperature)
+    return fit, time.perf_counter() - start
+
+
+def bench_streaming(t, pressure, temperature, window, chunk):
+    leak = StreamingLeak(window, blocks=12)
+    values = compensate(pressure, temperature)
+    gaps = np.zeros(chunk, dtype=bool)
+    start = time.perf_counter()
+    for i in range(0, len(t), chunk):
+        leak.extend(t[i:i + chunk], values[i:i + chunk], gaps[:len(t[i:i + chunk])])
+    return leak.fit, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    n = RATE_HZ * SECONDS
+    t, pressure, temperature = make_run(rng, n)
+
+    slope, _ = fit_line(t, pressure)
+    print(f"least squares, raw pressure:   slope {slope:+.5f} Pa/s (true {TRUE_SLOPE:+.5f})")
+    fit, elapsed = bench_bulk(t, pressure, temperature)
+    print(f"leak_fit, one run:             slope {fit.slope:+.5f} Pa/s, {n / elapsed:>14,.0f} samples/s")
+
+    runs = np.stack([make_run(rng, n)[1] for _ in range(RUNS)])
+    fit, elapsed = bench_bulk(t, runs, temperature)
+    error = np.abs(fit.slope - TRUE_SLOPE).max()
+    print(f"leak_fit, {RUNS} runs at once:      max error {error:.1e} Pa/s, {runs.size / elapsed:>14,.0f} samples/s")
+
+    for chunk in (16, 1024):
+        fit, elapsed = bench_streaming(t, pressure, temperature, RATE_HZ * 60, chunk)
+        print(f"StreamingLeak, {chunk:>4}-row batches: slope {fit.slope:+.5f} Pa/s, {n / elapsed:>14,.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
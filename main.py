@@ -1,19 +1,68 @@
 import tkinter as tk
-from pages.dashboard import DashboardPage
+from pages.dashboard import DashboardPage, PLOT_WINDOW
 from pages.login import LoginPage
-from pages.live_data import LiveDataPage
+from pages.live_data import LiveDataPage, LIVE_PLOT_WINDOW
 from pages.run_test import RunTestPage 
 from pages.pdd_test import PDDTestPage
 from pages.gas_test import GasTestPage
 from pages.reports import ReportsPage
+from utils.alignment import AlignedView
+from utils.decay import StreamingDecay
+from utils.events import TEST
+from utils.ingest import IngestEngine, Station, ALL_STATIONS, LINK_UP
+from utils.labview import LabVIEWParser
+from utils.leak import StreamingLeak
+from utils.ring_buffer import RingBuffer, ring_capacity
+from utils.sample_store import SampleStore
+from utils.shm_ring import SharedRingBuffer
+from utils.trend import StreamingTrend
+from utils.telemetry_bus import TelemetryBus, TkBridge, SampleBatch
+from utils.timebase import NS_PER_S, now_ns
 from collections import deque
+from datetime import datetime
+from pathlib import Path
 
+import argparse
+import re
 import sys
 import threading
-import socket
+import time
+
+import numpy as np
+
+# Median blocks in the live leak fit; PLOT_WINDOW / LEAK_BLOCKS samples each
+LEAK_BLOCKS = 12
+
+# Pressure whose crossing the Rate of Fall Test predicts
+RATE_OF_FALL_THRESHOLD = 20.0
+
+# Ring buffer sizing: hours of history at each station's sample rate, up to
+# ring_buffer.MAX_CAPACITY samples (the run's SampleStore keeps the rest)
+BUFFER_HOURS = 12
+MAX_SAMPLE_RATE_HZ = 10  # fastest expected rate of "auto" (negotiated) stations
+
+CHANNELS = ("pressure", "temperature")
+
+# (name, host, port, protocol) of each station the GUI connects to directly.
+# protocol "auto" negotiates binary/text; "labview" reads the VI's flattened waveform blocks.
+DEFAULT_STATIONS = [("Station 1", "127.0.0.1", 65432, "auto")]
+PROTOCOLS = ("auto", "labview")
+
+# How the LabVIEW VI flattens its DAQmx blocks (see utils/labview.py)
+LABVIEW_LAYOUT = "waveform"
+LABVIEW_RATE_HZ = 1000
+
+# Sample rate each protocol's ring is sized for
+PROTOCOL_RATES_HZ = {"auto": MAX_SAMPLE_RATE_HZ, "labview": LABVIEW_RATE_HZ}
+
+# Every run is recorded to its own directory under here
+RUNS_DIR = Path(__file__).resolve().parent / "runs"
+
+# How often a GUI attached to the acquisition daemon checks its ring for new samples
+FOLLOW_INTERVAL = 0.005
 
 class TargetTestingApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, attach=None, stations=DEFAULT_STATIONS):
         super().__init__()
         self.geometry("1440x900")
         self.title("Target Testing Station")
@@ -24,20 +73,141 @@ class TargetTestingApp(tk.Tk):
 
         self.username = "admin"
 
-        # ✅ Shared buffers
-        self.pressure_data = deque([], maxlen=60)
-        self.temperature_data = deque([], maxlen=60)
-        self.time_data = deque([], maxlen=60)
+        self.test_running = True
 
-        self.latest_pressure = 100.0
-        self.latest_temperature = 25.0
+        # ✅ Telemetry bus: the ingest thread publishes, pages subscribe
+        self.bus = TelemetryBus()
+        self.bridge = TkBridge(self, self.bus)
 
-        self.test_running = True
+        # ✅ Stations, each with its own ring buffer, recording and trends.
+        # Pages read the selected one; ALL_STATIONS lets the dashboard aggregate.
+        self.stations = {}
+
+        # With attach, acquisition.py owns the instrument and the recording;
+        # this GUI only reads its shared-memory ring and run directory
+        self.attached = attach is not None
+        if self.attached:
+            ring = SharedRingBuffer.attach(attach)
+            store = SampleStore(ring.metadata["store"], readonly=True)
+            station = self.add_station(Station(attach, ring.metadata.get("host"), ring.metadata.get("port"), ring, store, self.new_trends(), leak=self.new_leak(), decay=self.new_decay()))
+            # The daemon supervises the instrument link; its outages arrive as gap markers
+            station.link_state = LINK_UP
+            print(f"[Attach] ✅ Following acquisition ring '{attach}'")
+        else:
+            # ✅ One event-loop thread for every station connection
+            self.engine = IngestEngine(self.bus)
+            run_dir = RUNS_DIR / datetime.now().strftime("%Y%m%d-%H%M%S")
+            origin_ns = now_ns()  # one t = 0 for every station, so they line up when aggregated
+            for name, host, port, protocol in stations:
+                ring = RingBuffer(CHANNELS, capacity=ring_capacity(BUFFER_HOURS, PROTOCOL_RATES_HZ[protocol]))
+                store = SampleStore(run_dir / station_dir_name(name), channels=CHANNELS, origin_ns=origin_ns)
+                parser = LabVIEWParser(len(CHANNELS), LABVIEW_LAYOUT, LABVIEW_RATE_HZ) if protocol == "labview" else None
+                self.engine.add_station(self.add_station(Station(name, host, port, ring, store, self.new_trends(), parser, self.new_leak(), self.new_decay())))
+        self.selected_station = next(iter(self.stations))
+
+        # Commands submitted during one UI frame go out together
+        self.command_flush_job = None
+
+        # ✅ Page registry: each page is built once and raised on navigation
+        self.page_factories = {
+            "dashboard": lambda: DashboardPage(self.container, controller=self, username=self.username),
+            "live_data": lambda: LiveDataPage(self.container, controller=self, username=self.username),
+            "run_test": lambda: RunTestPage(self.container, controller=self, username=self.username),
+            "pdd_test": lambda: PDDTestPage(self.container, controller=self),
+            "gas_test": lambda: GasTestPage(self.container, controller=self, username=self.username),
+            "reports": lambda: ReportsPage(self.container, controller=self, username=self.username),
+        }
+        self.pages = {}
+        self.current_page = None
+        self.prebuild_job = None
+        self.nav_timings = deque(maxlen=100)  # (page, milliseconds, was_cached)
 
-        threading.Thread(target=self.listen_to_socket, daemon=True).start()
+        if self.attached:
+            threading.Thread(target=self.follow_shared_ring, daemon=True).start()
+        else:
+            self.engine.start()
         #self.show_login()
         self.show_dashboard("admin")
 
+    def new_trends(self):
+        # ✅ Streaming pressure trends, keyed by window length (None = whole run)
+        return {
+            PLOT_WINDOW: StreamingTrend(PLOT_WINDOW),
+            LIVE_PLOT_WINDOW: StreamingTrend(LIVE_PLOT_WINDOW),
+            None: StreamingTrend(),
+        }
+
+    def new_leak(self):
+        # ✅ Temperature-compensated leak rate over the dashboard window
+        return StreamingLeak(PLOT_WINDOW, blocks=LEAK_BLOCKS)
+
+    def new_decay(self):
+        # ✅ Exponential-decay fit, restarted by every test start
+        return StreamingDecay(RATE_OF_FALL_THRESHOLD)
+
+    def add_station(self, station):
+        self.stations[station.name] = station
+        return station
+
+    @property
+    def aggregate(self):
+        return self.selected_station == ALL_STATIONS
+
+    @property
+    def station(self):
+        # Pages without an aggregate view follow the first station
+        if self.aggregate:
+            return next(iter(self.stations.values()))
+        return self.stations[self.selected_station]
+
+    @property
+    def samples(self):
+        return self.station.samples
+
+    @property
+    def store(self):
+        return self.station.store
+
+    @property
+    def trends(self):
+        return self.station.trends
+
+    @property
+    def latest_pressure(self):
+        return self.station.latest_pressure
+
+    @property
+    def latest_temperature(self):
+        return self.station.latest_temperature
+
+    def select_station(self, name):
+        if name != ALL_STATIONS and name not in self.stations:
+            raise KeyError(f"Unknown station '{name}'")
+        self.selected_station = name
+        # Redraw the visible page from the newly selected buffers
+        if self.current_page is not None:
+            self.call_page_hook(self.current_page, "on_show")
+
+    def send_command(self, station, **fields):
+        """
+        Queues a command (e.g. valve="He", state="closed") for a station and
+        returns it; completion arrives on the bus "command" topic.
+        """
+        command = station.commands.submit(**fields)
+        if self.attached:
+            # The daemon owns the link; an attached GUI is read-only
+            self.bus.publish("command", station.commands.fail(station.commands.take_outbox(), "read-only GUI")[0])
+        elif self.command_flush_job is None:
+            self.command_flush_job = self.after(self.bridge.frame_ms, self.flush_commands)
+        return command
+
+    def flush_commands(self):
+        self.command_flush_job = None
+        for station in self.stations.values():
+            batch = station.commands.take_outbox()
+            if batch:
+                self.engine.send_commands(station, batch)
+
     def show_login(self):
         self.clear_frame()
         self.login_page = LoginPage(self.container, self.show_dashboard)
@@ -45,71 +215,195 @@ class TargetTestingApp(tk.Tk):
         self.login_page.update()
 
     def show_dashboard(self, username):
-        self.username = username  # ✅ Update stored username
-        self.clear_frame()
-        self.dashboard_page = DashboardPage(self.container, controller=self, username=username)
-        self.dashboard_page.place(x=0, y=0)
+        if username != self.username or hasattr(self, "login_page"):
+            # Pages show the username, so a new login starts from a fresh cache
+            self.username = username  # ✅ Update stored username
+            self.clear_frame()
+        self.show_page("dashboard")
 
     def show_live_data(self):
-        self.clear_frame()
-        self.live_data_page = LiveDataPage(self.container, controller=self, username=self.username)
-        self.live_data_page.place(x=0, y=0)
+        self.show_page("live_data")
 
     def show_run_test(self, username):
         self.username = username
-        self.clear_frame()
-        self.run_test_page = RunTestPage(self.container, controller=self, username=username)
-        self.run_test_page.place(x=0, y=0)
+        self.show_page("run_test")
 
-    def clear_frame(self):
-        for widget in self.container.winfo_children():
-            widget.destroy()
-         
     def show_pdd_test(self):
-        self.clear_frame()
-        self.pdd_test_page = PDDTestPage(self.container)
-        self.pdd_test_page.place(x=0, y=0, width=1440, height=900)  # ✅ ADD WIDTH + HEIGHT
+        self.show_page("pdd_test")
 
     def show_gas_test(self):
-        self.clear_frame()
-        self.gas_test_page = GasTestPage(self.container, controller=self, username=self.username)
-        self.gas_test_page.place(x=0, y=0, width=1440, height=900)  # ✅ THIS LINE IS REQUIRED
+        self.show_page("gas_test")
 
     def show_reports(self):
-        self.clear_frame()
-        self.reports_page = ReportsPage(self.container, controller=self, username=self.username)
-        self.reports_page.place(x=0, y=0, width=1440, height=900)
+        self.show_page("reports")
+
+    def show_page(self, name):
+        start = time.perf_counter()
+        cached = name in self.pages
+        page = self.get_page(name)
+
+        if self.current_page is not None and self.current_page is not page:
+            self.call_page_hook(self.current_page, "on_hide")
+        page.tkraise()
+        self.current_page = page
+        self.call_page_hook(page, "on_show")
+
+        self.update_idletasks()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.nav_timings.append((name, elapsed_ms, cached))
+        print(f"[Nav] ⏱ {name} shown in {elapsed_ms:.1f} ms ({'cached' if cached else 'built'})")
+
+        # Build the remaining pages while the user looks at this one
+        if self.prebuild_job is None:
+            self.prebuild_job = self.after(200, self.prebuild_next_page)
+
+    def get_page(self, name):
+        page = self.pages.get(name)
+        if page is None:
+            page = self.page_factories[name]()
+            page.place(x=0, y=0, width=1440, height=900)
+            self.pages[name] = page
+        return page
+
+    def prebuild_next_page(self):
+        # One page per slot so the event loop never stalls for long
+        self.prebuild_job = None
+        if self.current_page is None:
+            return
+        for name in self.page_factories:
+            if name not in self.pages:
+                page = self.get_page(name)
+                page.lower(self.current_page)
+                self.prebuild_job = self.after(200, self.prebuild_next_page)
+                return
+
+    def call_page_hook(self, page, hook):
+        callback = getattr(page, hook, None)
+        if callback:
+            callback()
+
+    def clear_frame(self):
+        if self.prebuild_job is not None:
+            self.after_cancel(self.prebuild_job)
+            self.prebuild_job = None
+        for page in self.pages.values():
+            self.call_page_hook(page, "on_hide")
+        self.pages.clear()
+        self.current_page = None
+        if hasattr(self, "login_page"):
+            del self.login_page
+        for widget in self.container.winfo_children():
+            widget.destroy()
 
     def get_chamber_data(self):
-        if hasattr(self, 'live_data_page'):
-            return self.live_data_page.get_chamber_data()
+        page = self.pages.get("live_data")
+        if page is not None:
+            return page.get_chamber_data()
         else:
             print("⚠️ Live data page not initialized.")
             return []
-        
-    def listen_to_socket(self, ip='127.0.0.1', port=65432):
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((ip, port))
-                print("[Socket] ✅ Connected to server")
-                while True:
-                    data = s.recv(1024)
-                    if not data:
-                        break
-                    decoded = data.decode().strip()
-                    parts = decoded.split(',')
-                    self.latest_pressure = float(parts[0].split('=')[1])
-                    self.latest_temperature = float(parts[1].split('=')[1])
-
-                    t = 0 if not self.time_data else self.time_data[-1] + 1
-                    self.pressure_data.append(self.latest_pressure)
-                    self.temperature_data.append(self.latest_temperature)
-                    self.time_data.append(t)
-        
-        except Exception as e:
-            print("[Socket] ❌ Connection error:", e)
+
+    def read_chamber_data(self, t_start, t_end, temperature_policy="last", derived=()):
+        """
+        Returns (t, pressure, temperature, *derived) rows recorded between
+        t_start and t_end, all in seconds since the start of the run.
+
+        There is one row per pressure reading. Temperature is aligned onto
+        those times with the given policy; it is sampled more slowly, and
+        only for the range read. derived names channels computed at ingest
+        (e.g. "leak_rate", see utils.derived) to append to each row.
+        """
+        station = self.station
+        origin = station.origin_ns
+        t_lo, t_hi = origin + int(t_start * NS_PER_S), origin + int(t_end * NS_PER_S)
+        records = self.store.read_range(t_lo, t_hi)
+        times, aligned = AlignedView.from_records(records).on("pressure", {"temperature": temperature_policy}, keep_gaps=True)
+        columns = [station.elapsed(times), aligned["pressure"], aligned["temperature"]]
+        if derived:
+            columns += self.read_derived(station, t_lo, t_hi, times, derived)
+        return list(zip(*(column.tolist() for column in columns)))
+
+    def read_derived(self, station, t_lo, t_hi, times, names):
+        # Derived rows are written for exactly the raw pressure rows, so a
+        # range read normally lines up one to one
+        store = station.derived.store
+        if store is None:
+            return [np.full(len(times), np.nan) for _ in names]
+        records = store.read_range(t_lo, t_hi)
+        if len(records) == len(times) and np.array_equal(records["t"], times):
+            return [records[name] for name in names]
+        # Otherwise match rows by timestamp; a pressure row with no derived
+        # row (e.g. one still being written) gets NaN, not a neighbour's value
+        if len(records) == 0:
+            return [np.full(len(times), np.nan) for _ in names]
+        index = np.minimum(np.searchsorted(records["t"], times), len(records) - 1)
+        matched = records["t"][index] == times
+        return [np.where(matched, records[name][index], np.nan) for name in names]
+
+    def read_events(self, t_start, t_end, station=None):
+        """
+        Returns (t, Event) pairs logged between t_start and t_end, with t in
+        seconds since the start of the run, like read_chamber_data().
+        """
+        station = station or self.station
+        origin = station.origin_ns
+        events = station.events.between(origin + int(t_start * NS_PER_S), origin + int(t_end * NS_PER_S))
+        return [((event.t - origin) / NS_PER_S, event) for event in events]
+
+    def record_test_event(self, test, running):
+        # Logged on the selected station, or on every station in the aggregate view
+        stations = self.stations.values() if self.aggregate else [self.station]
+        for station in stations:
+            # append(): an attached GUI writes it to the daemon's log too
+            event = station.events.append(TEST, test, "start" if running else "stop")
+            if running:
+                station.decay.restart(float(station.elapsed(event.t)))
+                station.onset.rearm()
+            else:
+                station.decay.stop()
+
+    def follow_shared_ring(self):
+        # Publishes what the daemon wrote, so attached GUIs see the same bus traffic
+        station = self.station
+        start = station.samples.count
+        while True:
+            start, snapshot = station.samples.read_since(start)
+            if len(snapshot):
+                batch = SampleBatch(snapshot.times, snapshot.values.T, station.name)
+                station.check_alarms(batch)
+                station.track(batch)
+                self.bus.publish("samples", batch)
+            if station.status.follow():
+                self.bus.publish("status", station)
+            station.events.refresh()
+            time.sleep(FOLLOW_INTERVAL)
+
+
+def station_dir_name(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower() or "station"
+
+
+def parse_station(spec):
+    """Parses a --station value of the form NAME=HOST:PORT[,PROTOCOL]."""
+    try:
+        name, address = spec.split("=", 1)
+        address, _, protocol = address.partition(",")
+        host, port = address.rsplit(":", 1)
+        protocol = protocol.strip() or "auto"
+        if protocol not in PROTOCOLS:
+            raise ValueError
+        return name.strip(), host, int(port), protocol
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=HOST:PORT[,{'|'.join(PROTOCOLS)}], got '{spec}'")
 
 if __name__ == "__main__":
-    app = TargetTestingApp()
+    arg_parser = argparse.ArgumentParser(description="Target Testing Station GUI")
+    arg_parser.add_argument("--attach", metavar="NAME", help="follow a running acquisition.py ring instead of connecting directly")
+    arg_parser.add_argument("--station", metavar="NAME=HOST:PORT[,PROTOCOL]", type=parse_station, action="append",
+                            help="station to connect to, PROTOCOL auto or labview; repeat for several "
+                                 "(default: Station 1=127.0.0.1:65432)")
+    args = arg_parser.parse_args()
+
+    app = TargetTestingApp(attach=args.attach, stations=args.station or DEFAULT_STATIONS)
     app.protocol("WM_DELETE_WINDOW", lambda: (app.destroy(), sys.exit()))
     app.mainloop()
\ No newline at end of file
@@ -1,17 +1,27 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from utils.image_cache import load_photo
 from pathlib import Path
 import requests
 import time
 from collections import deque
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
 import numpy as np
 import threading
 import socket
 
 from tkinter import font
 from pages.side_menu import SideMenu 
+from utils.trend import fit_line
+from utils.ingest import ALL_STATIONS, LINK_UP, LINK_DOWN
+from utils.status import STATUS_FIELDS
+
+# Number of most recent samples shown on the Chamber Data plot
+PLOT_WINDOW = 60
+
+# Upper bound on how often a page redraws in response to new samples
+UI_REFRESH_HZ = 10
 
 # === SystemMetrics ===
 class SystemMetrics(tk.Canvas):
@@ -27,68 +37,138 @@ class SystemMetrics(tk.Canvas):
         self.height = height
         self.assets_path = Path(__file__).resolve().parent.parent / "assets"
 
-        user_icon = Image.open(self.assets_path / "hugeicons_gas-pipe.png").resize((40, 40))
-        self.user_icon_img = ImageTk.PhotoImage(user_icon)
-
-        check_icon = Image.open(self.assets_path / "StatusCheckIcon.png").resize((50, 50))
-        self.check_icon_img = ImageTk.PhotoImage(check_icon)
+        self.user_icon_img = load_photo(self.assets_path / "hugeicons_gas-pipe.png", (40, 40))
+        self.check_icon_img = load_photo(self.assets_path / "StatusCheckIcon.png", (50, 50))
 
         self.place(x=0, y=0)
+        self.build_metrics_frame()
 
-    def embed_metrics_frame_dynamic(self, temperature, pressure, leak_slope):
-        for widget in self.winfo_children():
-            widget.destroy()
-
+    def build_metrics_frame(self):
+        # Widgets and canvas items are created once; ticks only move/retext them
         frame = tk.Frame(self, bg='white', width=self.width, height=self.height)
         frame.place(x=0, y=0)
 
         tk.Label(frame, text="System Metrics", font=('Poppins', 16, 'bold'), bg='white').place(x=25, y=18)
         tk.Label(frame, image=self.user_icon_img, bg='white').place(x=self.width - 70, y=18)
 
-        self.draw_metric(frame, f"{pressure:.2f} Psi", "#F58F8F", "#FFD3D3", pressure, 155, 30, 80)
-        self.draw_metric(frame, f"{temperature:.2f} °C", "#5B93F5", "#A9D0FF", temperature, 50, 30, 150)
-
-        scaled_leak = abs(leak_slope) * 1e6
-        leak_rate_str = f"{scaled_leak:.2f} x 10⁻⁶"
+        self.pressure_gauge = MetricGauge(frame, self.width, "#F58F8F", "#FFD3D3", 155, 30, 80)
+        self.temperature_gauge = MetricGauge(frame, self.width, "#5B93F5", "#A9D0FF", 50, 30, 150)
 
         tk.Label(frame, text="Leak Rate:", font=('Poppins', 14, 'bold'), bg='white').place(x=90, y=230)
-        tk.Label(frame, text=leak_rate_str, font=('Poppins', 14, 'bold'), fg='green', bg='white').place(x=100, y=265)
+        self.leak_rate_label = tk.Label(frame, text="", font=('Poppins', 14, 'bold'), fg='green', bg='white')
+        self.leak_rate_label.place(x=100, y=265)
+        self.leak_rate_text = None
 
         tk.Label(frame, text="Status:", font=('Poppins', 14, 'bold'), bg='white').place(x=310, y=230)
-        tk.Label(frame, text="OK", font=('Poppins', 16, 'bold'), fg='green', bg='white').place(x=390, y=230)
-        tk.Label(frame, image=self.check_icon_img, bg='white').place(x=self.width - 225, y=270)
-
-    def draw_metric(self, parent, label_text, label_color, bar_color, value, max_value, x, y):
-        label_width = 92
-        bar_width = self.width - label_width - 61
-        height = 50
-        radius = 25
+        self.status_label = tk.Label(frame, text="OK", font=('Poppins', 16, 'bold'), fg='green', bg='white')
+        self.status_label.place(x=390, y=230)
+        self.status_text = "OK"
+        # The all-clear check is only shown while the status is OK
+        self.check_icon = tk.Label(frame, image=self.check_icon_img, bg='white')
+        self.check_icon.place(x=self.width - 225, y=270)
 
-        filled_ratio = min(value / max_value, 1.0)
-        filled_width = int(bar_width * filled_ratio)
+    def embed_metrics_frame_dynamic(self, temperature, pressure, leak_slope):
+        self.pressure_gauge.set(pressure, f"{pressure:.2f} Psi")
+        self.temperature_gauge.set(temperature, f"{temperature:.2f} °C")
 
-        label = tk.Canvas(parent, width=label_width, height=height, bg='white', highlightthickness=0)
-        label.place(x=x, y=y)
-        label.create_rectangle(0, 0, label_width, height, fill=label_color, outline=label_color)
-        label.create_text(label_width // 2, height // 2, text=label_text, fill="white", font=('Poppins', 10, 'bold'))
+        scaled_leak = abs(leak_slope) * 1e6
+        leak_rate_str = f"{scaled_leak:.2f} x 10⁻⁶"
+        if leak_rate_str != self.leak_rate_text:
+            self.leak_rate_label.config(text=leak_rate_str)
+            self.leak_rate_text = leak_rate_str
+
+    def set_status(self, problems):
+        """Shows OK, the one active problem (an alarm or a leak onset), or how many there are."""
+        text = "OK" if not problems else problems[0] if len(problems) == 1 else f"{len(problems)} alarms"
+        if text != self.status_text:
+            self.status_label.config(text=text, fg="green" if text == "OK" else "#D0021B")
+            if text == "OK":
+                self.check_icon.place(x=self.width - 225, y=270)
+            elif self.status_text == "OK":
+                self.check_icon.place_forget()
+            self.status_text = text
+
+
+class MetricGauge:
+    """
+    Horizontal bar gauge made of persistent canvas items.
+
+    set() only touches Tk when the rendered text or the filled width in
+    pixels actually changes.
+    """
+
+    def __init__(self, parent, parent_width, label_color, bar_color, max_value, x, y):
+        self.label_width = 92
+        self.bar_width = parent_width - self.label_width - 61
+        self.height = 50
+        self.radius = 25
+        self.max_value = max_value
+        self.text = None
+        self.filled_width = None
+
+        self.label = tk.Canvas(parent, width=self.label_width, height=self.height, bg='white', highlightthickness=0)
+        self.label.place(x=x, y=y)
+        self.label.create_rectangle(0, 0, self.label_width, self.height, fill=label_color, outline=label_color)
+        self.text_item = self.label.create_text(self.label_width // 2, self.height // 2, text="", fill="white", font=('Poppins', 10, 'bold'))
+
+        tk.Frame(parent, width=1, height=self.height, bg="#C0C0C0").place(x=x + self.label_width, y=y)
+
+        self.bar = tk.Canvas(parent, width=self.bar_width, height=self.height, bg='white', highlightthickness=0)
+        self.bar.place(x=x + self.label_width + 1, y=y)
+
+        draw_rounded_bar(self.bar, 0, 0, self.bar_width, self.height, "#EAEAEA", self.radius)
+        self.fill_rect, self.fill_arc = draw_rounded_bar(self.bar, 0, 0, self.bar_width, self.height, bar_color, self.radius)
+        self.bar.itemconfigure(self.fill_rect, state="hidden")
+        self.bar.itemconfigure(self.fill_arc, state="hidden")
+
+    def set(self, value, text):
+        if text != self.text:
+            self.label.itemconfigure(self.text_item, text=text)
+            self.text = text
+
+        filled_ratio = min(value / self.max_value, 1.0)
+        filled_width = int(self.bar_width * filled_ratio)
+        if filled_width == self.filled_width:
+            return
+        self.filled_width = filled_width
+
+        if filled_width <= 0:
+            self.bar.itemconfigure(self.fill_rect, state="hidden")
+            self.bar.itemconfigure(self.fill_arc, state="hidden")
+        elif filled_width >= self.bar_width:
+            self.bar.coords(self.fill_rect, 0, 0, self.bar_width - self.radius, self.height)
+            self.bar.itemconfigure(self.fill_rect, state="normal")
+            self.bar.itemconfigure(self.fill_arc, state="normal")
+        else:
+            self.bar.coords(self.fill_rect, 0, 0, filled_width, self.height)
+            self.bar.itemconfigure(self.fill_rect, state="normal")
+            self.bar.itemconfigure(self.fill_arc, state="hidden")
 
-        tk.Frame(parent, width=1, height=height, bg="#C0C0C0").place(x=x + label_width, y=y)
 
-        bar_canvas = tk.Canvas(parent, width=bar_width, height=height, bg='white', highlightthickness=0)
-        bar_canvas.place(x=x + label_width + 1, y=y)
+def draw_rounded_bar(canvas, x, y, width, height, color, round_right=25):
+    rect = canvas.create_rectangle(x, y, x + width - round_right, y + height, fill=color, outline=color)
+    arc = None
+    if round_right > 0:
+        arc = canvas.create_arc(x + width - 2 * round_right, y, x + width, y + height, start=270, extent=180, fill=color, outline=color)
+    return rect, arc
 
-        self.draw_rounded_bar(bar_canvas, 0, 0, bar_width, height, "#EAEAEA", radius)
-        if filled_width > 0:
-            self.draw_rounded_bar(bar_canvas, 0, 0, filled_width, height, bar_color, radius if filled_width >= bar_width else 0)
 
-    def draw_rounded_bar(self, canvas, x, y, width, height, color, round_right=25):
-        canvas.create_rectangle(x, y, x + width - round_right, y + height, fill=color, outline=color)
-        if round_right > 0:
-            canvas.create_arc(x + width - 2 * round_right, y, x + width, y + height, start=270, extent=180, fill=color, outline=color)
+def station_problems(station):
+    """Active alarm names of a station, then "Leak" if a leak onset is latched."""
+    problems = list(station.alarms.active)
+    if station.onset.latched:
+        problems.append("Leak")
+    return problems
 
 
 class ValvesStatus(tk.Canvas):
-    def __init__(self, parent):
+    """
+    Valve grid. With on_toggle, a click sends a command and the valve shows
+    as pending (amber) until the station acknowledges it; without, it only
+    flips the local colour.
+    """
+
+    def __init__(self, parent, on_toggle=None):
         parent_width = parent.winfo_reqwidth() or 1440
         parent_height = parent.winfo_reqheight() or 900
 
@@ -102,11 +182,12 @@ class ValvesStatus(tk.Canvas):
         self.assets_path = Path(__file__).resolve().parent.parent / "assets"
 
         shutoff_icon_path = self.assets_path / "ValveTabIcon.png"
-        shutoff_icon = Image.open(shutoff_icon_path).resize((40, 40))
-        self.shutoff_icon_img = ImageTk.PhotoImage(shutoff_icon)
+        self.shutoff_icon_img = load_photo(shutoff_icon_path, (40, 40))
 
         self.valve_states = {}
         self.valve_canvases = {}
+        self.on_toggle = on_toggle
+        self.pending = {}  # valve name -> Command awaiting its ack
 
         self.place(x=0, y=0)
         self.draw_rounded_tab()
@@ -124,6 +205,10 @@ class ValvesStatus(tk.Canvas):
         tk.Label(frame, text="Valves", font=('Poppins', 16, 'bold'), bg='white').place(x=20, y=18)
         tk.Label(frame, image=self.shutoff_icon_img, bg='white').place(x=self.width - 70, y=18)
 
+        # Command round-trip latency to the station
+        self.latency_label = tk.Label(frame, text="", font=('Poppins', 9), fg='#555', bg='white')
+        self.latency_label.place(x=110, y=26)
+
         valves_grid = [
             ["He", "N₂", "Va", "Ve"],
             ["C-1", "C-2", "LD", "NV"],
@@ -154,7 +239,7 @@ class ValvesStatus(tk.Canvas):
 
     def draw_valve(self, canvas, valve_name, color_name):
         canvas.delete("all")
-        color = "#5AD760" if color_name == "green" else "#D9D9D9"
+        color = {"green": "#5AD760", "amber": "#F5C542"}.get(color_name, "#D9D9D9")
         diameter = int(canvas['width'])
         canvas.create_oval(2, 2, diameter-2, diameter-2, fill=color, outline="white", width=2)
         canvas.create_text(diameter//2, diameter//2, text=valve_name, font=('Poppins', 10, 'bold'))
@@ -162,11 +247,44 @@ class ValvesStatus(tk.Canvas):
     def toggle_valve(self, valve_name):
         current_state = self.valve_states[valve_name]
         new_state = "closed" if current_state == "open" else "open"
-        self.valve_states[valve_name] = new_state
 
-        canvas = self.valve_canvases[valve_name]
-        color = "green" if new_state == "open" else "gray"
-        self.draw_valve(canvas, valve_name, color)
+        if self.on_toggle is not None:
+            if valve_name in self.pending:
+                return  # one command in flight per valve
+            command = self.on_toggle(valve_name, new_state)
+            if command is not None:
+                self.pending[valve_name] = command
+                self.draw_valve(self.valve_canvases[valve_name], valve_name, "amber")
+            return
+
+        self.set_valve(valve_name, new_state)
+
+    def set_valve(self, valve_name, state):
+        self.valve_states[valve_name] = state
+        color = "green" if state == "open" else "gray"
+        self.draw_valve(self.valve_canvases[valve_name], valve_name, color)
+
+    def command_done(self, command, latency_stats=None):
+        """Applies an acknowledged (or failed) valve command."""
+        valve_name = command.fields.get("valve")
+        if self.pending.get(valve_name) is not command:
+            return
+        del self.pending[valve_name]
+        if command.latency is not None:
+            self.set_valve(valve_name, command.fields["state"])
+        else:
+            print(f"[Valves] ⚠️ {valve_name} → {command.fields['state']} {command.status}: {command.error}")
+            self.set_valve(valve_name, self.valve_states[valve_name])
+        if latency_stats:
+            self.latency_label.config(
+                text=f"round trip {latency_stats['last'] * 1000:.0f} ms · p95 {latency_stats['p95'] * 1000:.0f} ms"
+            )
+
+    def show_states(self, states):
+        """Redraws from a station's acknowledged states (after switching stations)."""
+        self.pending.clear()
+        for valve_name in self.valve_canvases:
+            self.set_valve(valve_name, states.get(valve_name, "open"))
 
     def create_round_rect(self, x1, y1, x2, y2, r=25, **kwargs):
         self.create_arc(x1, y1, x1 + 2 * r, y1 + 2 * r, start=90, extent=90, **kwargs)
@@ -177,6 +295,10 @@ class ValvesStatus(tk.Canvas):
         self.create_rectangle(x1, y1 + r, x2, y2 - r, **kwargs)
 
 # === ChamberData ===
+# Event overlay colours, by event kind
+EVENT_COLORS = {"valve": "#F5A623", "status": "#7B61FF", "test": "#333333", "leak": "#D0021B", "alarm": "#FF6F00"}
+
+
 class ChamberData(tk.Canvas):
     def __init__(self, parent):
         parent_width = parent.winfo_reqwidth() or 1440
@@ -191,42 +313,151 @@ class ChamberData(tk.Canvas):
 
         self.assets_path = Path(__file__).resolve().parent.parent / "assets"
         self.place(x=0, y=30)
+        self.build_graph()
 
-    def update_graph(self, time_data, pressure_data):
-        for widget in self.winfo_children():
-            widget.destroy()
-
+    def build_graph(self):
+        # Figure, axes and canvas live as long as the widget; ticks only move data
         frame = tk.Frame(self, bg='white', width=self.width, height=self.height)
         frame.place(x=0, y=0)
         tk.Label(frame, text="Chamber Data", font=('Poppins', 16, 'bold'), bg='white').place(x=25, y=18)
 
+        self.fig = Figure(figsize=(6.2, 3))
+        self.ax = self.fig.add_subplot(111)
+        self.pressure_line, = self.ax.plot([], [], marker='o', linestyle='-', color='blue', label="Pressure")
+        self.trend_line, = self.ax.plot([], [], linestyle='--', color='red', label="Trendline")
+        self.ax.set_xlabel('Time (mins)')
+        self.ax.set_ylabel('Pressure (Psi)')
+        self.ax.grid(True)
+        self.ax.legend()
+        self.fig.tight_layout()
+
+        # Event markers: full-height lines in data x / axes y, one collection for all
+        self.event_lines = LineCollection([], linewidths=1, linestyles="dotted", transform=self.ax.get_xaxis_transform())
+        self.ax.add_collection(self.event_lines, autolim=False)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
+        self.canvas.get_tk_widget().place(x=20, y=60, width=self.width - 40, height=self.height - 80)
+
+        # One line per station for the aggregate view, created on first use
+        self.station_lines = {}
+        self.showing_stations = False
+
+    def update_stations(self, series):
+        """
+        Aggregate view: one pressure line per station, no trendline.
+
+        Args:
+            series (list): (station name, seconds since run start, pressures) for each station.
+        """
+        if not self.showing_stations:
+            self.pressure_line.set_data([], [])
+            self.trend_line.set_data([], [])
+            self.set_events([])
+            self.showing_stations = True
+
+        added = False
+        for name, time_data, pressure_data in series:
+            line = self.station_lines.get(name)
+            if line is None:
+                line, = self.ax.plot([], [], linestyle='-', label=name)
+                self.station_lines[name] = line
+                added = True
+            line.set_data(np.asarray(time_data) / 60, pressure_data)
+        if added:
+            self.ax.legend(handles=list(self.station_lines.values()))
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def show_single_station(self):
+        if not self.showing_stations:
+            return
+        for line in self.station_lines.values():
+            line.set_data([], [])
+        self.ax.legend(handles=[self.pressure_line, self.trend_line])
+        self.showing_stations = False
+
+    def set_series(self, time_data, pressure_data, fit=None):
+        """
+        Sets the pressure line and the trendline.
+
+        time_data is in seconds since the run start and is plotted in minutes.
+        fit is (slope, intercept) in seconds from a StreamingTrend; without one
+        the visible window is fitted directly, which costs O(window).
+        """
         slope = 0.0
-        if len(time_data) >= 2:
-            z = np.polyfit(time_data, pressure_data, 1)
-            slope = z[0]  # slope of the line
-            trendline = np.poly1d(z)
-            trend_y = trendline(time_data)
+        self.pressure_line.set_data(np.asarray(time_data) / 60, pressure_data)
+        if fit is None:
+            fit = fit_line(time_data, pressure_data)
+        if fit is not None and len(time_data) >= 2:
+            slope, intercept = fit
+            # A straight line only needs its two end points
+            ends = np.array([time_data[0], time_data[-1]], dtype=np.float64)
+            self.trend_line.set_data(ends / 60, slope * ends + intercept)
         else:
-            trend_y = pressure_data
-
-        fig, ax = plt.subplots(figsize=(6.2, 3))
-        ax.plot(time_data, pressure_data, marker='o', linestyle='-', color='blue', label="Pressure")
-        if len(time_data) >= 2:
-            ax.plot(time_data, trend_y, linestyle='--', color='red', label="Trendline")
-        ax.set_xlabel('Time (mins)')
-        ax.set_ylabel('Pressure (Psi)')
-        ax.grid(True)
-        ax.legend()
-        fig.tight_layout()
-
-        canvas = FigureCanvasTkAgg(fig, master=frame)
-        canvas.draw()
-        canvas.get_tk_widget().place(x=20, y=60, width=self.width - 40, height=self.height - 80)
+            self.trend_line.set_data([], [])
+        return slope
+
+    def set_events(self, events):
+        """
+        Marks events with vertical lines.
+
+        Args:
+            events (list): (seconds since run start, Event) pairs, as from read_events().
+        """
+        self.event_lines.set_segments([((t / 60, 0), (t / 60, 1)) for t, _ in events])
+        self.event_lines.set_color([EVENT_COLORS.get(event.kind, "#999999") for _, event in events])
+
+    def update_graph(self, time_data, pressure_data, fit=None, events=None):
+        self.show_single_station()
+        slope = self.set_series(time_data, pressure_data, fit)
+        if events is not None:
+            self.set_events(events)
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+
+        return slope
 
+    def update_graph_blitted(self, time_data, pressure_data, blitter, fit=None):
+        """Live-mode update: blits the lines, re-rendering the axes only when the data leaves them."""
+        slope = self.set_series(time_data, pressure_data, fit)
+        if self.extend_limits(self.pressure_line.get_xdata(), pressure_data):
+            blitter.invalidate()
+        else:
+            blitter.update()
         return slope
 
+    def extend_limits(self, minutes, pressure_data):
+        # Limits move in steps with headroom so most frames can reuse the cached background
+        if len(minutes) < 2:
+            return False
+        changed = False
+        t_first, t_last = minutes[0], minutes[-1]
+        x_min, x_max = self.ax.get_xlim()
+        if t_last > x_max or t_first < x_min:
+            span = max(t_last - t_first, 1 / 60)
+            self.ax.set_xlim(t_first, t_last + 0.25 * span)
+            changed = True
+
+        # nan-aware: gap markers are NaN
+        p_min, p_max = float(np.nanmin(pressure_data)), float(np.nanmax(pressure_data))
+        y_min, y_max = self.ax.get_ylim()
+        if p_min < y_min or p_max > y_max:
+            margin = max(0.1 * (p_max - p_min), 1.0)
+            self.ax.set_ylim(p_min - margin, p_max + margin)
+            changed = True
+        return changed
+
 # === SystemStatus ===
 class SystemStatus(tk.Canvas):
+    """
+    Chamber / leak detector / pump status. Follows the station's status
+    reports through show(); clicking a value still flips it by hand.
+    """
+
     def __init__(self, parent, chamber="Not Sealed", leak="Not Sealed", pump="Not Active"):
         super().__init__(parent, width=306, height=405, bg="white", highlightthickness=0)
         self.width = 306
@@ -248,8 +479,7 @@ class SystemStatus(tk.Canvas):
 
         try:
             icon_path = Path(__file__).resolve().parent.parent / "assets" / "SystemStatusIcon.png"
-            system_icon = Image.open(icon_path).resize((35, 35))
-            self.system_icon_img = ImageTk.PhotoImage(system_icon)
+            self.system_icon_img = load_photo(icon_path, (35, 35))
         except:
             self.system_icon_img = None
 
@@ -290,9 +520,21 @@ class SystemStatus(tk.Canvas):
         else:
             return
 
-        self.status_values[key] = new_status
-        label_widget = self.status_widgets[key]
-        label_widget.config(text=f"  {new_status}", fg=self.get_status_color(key, new_status))
+        self.set_status(key, new_status)
+
+    def set_status(self, key, value):
+        self.status_values[key] = value
+        self.status_widgets[key].config(text=f"  {value}", fg=self.get_status_color(key, value))
+
+    def show(self, values):
+        """
+        Shows a station's reported status, keyed by wire field. Only labels
+        whose value differs from what is on screen are reconfigured.
+        """
+        for field, key in STATUS_FIELDS.items():
+            value = values.get(field)
+            if value is not None and value != self.status_values[key]:
+                self.set_status(key, value)
 
     def get_status_color(self, key, value):
         if key in ["Chamber", "Leak Detector"]:
@@ -321,10 +563,79 @@ class DashboardPage(tk.Frame):
         self.latest_pressure = 100.0
         self.latest_temperature = 25.0
 
+        self.subscription = None
+        self.link_subscription = None
+        self.command_subscription = None
+        self.status_subscription = None
+        self.link_text = None
+
         self.create_sidebar()
         self.create_dashboard_area()
 
         #threading.Thread(target=self.listen_to_socket, daemon=True).start()
+        # Sample subscription is made by on_show() when the controller raises this page
+
+    def on_show(self):
+        if self.subscription is None:
+            self.subscription = self.controller.bridge.subscribe("samples", self.on_samples, max_rate_hz=UI_REFRESH_HZ)
+            self.link_subscription = self.controller.bridge.subscribe("link", self.on_link)
+            self.command_subscription = self.controller.bridge.subscribe("command", self.on_commands, mode="batch")
+            # "latest" coalesces status chatter to at most one redraw per frame
+            self.status_subscription = self.controller.bridge.subscribe("status", self.on_status)
+        self.update_live_data()
+        self.update_link_status()
+        self.valves_status.show_states(self.controller.station.valves)
+        self.on_status(self.controller.station)
+
+    def on_hide(self):
+        if self.subscription is not None:
+            self.controller.bridge.unsubscribe(self.subscription)
+            self.controller.bridge.unsubscribe(self.link_subscription)
+            self.controller.bridge.unsubscribe(self.command_subscription)
+            self.controller.bridge.unsubscribe(self.status_subscription)
+            self.subscription = self.link_subscription = self.command_subscription = self.status_subscription = None
+
+    def on_link(self, station):
+        self.update_link_status()
+
+    def on_status(self, station):
+        # Whichever station reported last, show the selected one's current status
+        self.system_status.show(self.controller.station.status.values)
+
+    def on_commands(self, commands):
+        station = self.controller.station
+        for command in commands:
+            if command.station == station.name:
+                self.valves_status.command_done(command, station.commands.latency_stats())
+
+    def toggle_valve(self, valve_name, state):
+        if self.controller.aggregate:
+            print("[Valves] ⚠️ Select a single station to operate its valves")
+            return None
+        return self.controller.send_command(self.controller.station, valve=valve_name, state=state)
+
+    def update_link_status(self):
+        if self.controller.aggregate:
+            stations = list(self.controller.stations.values())
+            up = sum(s.connected for s in stations)
+            text = f"● {up}/{len(stations)} stations connected"
+            color = "green" if up == len(stations) else "#E69500" if up else "red"
+        else:
+            metrics = self.controller.station.link_metrics()
+            if metrics["state"] == LINK_UP:
+                last = metrics["last_reconnect"]
+                text = "● Link up" + (f"  ·  last reconnect {last:.1f} s" if last is not None else "")
+                color = "green"
+            elif metrics["state"] == LINK_DOWN:
+                text = f"● Reconnecting (attempt {metrics['attempts']})  ·  {metrics['last_error']}"
+                color = "red"
+            else:
+                text, color = "● Connecting…", "#E69500"
+        if text != self.link_text:
+            self.link_label.config(text=text, fg=color)
+            self.link_text = text
+
+    def on_samples(self, batch):
         self.update_live_data()
 
     def create_sidebar(self):
@@ -336,6 +647,19 @@ class DashboardPage(tk.Frame):
 
         tk.Label(self.dashboard_area, text="Dashboard", font=("Poppins", 24, "bold"), bg="#D9D9D9").place(x=45, y=15)
 
+        # Station selector, only when there is more than one to choose from
+        stations = list(self.controller.stations)
+        if len(stations) > 1:
+            self.station_var = tk.StringVar(value=self.controller.selected_station)
+            selector = tk.OptionMenu(self.dashboard_area, self.station_var, *stations, ALL_STATIONS,
+                                     command=self.controller.select_station)
+            selector.config(font=("Poppins", 11), bg="white", highlightthickness=0)
+            selector.place(x=230, y=25)
+
+        # Instrument link state for the selected station(s)
+        self.link_label = tk.Label(self.dashboard_area, text="", font=("Poppins", 11, "bold"), bg="#D9D9D9")
+        self.link_label.place(x=430, y=30)
+
         # Top-left: Chamber Data plot
         self.chamber_data = ChamberData(self.dashboard_area)
         self.chamber_data.place(x=50, y=90)
@@ -349,7 +673,7 @@ class DashboardPage(tk.Frame):
         self.system_status.place(x=800, y=90)
 
         # Bottom-right: Valves
-        self.valves_status = ValvesStatus(self.dashboard_area)
+        self.valves_status = ValvesStatus(self.dashboard_area, on_toggle=self.toggle_valve)
         self.valves_status.place(x=680, y=530)
 
         # Login info top-right
@@ -379,44 +703,45 @@ class DashboardPage(tk.Frame):
     def update_live_data(self):
         if not self.controller.test_running:
             return
+        if self.controller.aggregate:
+            self.update_aggregate_data()
+            return
 
-        time_data = list(self.controller.time_data)
-        pressure_data = list(self.controller.pressure_data)
-        temperature = self.controller.latest_temperature
-        pressure = self.controller.latest_pressure
+        station = self.controller.station
+        times, pressure_data = station.samples.snapshot(PLOT_WINDOW).native("pressure")
+        time_data = station.elapsed(times)
+        temperature = station.latest_temperature
+        pressure = station.latest_pressure
 
-        self.chamber_data.update_graph(time_data, pressure_data)
-        leak_rate = self.calculate_leak_rate(time_data, pressure_data)
+        trend = station.trends[PLOT_WINDOW]
+        events = self.controller.read_events(time_data[0], time_data[-1], station) if len(time_data) else []
+        self.chamber_data.update_graph(time_data, pressure_data, trend.fit(), events)
+        leak_rate = station.leak.leak_rate()
         self.system_metrics.embed_metrics_frame_dynamic(temperature, pressure, leak_rate)
-
-        self.after(5000, self.update_live_data)
+        self.system_metrics.set_status(station_problems(station))
+
+    def update_aggregate_data(self):
+        # Every station on one plot; gauges show the mean, leak rate the worst station
+        stations = list(self.controller.stations.values())
+        series = []
+        for station in stations:
+            times, pressure_data = station.samples.snapshot(PLOT_WINDOW).native("pressure")
+            series.append((station.name, station.elapsed(times), pressure_data))
+        self.chamber_data.update_stations(series)
+
+        temperature = sum(s.latest_temperature for s in stations) / len(stations)
+        pressure = sum(s.latest_pressure for s in stations) / len(stations)
+        leak_rate = max((s.leak.leak_rate() for s in stations), key=abs)
+        self.system_metrics.embed_metrics_frame_dynamic(temperature, pressure, leak_rate)
+        self.system_metrics.set_status([problem for s in stations for problem in station_problems(s)])
 
     def update_dashboard_data(self):
-        time_data = list(self.controller.time_data)
-        pressure_data = list(self.controller.pressure_data)
+        times, pressure_data = self.controller.samples.snapshot(PLOT_WINDOW).native("pressure")
+        time_data = self.controller.station.elapsed(times)
         temperature = self.controller.latest_temperature
         pressure = self.controller.latest_pressure
 
-        self.chamber_data.update_graph(time_data, pressure_data)
+        self.chamber_data.update_graph(time_data, pressure_data, self.controller.trends[PLOT_WINDOW].fit())
         self.system_metrics.embed_metrics_frame_dynamic(temperature, pressure)
 
         self.after(5000, self.update_dashboard_data)
-
-    def calculate_leak_rate(self, time_data, pressure_data):
-        if len(time_data) < 2:
-            return 0.0  # Not enough data
-
-        volume_m3 = 5e-6  # 5 mL in cubic meters
-        leak_rates = []
-
-        for i in range(1, len(time_data)):
-            dt = time_data[i] - time_data[i - 1]
-            dp = pressure_data[i] - pressure_data[i - 1]
-            if dt != 0:
-                leak_rate = (dp / dt) * volume_m3
-                leak_rates.append(leak_rate)
-
-        if leak_rates:
-            return sum(leak_rates) / len(leak_rates)
-        return 0.0
-
@@ -2,6 +2,8 @@ import tkinter as tk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from pages.side_menu import SideMenu
+from pages.dashboard import UI_REFRESH_HZ
+from pages.live_data import DecayPlot
 
 class GasTestPage(tk.Frame):
     def __init__(self, master, controller=None, username="admin"):
@@ -62,7 +64,7 @@ class GasTestPage(tk.Frame):
             data_y=self.pressure_data
         )
 
-        self.create_graph_card(
+        ax, canvas, card = self.create_graph_card(
             parent=self.test_area,
             x=30,
             y=500,
@@ -70,9 +72,16 @@ class GasTestPage(tk.Frame):
             data_x=self.time_data,
             data_y=[p - 10 for p in self.pressure_data]
         )
+        # Sample data until a test is running, then the live trace and its decay fit
+        label = tk.Label(card, text="", font=("Poppins", 10), bg="white", fg="#333")
+        label.place(x=220, y=14)
+        self.rate_of_fall = DecayPlot(ax, canvas, label=label)
+        self.subscription = None
 
     def toggle_test(self):
         self.test_running = not self.test_running
+        if self.controller is not None:
+            self.controller.record_test_event("Gas", self.test_running)
         if self.test_running:
             self.test_button.config(
                 text="⏹ Stop Test",
@@ -107,3 +116,17 @@ class GasTestPage(tk.Frame):
         canvas = FigureCanvasTkAgg(fig, master=card)
         canvas.draw()
         canvas.get_tk_widget().place(x=15, y=40, width=500, height=280)
+        return ax, canvas, card
+
+    def on_show(self):
+        if self.controller is not None and self.subscription is None:
+            self.subscription = self.controller.bridge.subscribe("samples", self.on_samples, max_rate_hz=UI_REFRESH_HZ)
+            self.on_samples(None)
+
+    def on_hide(self):
+        if self.subscription is not None:
+            self.controller.bridge.unsubscribe(self.subscription)
+            self.subscription = None
+
+    def on_samples(self, batch):
+        self.rate_of_fall.update(self.controller.station)
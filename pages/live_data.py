@@ -1,14 +1,26 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from utils.image_cache import load_photo
 from pathlib import Path
 import numpy as np
 from collections import deque
 import threading
 import socket
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from pages.side_menu import SideMenu
-from pages.dashboard import ChamberData
+from pages.dashboard import ChamberData, PLOT_WINDOW, UI_REFRESH_HZ
+from utils.alignment import AlignedView
+from utils.blitting import BlitManager
+from utils.decay import predict
+from utils.ring_buffer import RingSnapshot
+from utils.timebase import NS_PER_S
+from utils.trend import fit_line
+
+# Samples shown while the Chamber Data plot is in blitted live mode
+LIVE_PLOT_WINDOW = 1000
+
+# Most points drawn for a Rate of Fall Test trace, however long the test
+DECAY_PLOT_POINTS = 2000
 
 
 class TargetChamber(tk.Canvas):
@@ -22,15 +34,14 @@ class TargetChamber(tk.Canvas):
 
         self.icon_img = None
         try:
-            icon = Image.open(self.assets_path / "hugeicons_gas-pipe.png").resize((35, 35))
-            self.icon_img = ImageTk.PhotoImage(icon)
+            self.icon_img = load_photo(self.assets_path / "hugeicons_gas-pipe.png", (35, 35))
         except:
             pass
 
-    def embed_vertical_metrics(self, temperature, pressure):
-        for widget in self.winfo_children():
-            widget.destroy()
+        self.build_vertical_metrics()
 
+    def build_vertical_metrics(self):
+        # Widgets and canvas items are created once; ticks only move/retext them
         frame = tk.Frame(self, bg="white", width=self.width, height=self.height)
         frame.place(x=0, y=0)
 
@@ -48,28 +59,59 @@ class TargetChamber(tk.Canvas):
         start_x = (self.width - total_width) // 2
         start_y = (self.height - total_height) // 2 + 30
 
-        self.draw_vertical_metric(frame, f"{pressure:.2f} Pa", "#F58F8F", "#FFD3D3", pressure, 155, x=start_x, y=start_y, bar_width=bar_width, bar_height=bar_height)
-        self.draw_vertical_metric(frame, f"{temperature:.2f} °C", "#5B93F5", "#A9D0FF", temperature, 50, x=start_x + bar_width + spacing, y=start_y, bar_width=bar_width, bar_height=bar_height)
+        self.pressure_gauge = VerticalGauge(frame, "#F58F8F", "#FFD3D3", 155, x=start_x, y=start_y, bar_width=bar_width, bar_height=bar_height)
+        self.temperature_gauge = VerticalGauge(frame, "#5B93F5", "#A9D0FF", 50, x=start_x + bar_width + spacing, y=start_y, bar_width=bar_width, bar_height=bar_height)
 
-    def draw_vertical_metric(self, parent, label_text, label_color, bar_color, value, max_value, x, y, bar_width=60, bar_height=200):
-        label_height = 58
-        radius = 30
-        filled_ratio = min(value / max_value, 1.0)
-        filled_height = int(bar_height * filled_ratio)
+    def embed_vertical_metrics(self, temperature, pressure):
+        self.pressure_gauge.set(pressure, f"{pressure:.2f} Pa")
+        self.temperature_gauge.set(temperature, f"{temperature:.2f} °C")
 
-        label_canvas = tk.Canvas(parent, width=bar_width, height=label_height, bg="white", highlightthickness=0)
-        label_canvas.place(x=x, y=y + bar_height)
-        label_canvas.create_rectangle(0, 0, bar_width, label_height, fill=label_color, outline=label_color)
-        label_canvas.create_text(bar_width // 2, label_height // 2, text=label_text, fill="white", font=('Poppins', 12, 'bold'))
 
-        bar_canvas = tk.Canvas(parent, width=bar_width, height=bar_height, bg="white", highlightthickness=0)
-        bar_canvas.place(x=x, y=y)
-        bar_canvas.create_rectangle(0, radius, bar_width, bar_height, fill="#EAEAEA", outline="#EAEAEA")
-        bar_canvas.create_arc(0, 0, bar_width, 2 * radius, start=0, extent=180, fill="#EAEAEA", outline="#EAEAEA")
+class VerticalGauge:
+    """
+    Vertical bar gauge made of persistent canvas items.
+
+    set() only touches Tk when the rendered text or the filled height in
+    pixels actually changes.
+    """
+
+    def __init__(self, parent, label_color, bar_color, max_value, x, y, bar_width=60, bar_height=200):
+        label_height = 58
+        radius = 30
+        self.bar_width = bar_width
+        self.bar_height = bar_height
+        self.max_value = max_value
+        self.text = None
+        self.filled_height = None
+
+        self.label = tk.Canvas(parent, width=bar_width, height=label_height, bg="white", highlightthickness=0)
+        self.label.place(x=x, y=y + bar_height)
+        self.label.create_rectangle(0, 0, bar_width, label_height, fill=label_color, outline=label_color)
+        self.text_item = self.label.create_text(bar_width // 2, label_height // 2, text="", fill="white", font=('Poppins', 12, 'bold'))
+
+        self.bar = tk.Canvas(parent, width=bar_width, height=bar_height, bg="white", highlightthickness=0)
+        self.bar.place(x=x, y=y)
+        self.bar.create_rectangle(0, radius, bar_width, bar_height, fill="#EAEAEA", outline="#EAEAEA")
+        self.bar.create_arc(0, 0, bar_width, 2 * radius, start=0, extent=180, fill="#EAEAEA", outline="#EAEAEA")
+        self.fill_rect = self.bar.create_rectangle(0, bar_height, bar_width, bar_height, fill=bar_color, outline=bar_color, state="hidden")
+
+    def set(self, value, text):
+        if text != self.text:
+            self.label.itemconfigure(self.text_item, text=text)
+            self.text = text
+
+        filled_ratio = min(value / self.max_value, 1.0)
+        filled_height = int(self.bar_height * filled_ratio)
+        if filled_height == self.filled_height:
+            return
+        self.filled_height = filled_height
 
         if filled_height > 0:
-            y_fill = bar_height - filled_height
-            bar_canvas.create_rectangle(0, y_fill, bar_width, bar_height, fill=bar_color, outline=bar_color)
+            y_fill = self.bar_height - filled_height
+            self.bar.coords(self.fill_rect, 0, y_fill, self.bar_width, self.bar_height)
+            self.bar.itemconfigure(self.fill_rect, state="normal")
+        else:
+            self.bar.itemconfigure(self.fill_rect, state="hidden")
 
 
 class LiveDataPage(tk.Frame):
@@ -139,6 +181,22 @@ class LiveDataPage(tk.Frame):
         )
         self.toggle_button.place(x=250, y=25, width=120, height=28)
 
+        # === Live Mode Toggle (blitted high-rate plotting)
+        self.live_mode = False
+        self.blitter = None
+        self.subscription = None
+        self.live_job = None
+        self.live_button = tk.Button(
+            self.live_data_area,
+            text="⚡ Live Mode",
+            font=("Poppins", 10, "bold"),
+            bg="#005DAA",
+            fg="white",
+            relief="flat",
+            command=self.toggle_live_mode
+        )
+        self.live_button.place(x=380, y=25, width=120, height=28)
+
         # After creating self.toggle_button
         if self.test_running:
             self.toggle_button.config(text="⏹ Stop Test", bg="#F44336")
@@ -146,7 +204,7 @@ class LiveDataPage(tk.Frame):
         # 🔁 Set correct initial state
         if self.controller.test_running:
             self.toggle_button.config(text="⏹ Stop Test", bg="#F44336")
-            self.update_live_data()
+            # Sample subscription is made by on_show() when the controller raises this page
 
         else:
             self.toggle_button.config(text="▶ Start Test", bg="#4CAF50")
@@ -176,22 +234,74 @@ class LiveDataPage(tk.Frame):
         #except Exception as e:
          #   print("[Socket] ❌", e)
 
+    def on_show(self):
+        if self.subscription is None:
+            self.subscription = self.controller.bridge.subscribe("samples", self.on_samples, max_rate_hz=UI_REFRESH_HZ)
+        self.update_live_data()
+        if self.live_mode and self.live_job is None:
+            self.update_live_plot()
+
+    def on_hide(self):
+        if self.subscription is not None:
+            self.controller.bridge.unsubscribe(self.subscription)
+            self.subscription = None
+        if self.live_job is not None:
+            self.after_cancel(self.live_job)
+            self.live_job = None
+
+    def on_samples(self, batch):
+        self.update_live_data()
+
     def update_live_data(self):
-        time_data = list(self.controller.time_data)
-        pressure_data = list(self.controller.pressure_data)
+        times, pressure_data = self.controller.samples.snapshot(PLOT_WINDOW).native("pressure")
+        time_data = self.controller.station.elapsed(times)
         temperature = self.controller.latest_temperature
         pressure = self.controller.latest_pressure
 
         # Always redraw widgets to keep UI visible
-        self.chamber_data.update_graph(time_data, pressure_data)
+        if not self.live_mode:
+            events = self.controller.read_events(time_data[0], time_data[-1]) if len(time_data) else []
+            self.chamber_data.update_graph(time_data, pressure_data, self.controller.trends[PLOT_WINDOW].fit(), events)
         self.target_chamber.embed_vertical_metrics(temperature, pressure)
+        self.rate_fall_test.decay.update(self.controller.station)
 
         # But don't append new data unless test is running
         if self.controller.test_running:
             # optionally add logic here to pull data, etc.
             pass
 
-        self.after(5000, self.update_live_data)
+    def toggle_live_mode(self):
+        self.live_mode = not self.live_mode
+        if self.live_mode:
+            self.chamber_data.pressure_line.set_marker("")
+            self.blitter = BlitManager(self.chamber_data.canvas, [self.chamber_data.pressure_line, self.chamber_data.trend_line])
+            self.live_button.config(text="⏸ Live Mode", bg="#F58F8F")
+            self.update_live_plot()
+        else:
+            if self.live_job is not None:
+                self.after_cancel(self.live_job)
+                self.live_job = None
+            self.blitter.close()
+            self.blitter = None
+            self.chamber_data.pressure_line.set_marker("o")
+            self.live_button.config(text="⚡ Live Mode", bg="#005DAA")
+            self.update_live_data_plot()
+
+    def update_live_data_plot(self):
+        times, pressure_data = self.controller.samples.snapshot(PLOT_WINDOW).native("pressure")
+        time_data = self.controller.station.elapsed(times)
+        self.chamber_data.update_graph(time_data, pressure_data, self.controller.trends[PLOT_WINDOW].fit())
+
+    def update_live_plot(self):
+        self.live_job = None
+        if not self.live_mode or not self.winfo_exists():
+            return
+        times, pressure_data = self.controller.samples.snapshot(LIVE_PLOT_WINDOW).native("pressure")
+        fit = self.controller.trends[LIVE_PLOT_WINDOW].fit()
+        time_data = self.controller.station.elapsed(times)
+        self.chamber_data.update_graph_blitted(time_data, pressure_data, self.blitter, fit)
+        # Next frame as soon as the measured draw cost allows
+        self.live_job = self.after(self.blitter.interval_ms, self.update_live_plot)
 
     def stop_test(self):
         self.test_running = False
@@ -203,53 +313,169 @@ class LiveDataPage(tk.Frame):
         self.update_live_data()
 
     def get_chamber_data(self):
-        return list(zip(self.controller.time_data, self.controller.pressure_data, self.controller.temperature_data))
+        """
+        Returns the buffered (seconds since run start, pressure, temperature) rows,
+        one per pressure reading, with temperature held from its latest reading.
+        """
+        station = self.controller.station
+        times, aligned = AlignedView.from_snapshot(station.samples.snapshot()).on("pressure", keep_gaps=True)
+        return list(zip(station.elapsed(times).tolist(), aligned["pressure"].tolist(), aligned["temperature"].tolist()))
     
     def toggle_test(self):
         self.controller.test_running = not self.controller.test_running
         self.test_running = self.controller.test_running
+        self.controller.record_test_event("Live Data", self.test_running)
         if self.controller.test_running:
             self.toggle_button.config(text="⏹ Stop Test", bg="#F44336")  # Red
         else:
             self.toggle_button.config(text="▶ Start Test", bg="#4CAF50")  # Green
 
 class LeakTest(tk.Canvas):
+    title = "Leak Test"
+
     def __init__(self, parent):
         super().__init__(parent, width=500, height=333, bg="#D9D9D9", highlightthickness=0)
         self.assets_path = Path(__file__).resolve().parent.parent / "assets"
+        self.build_graph()
 
-    def update_graph(self, time_data, pressure_data):
-        for widget in self.winfo_children():
-            widget.destroy()
-
-        frame = tk.Frame(self, bg='white', width=500, height=333)
+    def build_graph(self):
+        frame = self.frame = tk.Frame(self, bg='white', width=500, height=333)
         frame.place(x=0, y=0)
 
-        tk.Label(frame, text="Leak Test", font=('Poppins', 16, 'bold'), bg='white').place(x=25, y=18)
-
-        fig, ax = plt.subplots(figsize=(5.8, 2.8))
-        ax.plot(time_data, pressure_data, color='blue', marker='o')
-
-        # Add red trendline (linear fit)
-        if len(time_data) >= 2:
-            coeffs = np.polyfit(time_data, pressure_data, 1)  # degree-1 polynomial
-            trendline = np.poly1d(coeffs)(time_data)
-            ax.plot(time_data, trendline, color='red', linewidth=2, label="Trend")
-
-        ax.set_xlabel('Time (mins)')
-        ax.set_ylabel('Pressure (Psi)')
-        ax.grid(True)
-        fig.tight_layout()
+        tk.Label(frame, text=self.title, font=('Poppins', 16, 'bold'), bg='white').place(x=25, y=18)
+
+        self.fig = Figure(figsize=(5.8, 2.8))
+        self.ax = self.fig.add_subplot(111)
+        self.pressure_line, = self.ax.plot([], [], color='blue', marker='o')
+        self.trend_line, = self.ax.plot([], [], color='red', linewidth=2, label="Trend")
+        self.ax.set_xlabel('Time (mins)')
+        self.ax.set_ylabel('Pressure (Psi)')
+        self.ax.grid(True)
+        self.fig.tight_layout()
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
+        self.canvas.get_tk_widget().place(x=20, y=60, width=460, height=250)
+
+    def update_graph(self, time_data, pressure_data, fit=None):
+        self.pressure_line.set_data(time_data, pressure_data)
+
+        # Red trendline (linear fit), from a StreamingTrend when the caller has one
+        if fit is None:
+            fit = fit_line(time_data, pressure_data)
+        if fit is not None:
+            slope, intercept = fit
+            ends = np.array([time_data[0], time_data[-1]], dtype=np.float64)
+            self.trend_line.set_data(ends, slope * ends + intercept)
+        else:
+            self.trend_line.set_data([], [])
 
-        canvas = FigureCanvasTkAgg(fig, master=frame)
-        canvas.draw()
-        plt.close(fig)
-        canvas.get_tk_widget().place(x=20, y=60, width=460, height=250)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
 
 
 class RateOfFallTest(LeakTest):
-    def update_graph(self, time_data, pressure_data):
-        super().update_graph(time_data, pressure_data)
-        for widget in self.winfo_children():
-            if isinstance(widget, tk.Frame):
-                tk.Label(widget, text="Rate of Fall Test", font=('Poppins', 16, 'bold'), bg='white').place(x=25, y=18)
\ No newline at end of file
+    title = "Rate of Fall Test"
+
+    def build_graph(self):
+        super().build_graph()
+        label = tk.Label(self.frame, text="", font=('Poppins', 10), fg="#333", bg='white')
+        label.place(x=220, y=24)
+        self.decay = DecayPlot(self.ax, self.canvas, self.trend_line, label)
+
+
+class DecayPlot:
+    """
+    Draws a station's Rate of Fall Test onto an existing pressure plot: the
+    trace since the test started, the fitted decay curve, the threshold, and
+    the predicted time to it.
+
+    Args:
+        ax: Matplotlib axes holding the pressure line (the first line).
+        canvas: The FigureCanvasTkAgg to redraw.
+        fit_line: Line for the fitted curve; the pressure line's colour is used otherwise.
+        label (tk.Label, optional): Where the prediction is written.
+    """
+
+    def __init__(self, ax, canvas, fit_line=None, label=None):
+        self.ax = ax
+        self.canvas = canvas
+        self.pressure_line = ax.get_lines()[0]
+        self.fit_line = fit_line or ax.plot([], [], color='red', linewidth=2)[0]
+        self.threshold_line = ax.axhline(0, color='#999', linestyle='--', linewidth=1, visible=False)
+        self.label = label
+        self.shown = None
+        # Decimated trace of the test being shown, extended with each new ring read
+        self.station = None
+        self.t0 = None
+        self.read_count = 0  # ring count read up to
+        self.seen = 0  # readings since the test started
+        self.step = 1
+        self.index = np.empty(0, dtype=np.int64)
+        self.times = np.empty(0, dtype=np.int64)
+        self.pressure = np.empty(0)
+
+    def update(self, station):
+        """Redraws from the station's latest fit; does nothing until a test has one."""
+        fit = station.decay.fit
+        if fit.n == 0 or fit is self.shown:
+            return
+        self.shown = fit
+
+        if station is not self.station or fit.t0 != self.t0:
+            self._restart(station, fit.t0)
+        else:
+            self.read_count, new = station.samples.read_since(self.read_count)
+            self._append(*new.native("pressure"))
+
+        seconds = station.elapsed(self.times)
+        self.pressure_line.set_data((seconds - fit.t0) / 60, self.pressure)
+        self.fit_line.set_data((seconds - fit.t0) / 60, predict(fit, seconds))
+        self.threshold_line.set_ydata([station.decay.threshold] * 2)
+        self.threshold_line.set_visible(True)
+        if self.label is not None:
+            self.label.config(text=rate_of_fall_text(fit, station.decay.threshold))
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def _restart(self, station, t0):
+        # New test: read it from its start once, from the store for any part
+        # that is older than the ring, then only new rows on later updates
+        self.station, self.t0 = station, t0
+        self.seen, self.step = 0, 1
+        self.index, self.times, self.pressure = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        t0_ns = station.origin_ns + int(t0 * NS_PER_S)
+        self.read_count, held = station.samples.read_since(0)
+        if station.store is not None and (len(held) == 0 or held.times[0] > t0_ns):
+            end = int(held.times[0]) - 1 if len(held) else np.iinfo(np.int64).max
+            self._append(*AlignedView.from_records(station.store.read_range(t0_ns, end)).native("pressure"))
+        start = int(np.searchsorted(held.times, t0_ns, side="left"))
+        self._append(*RingSnapshot(held.channels, held.times[start:], held.values[:, start:]).native("pressure"))
+
+    def _append(self, times, pressure):
+        # Every step-th reading, plus gap markers so the trace still breaks at
+        # outages; the step doubles whenever the trace outgrows DECAY_PLOT_POINTS
+        index = self.seen + np.arange(len(times))
+        self.seen += len(times)
+        keep = (index % self.step == 0) | np.isnan(pressure)
+        self.index = np.concatenate((self.index, index[keep]))
+        self.times = np.concatenate((self.times, times[keep]))
+        self.pressure = np.concatenate((self.pressure, pressure[keep]))
+        while np.count_nonzero(~np.isnan(self.pressure)) > DECAY_PLOT_POINTS:
+            self.step *= 2
+            keep = (self.index % self.step == 0) | np.isnan(self.pressure)
+            self.index, self.times, self.pressure = self.index[keep], self.times[keep], self.pressure[keep]
+
+
+def rate_of_fall_text(fit, threshold):
+    """One-line prediction for a DecayFit, e.g. "τ 25.0 s → 30.0 · stays above 20 (99%)"."""
+    if fit.tau == float("inf"):
+        return "No decay yet"
+    text = f"τ {fit.tau:.1f} s → {fit.asymptote:.1f}"
+    if fit.time_to_threshold == 0:
+        return f"{text} · below {threshold:g}"
+    if fit.time_to_threshold == float("inf"):
+        return f"{text} · stays above {threshold:g} ({fit.confidence:.0%})"
+    return f"{text} · {threshold:g} in {fit.time_to_threshold:.0f} s ({fit.confidence:.0%})"
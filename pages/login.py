@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
+from utils.image_cache import load_photo
 from pathlib import Path
 
 class LoginPage(tk.Frame):
@@ -17,16 +17,14 @@ class LoginPage(tk.Frame):
 
         # LLNL logo
         try:
-            llnl_image = Image.open(self.assets_path / "LLNL Logo.png").resize((747, 144))
-            self.llnl_img = ImageTk.PhotoImage(llnl_image)
+            self.llnl_img = load_photo(self.assets_path / "LLNL Logo.png", (747, 144))
             self.canvas.create_image(960, 150, image=self.llnl_img)
         except:
             self.canvas.create_text(960, 100, text="LLNL Logo", fill="#000", font=("Poppins", 20))
 
         # UC Davis Seal
         try:
-            seal_image = Image.open(self.assets_path / "ucdavis-seal.png").resize((241, 241))
-            self.seal_img = ImageTk.PhotoImage(seal_image)
+            self.seal_img = load_photo(self.assets_path / "ucdavis-seal.png", (241, 241))
             self.canvas.create_image(475, 780, image=self.seal_img)
         except:
             self.canvas.create_text(160, 780, text="UC Davis", fill="white", font=("Poppins", 18))
@@ -56,8 +54,7 @@ class LoginPage(tk.Frame):
         container = tk.Frame(self, bg="white", highlightbackground="#517db8", highlightthickness=1, width=442, height=66)
 
         try:
-            icon = Image.open(self.assets_path / icon_file).resize((27, 27))
-            icon_img = ImageTk.PhotoImage(icon)
+            icon_img = load_photo(self.assets_path / icon_file, (27, 27))
             setattr(self, f"{placeholder.lower()}_icon", icon_img)
             tk.Label(container, image=icon_img, bg="white").place(x=29, y=19)
         except:
@@ -8,8 +8,10 @@ from tkinter import messagebox, filedialog
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from datetime import datetime, timedelta
+import numpy as np
 
-VOLUME_M3 = 5e-6
+from utils.leak import leak_fit
+from utils.trend import fit_line
 
 
 class ReportsPage(tk.Frame):
@@ -145,8 +147,8 @@ class ReportsPage(tk.Frame):
         target_pressure_entry = make_entry("Target Pressure (psi)")
         min_pressure_entry = make_entry("Min Pressure (psi)")
         max_pressure_entry = make_entry("Max Pressure (psi)")
-        start_entry = make_entry("Start Time (HH:MM:SS)")
-        end_entry = make_entry("End Time (HH:MM:SS)")
+        start_entry = make_entry("Start Time into Run (HH:MM:SS)")
+        end_entry = make_entry("End Time into Run (HH:MM:SS)")
         notes_entry = make_entry("Notes (Optional)")
 
         def hms_to_seconds(hms_str):
@@ -192,6 +194,40 @@ class ReportsPage(tk.Frame):
         popup.geometry(f"420x{popup.winfo_reqheight()}")  # Resize based on content
         popup.resizable(False, False)
 
+    def load_test_data(self, row):
+        """
+        Range-reads the recorded samples for a logged test, with time shifted to the test start.
+
+        Rows are (t, pressure, temperature, leak rate); the leak rate is the
+        one computed at ingest. The logged start and duration are seconds of
+        real elapsed run time.
+        """
+        start_seconds, end_seconds = self.test_window(row)
+        filtered_data = self.controller.read_chamber_data(start_seconds, end_seconds, derived=("leak_rate",))
+        return [(t - start_seconds, p, temp, leak) for t, p, temp, leak in filtered_data]
+
+    def load_test_events(self, row):
+        """Valve, status and test events logged during a test, with time shifted to the test start."""
+        start_seconds, end_seconds = self.test_window(row)
+        return [(t - start_seconds, event) for t, event in self.controller.read_events(start_seconds, end_seconds)]
+
+    def test_window(self, row):
+        start_seconds = int(row[9])
+        h, m, s = map(int, row[4].split(":"))
+        return start_seconds, start_seconds + h * 3600 + m * 60 + s
+
+    def summarize_test_data(self, data):
+        """
+        Returns (trend slope, leak rate) for a test. The leak rate is the
+        temperature-compensated fit the dashboard shows, over the whole test.
+        """
+        if len(data) < 2:
+            return 0.0, 0.0
+        times, pressures, temperatures = (np.array(column, dtype=np.float64) for column in list(zip(*data))[:3])
+        fit = fit_line(times, pressures)
+        leak = leak_fit(times, pressures, temperatures).leak_rate
+        return (fit[0] if fit else 0.0), (0.0 if np.isnan(leak) else leak)
+
     def export_to_csv(self):
         selected = self.test_table.selection()
         if not selected:
@@ -203,36 +239,27 @@ class ReportsPage(tk.Frame):
             return
 
         row = self.test_table.item(selected[0])['values']
-        full_data = self.controller.get_chamber_data()
-
-        start_seconds = int(row[9])
-        h, m, s = map(int, row[4].split(":"))
-        duration_seconds = h * 3600 + m * 60 + s
-        end_seconds = start_seconds + duration_seconds
-
-        filtered_data = [(t, p, temp) for t, p, temp in full_data if start_seconds <= t <= end_seconds]
-        shifted_data = [(t - start_seconds, p, temp) for t, p, temp in filtered_data]
+        shifted_data = self.load_test_data(row)
 
         with open(file_path, mode="w", newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
             writer.writerow(["Test Info"])
             writer.writerow(self.test_table["columns"][:-1])
             writer.writerow(row[:-1])
+            slope, test_leak_rate = self.summarize_test_data(shifted_data)
+            writer.writerow(["Trend Slope (Pa/s)", f"{slope:.4e}"])
+            writer.writerow(["Leak Rate (Pa·m³/s)", f"{test_leak_rate:.2e}"])
+            writer.writerow([])
+            writer.writerow(["Events"])
+            writer.writerow(["Time (s)", "Kind", "Name", "Value"])
+            for t, event in self.load_test_events(row):
+                writer.writerow([f"{t:.2f}", event.kind, event.name, event.value])
             writer.writerow([])
             writer.writerow(["Chamber Data"])
             writer.writerow(["Time (s)", "Pressure (Pa)", "Temperature (°C)", "Leak Rate (Pa·m³/s)"])
 
-            prev_t, prev_p = None, None
-            for t, p, temp in shifted_data:
-                if prev_t is None:
-                    leak_rate = "-"
-                else:
-                    dt = t - prev_t
-                    dp = p - prev_p
-                    leak_rate = (dp / dt) * VOLUME_M3 if dt != 0 else "-"
-                    leak_rate = f"{leak_rate:.2e}" if leak_rate != "-" else "-"
-                writer.writerow([f"{t:.2f}", f"{p:.2f}", f"{temp:.2f}", leak_rate])
-                prev_t, prev_p = t, p
+            for t, p, temp, leak in shifted_data:
+                writer.writerow([f"{t:.2f}", f"{p:.2f}", f"{temp:.2f}", format_leak_rate(leak)])
 
         messagebox.showinfo("Export Complete", f"Data exported to {file_path}")
 
@@ -263,6 +290,27 @@ class ReportsPage(tk.Frame):
         for i, val in enumerate(row[:-1]):
             c.drawString(30 + i * 80, y, str(val))
 
+        shifted_data = self.load_test_data(row)
+        slope, test_leak_rate = self.summarize_test_data(shifted_data)
+        y -= 20
+        c.drawString(30, y, f"Trend Slope: {slope:.4e} Pa/s    Leak Rate: {test_leak_rate:.2e} Pa·m³/s")
+
+        events = self.load_test_events(row)
+        if events:
+            y -= 40
+            c.setFont("Helvetica-Bold", 11)
+            c.drawString(30, y, "Events")
+            y -= 20
+            c.setFont("Helvetica", 9)
+            for t, event in events:
+                c.drawString(30, y, f"{t:.2f} s")
+                c.drawString(110, y, f"{event.kind}: {event.name} -> {event.value}")
+                y -= 15
+                if y < 50:
+                    c.showPage()
+                    y = height - 50
+                    c.setFont("Helvetica", 9)
+
         y -= 40
         c.setFont("Helvetica-Bold", 11)
         c.drawString(30, y, "Chamber Data")
@@ -275,28 +323,11 @@ class ReportsPage(tk.Frame):
         y -= 20
         c.setFont("Helvetica", 9)
 
-        full_data = self.controller.get_chamber_data()
-        start_seconds = int(row[9])
-        h, m, s = map(int, row[4].split(":"))
-        duration_seconds = h * 3600 + m * 60 + s
-        end_seconds = start_seconds + duration_seconds
-        filtered_data = [(t, p, temp) for t, p, temp in full_data if start_seconds <= t <= end_seconds]
-        shifted_data = [(t - start_seconds, p, temp) for t, p, temp in filtered_data]
-
-        prev_t, prev_p = None, None
-        for t, p, temp in shifted_data:
-            if prev_t is None:
-                leak_rate = "-"
-            else:
-                dt = t - prev_t
-                dp = p - prev_p
-                leak_rate = (dp / dt) * VOLUME_M3 if dt != 0 else "-"
-                leak_rate = f"{leak_rate:.2e}" if leak_rate != "-" else "-"
+        for t, p, temp, leak in shifted_data:
             c.drawString(30, y, f"{t:.2f}")
             c.drawString(110, y, f"{p:.2f}")
             c.drawString(210, y, f"{temp:.2f}")
-            c.drawString(310, y, leak_rate)
-            prev_t, prev_p = t, p
+            c.drawString(310, y, format_leak_rate(leak))
 
             y -= 15
             if y < 50:
@@ -306,3 +337,8 @@ class ReportsPage(tk.Frame):
 
         c.save()
         messagebox.showinfo("Export Complete", f"PDF saved to {file_path}")
+
+
+def format_leak_rate(leak):
+    # NaN: first reading, repeated timestamp or a gap marker
+    return "-" if leak != leak else f"{leak:.2e}"
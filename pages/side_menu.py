@@ -1,5 +1,5 @@
 import tkinter as tk
-from PIL import Image, ImageTk
+from utils.image_cache import load_photo
 from pathlib import Path
 
 class SideMenu(tk.Frame):
@@ -15,8 +15,7 @@ class SideMenu(tk.Frame):
 
     def build_sidebar(self):
         try:
-            logo = Image.open(self.assets_path / "LLNL Logo Circle.png").resize((170, 170))
-            self.logo_img = ImageTk.PhotoImage(logo)
+            self.logo_img = load_photo(self.assets_path / "LLNL Logo Circle.png", (170, 170))
             tk.Label(self, image=self.logo_img, bg="#005DAA").place(x=(self.winfo_reqwidth() - 170) // 2, y=30)
         except:
             tk.Label(self, text="LLNL", bg="#005DAA", fg="white", font=('Poppins', 16)).place(x=20, y=40)
@@ -58,8 +57,7 @@ class SideMenu(tk.Frame):
         spacing = 72
 
         try:
-            bar_icon = Image.open(self.assets_path / "SideMenuSelectionButton.png").resize((8, 48))
-            self.sidebar_bar_img = ImageTk.PhotoImage(bar_icon)
+            self.sidebar_bar_img = load_photo(self.assets_path / "SideMenuSelectionButton.png", (8, 48))
         except:
             self.sidebar_bar_img = None
 
@@ -74,8 +72,7 @@ class SideMenu(tk.Frame):
 
     def create_button(self, text, icon_file, y, command=None):
         try:
-            icon = Image.open(self.assets_path / icon_file).resize((24, 24))
-            icon_img = ImageTk.PhotoImage(icon)
+            icon_img = load_photo(self.assets_path / icon_file, (24, 24))
             setattr(self, f"{text.lower().replace(' ', '_')}_icon", icon_img)
         except:
             icon_img = None
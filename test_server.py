@@ -1,7 +1,12 @@
+import argparse
+import select
 import socket
 import time
 import numpy as np
 
+from utils.framing import LineFramer
+from utils.protocol import encode_control, encode_frames, encode_header, parse_control, parse_hello
+
 HOST = '127.0.0.1'
 PORT = 65432
 
@@ -9,7 +14,61 @@ base_pressure = 100
 decay_rate = 0.03
 t = 0
 
+# How long a new client gets to offer the binary protocol before we fall back to text
+HELLO_TIMEOUT = 1.0
+
+arg_parser = argparse.ArgumentParser(description="Simulated target testing station")
+arg_parser.add_argument("--protocol", choices=("auto", "text"), default="auto",
+                        help="auto: binary frames if the client asks for them, text otherwise")
+arg_parser.add_argument("--interval", type=float, default=5, help="seconds between samples")
+arg_parser.add_argument("--temperature-every", type=int, default=1, metavar="N",
+                        help="read the thermocouple on every Nth sample only, like the multi-rate rig")
+args = arg_parser.parse_args()
+
+
+def negotiate(conn):
+    """Returns the binary value size the client asked for, or None for text."""
+    if args.protocol == "text":
+        return None
+    conn.settimeout(HELLO_TIMEOUT)
+    try:
+        hello = conn.recv(256)
+    except socket.timeout:
+        hello = b""
+    finally:
+        conn.settimeout(None)
+    return parse_hello(hello.split(b"\n")[0])
+
+
+def serve_commands(conn, framer, valves, value_size, timeout):
+    """Waits up to timeout seconds, acknowledging any ``cmd`` lines that arrive."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        readable, _, _ = select.select([conn], [], [], remaining)
+        if not readable:
+            return
+        data = conn.recv(4096)
+        if not data:
+            raise ConnectionResetError("client closed the connection")
+        for line in framer.feed(data):
+            parsed = parse_control(line)
+            if parsed is None or parsed[0] != "cmd" or "seq" not in parsed[1]:
+                continue
+            fields = parsed[1]
+            if fields.get("valve") and fields.get("state") in ("open", "closed"):
+                valves[fields["valve"]] = fields["state"]
+                reply = f"ack seq={fields['seq']} ok=1"
+                print(f"🔧 Valve {fields['valve']} → {fields['state']}")
+            else:
+                reply = f"ack seq={fields['seq']} ok=0 error=unknown_command"
+            conn.sendall(encode_control(reply.encode(), binary=bool(value_size)))
+
+
 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     s.bind((HOST, PORT))
     s.listen(1)
     print("✅ Server listening on", HOST, PORT)
@@ -18,7 +77,16 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         conn, addr = s.accept()
         print("🔗 Connected by", addr)
         with conn:
+            value_size = negotiate(conn)
+            if value_size:
+                conn.sendall(encode_header(2, value_size))
+                print(f"📦 Speaking binary (float{value_size * 8})")
+            else:
+                print("📝 Speaking text")
+
             t = 0
+            framer = LineFramer()
+            valves = {}
             while True:
                 try:
                     # Base exponential decay
@@ -30,17 +98,27 @@ with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
                     pressure = max(0, min(pressure, 145))  # Clamp to 0–145 psi
 
                     temperature = 25 + np.sin(t / 8) + np.random.normal(0, 0.5)
+                    # Between thermocouple readings the channel is simply not sent
+                    sampled = t % args.temperature_every == 0
 
-                    msg = f"pressure={pressure:.2f},temperature={temperature:.2f}\n"
-                    conn.sendall(msg.encode())
-                    print("📤 Sent:", msg.strip())
+                    # t= is the sender-side timestamp; the GUI prefers it to arrival time
+                    sent = time.monotonic()
+                    if value_size:
+                        conn.sendall(encode_frames(t, [sent], [[pressure, temperature if sampled else np.nan]], value_size))
+                        print(f"📤 Sent #{t}: pressure={pressure:.2f}, temperature={temperature:.2f}")
+                    else:
+                        reading = f",temperature={temperature:.2f}" if sampled else ""
+                        msg = f"pressure={pressure:.2f}{reading},t={sent:.6f}\n"
+                        conn.sendall(msg.encode())
+                        print("📤 Sent:", msg.strip())
+
+                    # Status is repeated with every sample; the pump cycles every 30 samples
+                    pump = "active" if (t // 30) % 2 == 0 else "not_active"
+                    status = f"status chamber=sealed leak=sealed pump={pump}"
+                    conn.sendall(encode_control(status.encode(), binary=bool(value_size)))
 
                     t += 1
-                    time.sleep(5)
-                except ConnectionResetError:
+                    serve_commands(conn, framer, valves, value_size, args.interval)
+                except (ConnectionResetError, BrokenPipeError):
                     print("❌ Connection lost. Rewaiting for a new client...")
                     break
-
-
-
-
@@ -0,0 +1,240 @@
+"""
+Threshold and alarm engine, evaluated on the ingest thread.
+
+Alarms are declared once in ALARM_RULES, one AlarmRule per condition on
+one raw channel, read at that channel's native rate:
+
+    "high":  value >= limit raises; value < clear clears
+    "low":   value <= limit raises; value > clear clears
+    "rate":  |d value / dt| >= limit per second raises; < clear clears.
+             The rate is the secant between the means of the last two
+             debounce_s blocks of readings, so at high sample rates it
+             is not just sensor noise over one sample interval. When
+             readings are further apart than that (a block is empty), it
+             is the secant from the previous reading, which counts as
+             having held since that reading
+    "stuck": no change larger than limit for debounce_s seconds raises;
+             the next change clears
+
+limit and clear give the hysteresis band. A condition must hold over
+consecutive readings for debounce_s seconds before it raises or clears,
+so a single spike or dropout does nothing.
+
+Every rule is evaluated over a whole batch at once: the conditions are
+array comparisons, debounce is the start time of each run of true
+readings (a running maximum of run-start indices), and the alarm state
+is the last raise or clear decision carried forward the same way. The
+state between batches is a few scalars per rule, plus the last
+two debounce_s blocks of readings for a rate rule. Station.record() runs
+the engine before the batch is published, so an alarm never waits for
+the Tk thread; the time from a batch's arrival off the socket to its
+alarm events is kept per station, see AlarmEngine.latency_stats().
+
+Gap markers (rows that are NaN in every channel) break runs, and no rate
+or change is computed across one.
+"""
+from collections import deque, namedtuple
+
+import numpy as np
+
+from utils.alignment import gap_mask, native
+from utils.timebase import NS_PER_S, now_ns
+
+HIGH, LOW, RATE, STUCK = "high", "low", "rate", "stuck"
+RAISED, CLEARED = "raised", "cleared"
+
+# name: shown in the UI and the event log; channel: raw channel name;
+# kind: see the module docstring; limit, clear: channel units (per second
+# for "rate"; clear is unused for "stuck"); debounce_s: seconds
+AlarmRule = namedtuple("AlarmRule", "name channel kind limit clear debounce_s")
+
+ALARM_RULES = (
+    # The simulator clamps at 145 psi and the gauges stop at 155
+    AlarmRule("Over Pressure", "pressure", HIGH, 145.0, 140.0, 0.05),
+    AlarmRule("Pressure Rate", "pressure", RATE, 50.0, 25.0, 0.2),
+    AlarmRule("Pressure Stuck", "pressure", STUCK, 0.0, None, 30.0),
+    AlarmRule("Over Temperature", "temperature", HIGH, 40.0, 38.0, 1.0),
+    AlarmRule("Temperature Stuck", "temperature", STUCK, 0.0, None, 300.0),
+)
+
+# Alarm transition: t is the reading that completed the debounce
+AlarmTransition = namedtuple("AlarmTransition", "t name value")
+
+
+class _RuleState:
+    __slots__ = ("active", "raise_since", "clear_since", "last_t", "last_value", "history_t", "history_v", "warned")
+
+    def __init__(self):
+        self.active = False
+        self.raise_since = None  # start of the current run of readings meeting the raise condition
+        self.clear_since = None
+        self.last_t = None  # previous reading, for "stuck"
+        self.last_value = np.nan
+        # Readings of the last two debounce_s blocks, for "rate"
+        self.history_t = np.empty(0, dtype=np.int64)
+        self.history_v = np.empty(0)
+        self.warned = False  # readings too far apart for the rate blocks have been reported
+
+
+class AlarmEngine:
+    """
+    Evaluates alarm rules over one station's sample batches. Ingest thread only.
+
+    Readers on other threads use ``active``, which is replaced whole on
+    every transition, never mutated.
+
+    Args:
+        channels (tuple[str]): The station's raw channels, in column order.
+        rules (tuple[AlarmRule]): Rules on channels the station does not
+            have are ignored.
+    """
+
+    def __init__(self, channels, rules=ALARM_RULES):
+        self.channels = tuple(channels)
+        self.rules = tuple(rule for rule in rules if rule.channel in self.channels)
+        self.states = [_RuleState() for _ in self.rules]
+        self.active = {}  # name -> raised time (ns)
+        self.latencies = deque(maxlen=1000)  # seconds from batch arrival to its alarm events
+
+    def evaluate(self, times, values):
+        """
+        Runs every rule over a batch.
+
+        Args:
+            times (np.ndarray): int64 row timestamps.
+            values (np.ndarray): (n, channels) rows, NaN where not sampled.
+
+        Returns:
+            list[AlarmTransition]: Raises and clears, in time order.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        gaps = gap_mask(values.T)
+        transitions = []
+        for rule, state in zip(self.rules, self.states):
+            t, column = native(times, values[:, self.channels.index(rule.channel)], gaps)
+            if len(t):
+                transitions.extend(self._evaluate_rule(rule, state, np.asarray(t, dtype=np.int64), column))
+        if transitions:
+            transitions.sort(key=lambda transition: transition.t)
+            active = dict(self.active)
+            for transition in transitions:
+                if transition.value == RAISED:
+                    active[transition.name] = transition.t
+                else:
+                    active.pop(transition.name, None)
+            self.active = active
+        return transitions
+
+    def _evaluate_rule(self, rule, state, t, v):
+        debounce = int(rule.debounce_s * NS_PER_S)
+        clear_debounce = debounce
+        since = t
+        if rule.kind == STUCK:
+            prev_t = np.concatenate(([state.last_t if state.last_t is not None else t[0]], t[:-1]))
+            prev_v = np.concatenate(([state.last_value], v[:-1]))
+            state.last_t, state.last_value = int(t[-1]), float(v[-1])
+            change = v - prev_v  # NaN next to a gap or at the first reading
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if rule.kind == HIGH:
+                raise_cond, clear_cond = v >= rule.limit, v < rule.clear
+            elif rule.kind == LOW:
+                raise_cond, clear_cond = v <= rule.limit, v > rule.clear
+            elif rule.kind == RATE:
+                rate, since = _block_rate(state, t, v, debounce)
+                raise_cond, clear_cond = np.abs(rate) >= rule.limit, np.abs(rate) < rule.clear
+                if not state.warned and (since < t).any():
+                    state.warned = True
+                    spacing = float(np.max(t - since)) / NS_PER_S
+                    print(f"[Alarm] ⚠️ {rule.name}: readings {spacing:.1f} s apart, so the rate is taken between "
+                          f"consecutive readings; {rule.limit:g}/s needs a change of {rule.limit * spacing:g} between two")
+            elif rule.kind == STUCK:
+                raise_cond, clear_cond = np.abs(change) <= rule.limit, np.abs(change) > rule.limit
+                since = prev_t  # the value has been the same since the previous reading
+                clear_debounce = 0
+            else:
+                raise ValueError(f"unknown alarm kind {rule.kind!r}")
+
+        raise_start, state.raise_since = _run_starts(raise_cond, since, state.raise_since)
+        clear_start, state.clear_since = _run_starts(clear_cond, since, state.clear_since)
+        decision = np.where(raise_cond & (t - raise_start >= debounce), 1, np.where(clear_cond & (t - clear_start >= clear_debounce), 0, -1))
+
+        # Alarm state after each reading: the last decision, carried forward
+        index = np.maximum.accumulate(np.where(decision >= 0, np.arange(len(t)), -1))
+        active = np.where(index >= 0, decision[np.clip(index, 0, None)] == 1, state.active)
+        previous = np.concatenate(([state.active], active[:-1]))
+        state.active = bool(active[-1])
+        return [AlarmTransition(int(t[i]), rule.name, RAISED if active[i] else CLEARED) for i in np.flatnonzero(active != previous)]
+
+    def record_latency(self, arrival_ns):
+        """Notes the time from a batch's arrival to the end of its alarm handling."""
+        self.latencies.append((now_ns() - arrival_ns) / NS_PER_S)
+
+    def latency_stats(self):
+        """Arrival-to-alarm latency summary in seconds, or None before the first batch."""
+        latencies = np.array(self.latencies.copy())  # copy() is atomic; iterating is not
+        if len(latencies) == 0:
+            return None
+        return {
+            "count": len(latencies),
+            "last": float(latencies[-1]),
+            "mean": float(latencies.mean()),
+            "p95": float(np.percentile(latencies, 95)),
+            "max": float(latencies.max()),
+        }
+
+
+def _block_rate(state, t, v, lag_ns):
+    """
+    Per second rate at each reading, and the time it holds from: the mean of the readings in the last
+    lag_ns against the mean of those in the lag_ns before, over the
+    difference of their mean times. Averaging keeps sensor noise out of
+    the rate at any sample rate. Where readings are lag_ns or more apart,
+    so a block is empty, it is the secant from the previous reading instead.
+    NaN across a gap marker.
+    """
+    lag_ns = max(lag_ns, 1)
+    all_t = np.concatenate((state.history_t, t))
+    all_v = np.concatenate((state.history_v, v))
+    missing = np.isnan(all_v)
+    seconds = np.where(missing, 0.0, (all_t - all_t[0]) / NS_PER_S)
+    sum_v = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, all_v))))
+    sum_t = np.concatenate(([0.0], np.cumsum(seconds)))
+    count = np.concatenate(([0], np.cumsum(~missing)))
+    gaps = np.concatenate(([0], np.cumsum(missing)))
+
+    end = np.arange(len(state.history_t), len(all_t)) + 1
+    middle = np.searchsorted(all_t, t - lag_ns, side="right")
+    start = np.searchsorted(all_t, t - 2 * lag_ns, side="right")
+    recent, earlier = count[end] - count[middle], count[middle] - count[start]
+    blocks = (recent > 0) & (earlier > 0)
+    # Readings at least lag_ns apart: from the previous row (NaN itself if
+    # it is a gap marker). Faster readings with an empty block, just after
+    # the start or a gap, get no rate rather than one-interval noise
+    previous = np.maximum(end - 2, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dv = (sum_v[end] - sum_v[middle]) / recent - (sum_v[middle] - sum_v[start]) / earlier
+        dt = (sum_t[end] - sum_t[middle]) / recent - (sum_t[middle] - sum_t[start]) / earlier
+        slow = ~blocks & (end >= 2) & (t - all_t[previous] >= lag_ns)
+        secant = np.where(slow, (v - all_v[previous]) / ((t - all_t[previous]) / NS_PER_S), np.nan)
+        rate = np.where(blocks, np.where(gaps[end] == gaps[start], dv / dt, np.nan), secant)
+
+    # Keep what the next batch's blocks can reach back to, and the last row
+    keep = min(int(np.searchsorted(all_t, all_t[-1] - 2 * lag_ns, side="right")), len(all_t) - 1)
+    state.history_t, state.history_v = all_t[keep:], all_v[keep:]
+    # A secant already spans the time since the previous reading, more than lag_ns
+    return rate, np.where(slow, all_t[previous], t)
+
+
+def _run_starts(cond, since, carried):
+    """
+    For each reading, when the run of true conditions it belongs to began
+    (only meaningful where cond is true), and the value to carry into the
+    next batch. A run that was true at the end of the last batch continues
+    from ``carried``.
+    """
+    n = len(cond)
+    previous = np.concatenate(([carried is not None], cond[:-1]))
+    index = np.maximum.accumulate(np.where(cond & ~previous, np.arange(n), -1))
+    starts = np.where(index >= 0, since[np.clip(index, 0, None)], carried if carried is not None else 0)
+    return starts, (int(starts[-1]) if cond[-1] else None)
@@ -0,0 +1,199 @@
+"""
+Multi-rate channel alignment.
+
+Channels are kept at their native rates. A row in the ring buffer or the
+sample store holds NaN for every channel that was not sampled at that
+instant, so a slow thermocouple costs one value per reading and nothing
+is forward-filled at ingest. A row that is NaN in every channel is a link
+gap marker (see Station.mark_gap).
+
+Aligned views are computed on demand, for just the window being read:
+
+    "last":   the latest reading at or before each target time (sample and hold)
+    "linear": linear interpolation between the readings on either side
+    "mean":   the mean of the readings since the previous target time, which
+              brings a fast channel down to a slow channel's clock
+
+Each policy is a few ``searchsorted`` / ``interp`` / ``cumsum`` calls over
+the native readings. None of them bridges a gap marker: a target whose
+readings sit on both sides of an outage comes out NaN.
+"""
+import numpy as np
+
+POLICIES = ("last", "linear", "mean")
+
+
+def gap_mask(columns):
+    """True for gap-marker rows, i.e. rows that are NaN in every channel."""
+    columns = [np.asarray(column) for column in columns]
+    mask = np.isnan(columns[0])
+    for column in columns[1:]:
+        mask &= np.isnan(column)
+    return mask
+
+
+def native(times, column, gaps=None):
+    """
+    The readings of one channel at its own rate.
+
+    Args:
+        times (np.ndarray): int64 row timestamps.
+        column (np.ndarray): The channel's values, NaN where it was not sampled.
+        gaps (np.ndarray, optional): Gap-marker mask from gap_mask(). Gap rows
+            are kept (as NaN) so plots and fits still break at outages.
+
+    Returns:
+        tuple: (times, values). Views of the inputs when every row is a reading.
+    """
+    keep = ~np.isnan(column)
+    if gaps is not None:
+        keep |= gaps
+    if keep.all():
+        return times, column
+    return times[keep], column[keep]
+
+
+def align(target, times, column, policy="last", gap_times=None, max_age_ns=None):
+    """
+    Resamples one channel onto target timestamps.
+
+    Args:
+        target (np.ndarray): int64 timestamps to produce values for, non-decreasing.
+        times (np.ndarray): int64 timestamps of the channel's rows, non-decreasing.
+        column (np.ndarray): The channel's values; NaN rows are ignored.
+        policy (str): "last", "linear" or "mean", see the module docstring.
+        gap_times (np.ndarray, optional): Sorted timestamps of gap markers.
+        max_age_ns (int, optional): "last" only: readings older than this are NaN.
+
+    Returns:
+        np.ndarray: float64 values, one per target; NaN where there is no reading.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy must be one of {POLICIES}")
+    target = np.asarray(target, dtype=np.int64)
+    times, values = native(np.asarray(times, dtype=np.int64), np.asarray(column, dtype=np.float64))
+    out = np.full(len(target), np.nan)
+    if len(times) == 0 or len(target) == 0:
+        return out
+    gaps = np.asarray(gap_times if gap_times is not None else (), dtype=np.int64)
+
+    if policy == "mean":
+        # Bin i is (target[i-1], target[i]]; the first bin is as wide as the second
+        starts = np.empty_like(target)
+        starts[1:] = target[:-1]
+        starts[0] = target[0] - (target[1] - target[0] if len(target) > 1 else 0)
+        lo = np.searchsorted(times, starts, side="right")
+        hi = np.searchsorted(times, target, side="right")
+        if len(target) == 1:
+            lo[0] = np.searchsorted(times, target[0], side="left")
+        sums = np.concatenate(([0.0], np.cumsum(values)))
+        counts = hi - lo
+        filled = counts > 0
+        out[filled] = (sums[hi[filled]] - sums[lo[filled]]) / counts[filled]
+        # A gap in (start, target] means the bin spans an outage
+        crossed = np.searchsorted(gaps, target, side="right") - np.searchsorted(gaps, starts, side="right")
+        out[crossed > 0] = np.nan
+        return out
+
+    # Index of the latest reading at or before each target
+    before = np.searchsorted(times, target, side="right") - 1
+    valid = before >= 0
+    prev = np.clip(before, 0, None)
+
+    if policy == "last":
+        out[valid] = values[prev[valid]]
+        if max_age_ns is not None:
+            out[target - times[prev] > max_age_ns] = np.nan
+        # A gap in [reading, target) means the reading is from before an outage
+        crossed = np.searchsorted(gaps, target, side="left") - np.searchsorted(gaps, times[prev], side="left")
+        out[crossed > 0] = np.nan
+        out[~valid] = np.nan
+        return out
+
+    # Linear: interpolate in float seconds relative to the first reading, so
+    # large monotonic_ns values keep full precision
+    origin = times[0]
+    x = (times - origin).astype(np.float64)
+    out = np.interp((target - origin).astype(np.float64), x, values, left=np.nan, right=np.nan)
+    if len(gaps):
+        following = np.clip(before + 1, 0, len(times) - 1)
+        exact = valid & (times[prev] == target)
+        crossed = np.searchsorted(gaps, times[following], side="left") - np.searchsorted(gaps, times[prev], side="left")
+        out[(crossed > 0) & ~exact] = np.nan
+    return out
+
+
+def last_readings(values):
+    """
+    Latest reading of each channel in an (n, n_channels) block, NaN for a
+    channel with none.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    sampled = ~np.isnan(values)
+    last = len(values) - 1 - np.argmax(sampled[::-1], axis=0)
+    out = values[last, np.arange(values.shape[1])] if len(values) else np.full(values.shape[1], np.nan)
+    out[~sampled.any(axis=0)] = np.nan
+    return out
+
+
+class AlignedView:
+    """
+    Sparse, multi-rate rows with aligned views produced on demand.
+
+    Holds references to the columns it is given, not copies; every method
+    computes just what it returns.
+
+    Args:
+        times (np.ndarray): int64 row timestamps, non-decreasing.
+        columns (dict): Channel name -> values, NaN where not sampled.
+    """
+
+    def __init__(self, times, columns):
+        self.times = np.asarray(times, dtype=np.int64)
+        self.columns = dict(columns)
+        self.gaps = gap_mask(list(self.columns.values()))
+        self.gap_times = self.times[self.gaps]
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """From a RingSnapshot (channel-major values)."""
+        return cls(snapshot.times, dict(zip(snapshot.channels, snapshot.values)))
+
+    @classmethod
+    def from_records(cls, records):
+        """From SampleStore.read_range() records."""
+        return cls(records["t"], {name: records[name] for name in records.dtype.names[1:]})
+
+    def native(self, name, keep_gaps=True):
+        """One channel's readings at its own rate, see native()."""
+        return native(self.times, self.columns[name], self.gaps if keep_gaps else None)
+
+    def align(self, name, target, policy="last", max_age_ns=None):
+        """One channel resampled onto target timestamps, see align()."""
+        return align(target, self.times, self.columns[name], policy, self.gap_times, max_age_ns)
+
+    def on(self, base, policies=None, keep_gaps=False):
+        """
+        Every channel on the native clock of one of them.
+
+        Args:
+            base (str): Channel whose readings set the clock, e.g. "pressure".
+            policies (dict, optional): Channel name -> policy for the others;
+                "last" unless given.
+            keep_gaps (bool): Also emit the gap-marker rows (all NaN).
+
+        Returns:
+            tuple: (times, {name: values}) with every array the length of times.
+        """
+        policies = policies or {}
+        times, base_values = self.native(base, keep_gaps)
+        aligned = {}
+        for name in self.columns:
+            if name == base:
+                aligned[name] = base_values
+            else:
+                values = self.align(name, times, policies.get(name, "last"))
+                if keep_gaps:
+                    values[np.isnan(base_values)] = np.nan  # gap rows stay gaps
+                aligned[name] = values
+        return times, aligned
@@ -0,0 +1,83 @@
+"""
+Blitting helper for high-rate matplotlib plots embedded in Tk.
+
+A full Agg redraw re-renders axes, ticks, grid and labels every frame. Here
+the static parts are rendered once into a cached background and each frame
+only restores that background and redraws the animated line artists.
+"""
+import time
+
+
+class BlitManager:
+    """
+    Redraws a fixed set of artists on top of a cached background.
+
+    The refresh interval adapts to the measured cost of a blit so that drawing
+    takes at most ``budget`` of the Tk event loop's time.
+
+    Args:
+        canvas (FigureCanvasTkAgg): Canvas the artists are drawn on.
+        artists (list[Artist]): Artists that change every frame.
+        min_interval (float): Shortest refresh interval in seconds (fastest rate).
+        max_interval (float): Longest refresh interval in seconds.
+        budget (float): Fraction of wall time drawing may use, between 0 and 1.
+    """
+
+    def __init__(self, canvas, artists, min_interval=0.01, max_interval=1.0, budget=0.3):
+        self.canvas = canvas
+        self.artists = list(artists)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.budget = budget
+
+        self.background = None
+        self.draw_cost = 0.0
+        self.interval = min_interval
+
+        for artist in self.artists:
+            artist.set_animated(True)
+        self.cid = canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.draw()
+
+    @property
+    def interval_ms(self):
+        return max(1, int(self.interval * 1000))
+
+    def on_draw(self, event):
+        # Animated artists are skipped by a normal draw, so this is the bare background
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_artists()
+
+    def draw_artists(self):
+        figure = self.canvas.figure
+        for artist in self.artists:
+            figure.draw_artist(artist)
+
+    def update(self):
+        """Blits the current state of the artists and re-tunes the refresh interval."""
+        start = time.perf_counter()
+        if self.background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_artists()
+            self.canvas.blit(self.canvas.figure.bbox)
+        self.record_cost(time.perf_counter() - start)
+
+    def invalidate(self):
+        """Re-renders the background after limits, ticks or labels changed."""
+        start = time.perf_counter()
+        self.canvas.draw()
+        self.record_cost(time.perf_counter() - start)
+
+    def record_cost(self, cost):
+        self.draw_cost = cost if self.draw_cost == 0.0 else 0.8 * self.draw_cost + 0.2 * cost
+        self.interval = min(max(self.draw_cost / self.budget, self.min_interval), self.max_interval)
+
+    def close(self):
+        """Returns the artists to normal drawing."""
+        self.canvas.mpl_disconnect(self.cid)
+        for artist in self.artists:
+            artist.set_animated(False)
+        self.background = None
+        self.canvas.draw_idle()
@@ -0,0 +1,146 @@
+"""
+Sequenced, acknowledged commands to a station (valve moves and the like).
+
+The UI thread submits commands; they wait in an outbox until the end of
+the UI frame, when everything submitted in that frame goes out as one
+batch in a single socket write. The ingest thread marks them sent, matches
+acks by sequence number, and times out the ones that never get one. Every
+acknowledged command records its round-trip latency.
+"""
+from collections import deque
+
+import numpy as np
+
+from utils.protocol import encode_command
+from utils.timebase import NS_PER_S, now_ns
+
+# A command with no ack after this long is reported as timed out
+COMMAND_TIMEOUT = 2.0
+
+QUEUED, SENT, ACKED, FAILED, TIMED_OUT = "queued", "sent", "acked", "failed", "timeout"
+
+
+class Command:
+    """One command and its lifecycle timestamps (monotonic ns)."""
+
+    __slots__ = ("station", "seq", "fields", "status", "error", "queued_ns", "sent_ns", "done_ns")
+
+    def __init__(self, station, seq, fields):
+        self.station = station
+        self.seq = seq
+        self.fields = fields
+        self.status = QUEUED
+        self.error = None
+        self.queued_ns = now_ns()
+        self.sent_ns = None
+        self.done_ns = None
+
+    @property
+    def latency(self):
+        """Round-trip seconds from the socket write to the ack, once acked."""
+        if self.status != ACKED:
+            return None
+        return (self.done_ns - self.sent_ns) / NS_PER_S
+
+    def encode(self):
+        return encode_command(self.seq, self.fields)
+
+    def __repr__(self):
+        return f"Command({self.station} #{self.seq} {self.fields} {self.status})"
+
+
+class CommandChannel:
+    """
+    Command bookkeeping for one station.
+
+    submit() and take_outbox() are called on the UI thread; everything else
+    on the ingest thread, so neither side needs a lock.
+
+    Args:
+        station (str): Station name, stamped on each command.
+        timeout (float): Seconds to wait for an ack.
+    """
+
+    def __init__(self, station, timeout=COMMAND_TIMEOUT):
+        self.station = station
+        self.timeout_ns = int(timeout * NS_PER_S)
+        self.next_seq = 1
+        self.outbox = []
+        self.pending = {}
+        self.latencies = deque(maxlen=1000)  # seconds, acked commands only
+        self.timeouts = 0
+        self.failures = 0
+
+    def submit(self, **fields):
+        """Queues a command for the next batch. UI thread only."""
+        command = Command(self.station, self.next_seq, fields)
+        self.next_seq += 1
+        self.outbox.append(command)
+        return command
+
+    def take_outbox(self):
+        """Returns everything submitted since the last batch. UI thread only."""
+        batch, self.outbox = self.outbox, []
+        return batch
+
+    def mark_sent(self, commands):
+        sent = now_ns()
+        for command in commands:
+            command.status = SENT
+            command.sent_ns = sent
+            self.pending[command.seq] = command
+
+    def acknowledge(self, seq, ok=True, error=None):
+        """Completes the pending command with this sequence number, if any."""
+        command = self.pending.pop(seq, None)
+        if command is None:
+            return None
+        command.done_ns = now_ns()
+        if ok:
+            command.status = ACKED
+            self.latencies.append(command.latency)
+        else:
+            command.status = FAILED
+            command.error = error or "rejected"
+            self.failures += 1
+        return command
+
+    def fail(self, commands, error):
+        done = now_ns()
+        for command in commands:
+            self.pending.pop(command.seq, None)
+            command.status = FAILED
+            command.error = error
+            command.done_ns = done
+            self.failures += 1
+        return commands
+
+    def fail_pending(self, error):
+        return self.fail(list(self.pending.values()), error)
+
+    def expire(self):
+        """Times out pending commands older than the timeout."""
+        now = now_ns()
+        expired = [c for c in self.pending.values() if now - c.sent_ns > self.timeout_ns]
+        for command in expired:
+            del self.pending[command.seq]
+            command.status = TIMED_OUT
+            command.error = "no ack"
+            command.done_ns = now
+            self.timeouts += 1
+        return expired
+
+    def latency_stats(self):
+        """Round-trip latency summary in seconds, or None before the first ack."""
+        latencies = np.array(self.latencies.copy())  # copy() is atomic; iterating is not
+        if len(latencies) == 0:
+            return None
+        return {
+            "count": len(latencies),
+            "last": float(latencies[-1]),
+            "mean": float(latencies.mean()),
+            "p95": float(np.percentile(latencies, 95)),
+            "max": float(latencies.max()),
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
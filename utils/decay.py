@@ -0,0 +1,164 @@
+"""
+Streaming exponential-decay fit for the Rate of Fall Test.
+
+A chamber pressure that falls towards an asymptote follows
+
+    P(t) = P_inf + (P_0 - P_inf) * exp(-t / tau)
+
+which is the solution of dP/dt = a * P + b with a = -1/tau and
+b = P_inf / tau. Integrated from the start of the fit, that is linear
+in three unknowns:
+
+    P(t) = P_0 + a * I(t) + b * t,    I(t) = ∫ P dt (trapezoids)
+
+so the decay is an ordinary least-squares fit on the regressors
+(1, I, t). That form works at any sample spacing and never differences
+noisy readings. StreamingDecay keeps the normal equations (a 3x3 matrix
+and a 3-vector of sums), so each batch costs O(n) in numpy and reading
+the fit is one 3x3 solve, whatever the test length.
+
+From the fit it predicts when pressure crosses a threshold, and how sure
+that is: the confidence is the probability, from the standard error of
+P_inf, that the asymptote lies on the predicted side of the threshold.
+A test whose asymptote sits well clear of the threshold can be passed
+without waiting out its full duration.
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# t0: fit start (seconds since the run origin); p0, asymptote: pressure;
+# tau: seconds (inf while not decaying); time_to_threshold: seconds after the
+# last sample, 0.0 if already crossed, inf if never; confidence: 0..1
+DecayFit = namedtuple("DecayFit", "t0 p0 tau asymptote time_to_threshold confidence n")
+
+EMPTY_FIT = DecayFit(np.nan, np.nan, math.inf, np.nan, math.inf, 0.0, 0)
+
+# Fewer samples than this and the fit is not published
+MIN_SAMPLES = 8
+
+
+def predict(fit, times):
+    """The fitted decay curve at times (seconds since the run origin)."""
+    times = np.asarray(times, dtype=np.float64)
+    if fit.n == 0 or not math.isfinite(fit.tau):
+        return np.full(times.shape, np.nan)
+    return fit.asymptote + (fit.p0 - fit.asymptote) * np.exp(-(times - fit.t0) / fit.tau)
+
+
+class StreamingDecay:
+    """
+    Expanding-window exponential-decay fit, restarted at the start of each test.
+
+    extend() runs on the ingest thread. restart() and stop() may be called
+    from the Tk thread: they only set ``start``, which the next extend()
+    acts on. The published ``fit`` is replaced whole, never mutated.
+
+    Args:
+        threshold (float): Pressure whose crossing is predicted.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.start = None  # seconds; None while no test is running
+        self.fit_start = None
+        self.fit = EMPTY_FIT
+        self._clear()
+
+    def _clear(self):
+        self.sxx = np.zeros((3, 3))
+        self.sxy = np.zeros(3)
+        self.syy = 0.0
+        self.n = 0
+        self.t0 = None
+        self.last_t = None
+        self.last_p = None
+        self.integral = 0.0
+
+    def restart(self, t_s):
+        """Fits only samples from t_s on, e.g. a test start."""
+        self.start = t_s
+
+    def stop(self):
+        """Stops fitting; the last fit stays published."""
+        self.start = None
+
+    def extend(self, seconds, pressure):
+        """
+        Adds pressure readings in order. A NaN reading (gap marker) restarts
+        the fit after it, since the integral cannot be carried across an outage.
+        """
+        start = self.start
+        if start is None:
+            self.fit_start = None
+            return
+        if start != self.fit_start:
+            self.fit_start = start
+            self._clear()
+            self.fit = EMPTY_FIT
+
+        seconds = np.asarray(seconds, dtype=np.float64)
+        pressure = np.asarray(pressure, dtype=np.float64)
+        keep = seconds >= start
+        seconds, pressure = seconds[keep], pressure[keep]
+        gaps = np.flatnonzero(np.isnan(pressure))
+        if len(gaps):
+            self._clear()
+            seconds, pressure = seconds[gaps[-1] + 1:], pressure[gaps[-1] + 1:]
+        if len(seconds) == 0:
+            return
+
+        if self.t0 is None:
+            self.t0, self.last_t, self.last_p = float(seconds[0]), float(seconds[0]), float(pressure[0])
+        t = np.concatenate(([self.last_t], seconds))
+        p = np.concatenate(([self.last_p], pressure))
+        integral = self.integral + np.cumsum(np.diff(t) * (p[1:] + p[:-1]) * 0.5)
+
+        x = np.column_stack((np.ones(len(seconds)), integral, seconds - self.t0))
+        self.sxx += x.T @ x
+        self.sxy += x.T @ pressure
+        self.syy += float(pressure @ pressure)
+        self.n += len(seconds)
+        self.last_t, self.last_p, self.integral = float(seconds[-1]), float(pressure[-1]), float(integral[-1])
+        self.fit = self._solve()
+
+    def _solve(self):
+        if self.n < MIN_SAMPLES:
+            return EMPTY_FIT
+        # Column scaling keeps the 3x3 solve well conditioned as I(t) grows
+        scale = np.sqrt(np.diag(self.sxx))
+        if not scale.all():
+            return EMPTY_FIT
+        a = self.sxx / np.outer(scale, scale)
+        try:
+            inverse = np.linalg.inv(a)
+        except np.linalg.LinAlgError:
+            return EMPTY_FIT
+        theta = inverse @ (self.sxy / scale) / scale
+        p0, rate, offset = theta.tolist()
+        if not rate < 0:
+            return DecayFit(self.t0, p0, math.inf, np.nan, math.inf, 0.0, self.n)
+
+        tau = -1.0 / rate
+        asymptote = -offset / rate
+        residual = max(self.syy - float(theta @ self.sxy), 0.0)
+        variance = residual / max(self.n - 3, 1)
+        covariance = variance * inverse / np.outer(scale, scale)
+        gradient = np.array((0.0, offset / rate ** 2, -1.0 / rate))
+        sigma = math.sqrt(max(float(gradient @ covariance @ gradient), 0.0))
+
+        # Remaining time from the fitted (not the raw) current pressure
+        elapsed = self.last_t - self.t0
+        now = asymptote + (p0 - asymptote) * math.exp(-elapsed / tau)
+        ratio = (self.threshold - asymptote) / (now - asymptote) if now != asymptote else 0.0
+        if ratio <= 0:
+            remaining = math.inf  # the threshold is beyond the asymptote
+        elif ratio >= 1:
+            remaining = 0.0
+        else:
+            remaining = -tau * math.log(ratio)
+
+        margin = abs(asymptote - self.threshold)
+        confidence = 1.0 if sigma == 0 else 0.5 * (1 + math.erf(margin / (sigma * math.sqrt(2))))
+        return DecayFit(self.t0, p0, tau, asymptote, remaining, confidence, self.n)
@@ -0,0 +1,140 @@
+"""
+Derived channels, computed once at ingest and stored next to the raw ones.
+
+Each derived channel is declared once in DERIVED_CHANNELS as a vectorized
+function of the batch being ingested (as the ring is written, or as an
+attached GUI follows it). The engine runs them in order on
+every batch as it arrives, carrying just enough state (the previous
+pressure reading, the latest temperature) for the results to be
+independent of how samples were split into batches. The output is one row
+per pressure reading, at the same timestamps, written to a SampleStore in
+the run directory (``derived/``). Exports and analysis read those values
+instead of recomputing them from raw samples.
+
+Gap markers pass through as all-NaN rows, and nothing is differenced
+across one.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from utils.alignment import align, gap_mask, native
+from utils.sample_store import SampleStore
+from utils.telemetry_bus import SampleBatch
+from utils.leak import compensate
+from utils.timebase import NS_PER_S
+from utils.trend import VOLUME_M3
+
+# compute(c) gets a dict of equal-length arrays: "t" (seconds), "pressure",
+# "temperature" (latest reading, held), "prev_t" and "prev_pressure" (the
+# previous pressure reading, NaN after a gap), plus every channel declared
+# before this one
+DerivedChannel = namedtuple("DerivedChannel", "name unit compute")
+
+
+def _dpdt(c):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = (c["pressure"] - c["prev_pressure"]) / (c["t"] - c["prev_t"])
+    rate[~np.isfinite(rate)] = np.nan  # repeated timestamps
+    return rate
+
+
+DERIVED_CHANNELS = (
+    DerivedChannel("dpdt", "Pa/s", _dpdt),
+    DerivedChannel("leak_rate", "Pa·m³/s", lambda c: c["dpdt"] * VOLUME_M3),
+    DerivedChannel("pressure_comp", "Pa", lambda c: compensate(c["pressure"], c["temperature"])),
+)
+
+
+def open_derived_store(store, channels=DERIVED_CHANNELS):
+    """The derived-channel store next to a run's samples, or None without a recording."""
+    if store is None:
+        return None
+    path = store.path / "derived"
+    if store.readonly:
+        if not (path / "meta.json").exists():
+            return None
+        return SampleStore(path, readonly=True)
+    return SampleStore(path, channels=[channel.name for channel in channels], origin_ns=store.origin_ns)
+
+
+class DerivedEngine:
+    """
+    Computes the derived channels of one station, batch by batch. Ingest thread only.
+
+    Args:
+        store (SampleStore, optional): Where derived rows are written, see open_derived_store().
+        channels (tuple[DerivedChannel]): What to compute, in dependency order.
+    """
+
+    def __init__(self, store=None, channels=DERIVED_CHANNELS):
+        self.store = store
+        self.channels = tuple(channels)
+        self.names = tuple(channel.name for channel in self.channels)
+        self.prev_t = np.nan
+        self.prev_pressure = np.nan
+        self.temperature_t = None  # latest temperature reading, carried between batches
+        self.temperature = np.nan
+        self.latest = dict.fromkeys(self.names, np.nan)
+
+    def extend(self, batch, origin_ns):
+        """
+        Computes and stores the derived rows for a raw batch.
+
+        Args:
+            batch (SampleBatch): Raw (pressure, temperature) rows, NaN where not sampled.
+            origin_ns (int): Run origin; derived maths works in seconds from it.
+
+        Returns:
+            SampleBatch: Derived values, one row per pressure reading or gap marker.
+        """
+        values = np.asarray(batch.values, dtype=np.float64)
+        gaps = gap_mask(values.T)
+        times, pressure = native(batch.times, values[:, 0], gaps)
+        if len(times) == 0:
+            self._carry_temperature(batch.times, values[:, 1], gaps)
+            return SampleBatch(times, np.empty((0, len(self.names))), batch.station)
+
+        c = {
+            "t": (times - origin_ns) / NS_PER_S,
+            "pressure": pressure,
+            "temperature": self._temperature(times, batch.times, values[:, 1], gaps),
+        }
+        c["prev_t"] = np.concatenate(([self.prev_t], c["t"][:-1]))
+        c["prev_pressure"] = np.concatenate(([self.prev_pressure], pressure[:-1]))
+        for channel in self.channels:
+            c[channel.name] = channel.compute(c)
+
+        derived = np.column_stack([c[name] for name in self.names])
+        derived[np.isnan(pressure)] = np.nan  # gap rows stay gaps
+        self.prev_t, self.prev_pressure = float(c["t"][-1]), float(pressure[-1])
+        self._carry_temperature(batch.times, values[:, 1], gaps)
+
+        for i, name in enumerate(self.names):
+            readings = derived[:, i][~np.isnan(derived[:, i])]
+            if len(readings):
+                self.latest[name] = float(readings[-1])
+        if self.store is not None and not self.store.readonly:
+            self.store.extend(times, derived)
+        return SampleBatch(times, derived, batch.station)
+
+    def _temperature(self, targets, times, temperature, gaps):
+        # Held temperature at each pressure reading, starting from the one carried in
+        gap_times = times[gaps]
+        if self.temperature_t is not None:
+            times = np.concatenate(([self.temperature_t], times))
+            temperature = np.concatenate(([self.temperature], temperature))
+        return align(targets, times, temperature, "last", gap_times)
+
+    def _carry_temperature(self, times, temperature, gaps):
+        readings = np.flatnonzero(~np.isnan(temperature))
+        last_gap = np.flatnonzero(gaps)
+        if len(readings) and (not len(last_gap) or readings[-1] > last_gap[-1]):
+            self.temperature_t, self.temperature = int(times[readings[-1]]), float(temperature[readings[-1]])
+        elif len(last_gap):
+            # An outage after the last reading: nothing to hold across it
+            self.temperature_t, self.temperature = None, np.nan
+
+    def sync(self):
+        if self.store is not None and not self.store.readonly:
+            self.store.sync()
@@ -0,0 +1,176 @@
+"""
+Event timeline for a station: valve moves, status transitions, test
+start/stop, leak onsets and alarms.
+
+Events are kept in memory in timestamp order, with a parallel list of
+times that every query bisects, and appended to ``events.jsonl`` in the
+run directory. They use the same int64 monotonic_ns timebase as the
+sample store, so a window found here is a range read there:
+
+    log.around(spike_ns, 2.0)                        # events within ±2 s of a dP spike
+    for t0, t1 in log.spans("valve", "He", "open", "closed"):
+        store.read_range(t0, t1)                     # pressure while He was open
+
+Queries cost O(log n + k) for k matching events, so plots and reports can
+overlay events on every redraw without scanning anything.
+"""
+import bisect
+import json
+import os
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+from utils.timebase import NS_PER_S, now_ns
+
+# t: int64 monotonic_ns; kind: "valve", "status", "test", "leak" or "alarm";
+# name: valve, status field, test name, "onset" or alarm name; value: new state
+Event = namedtuple("Event", "t kind name value")
+
+VALVE, STATUS, TEST, LEAK, ALARM = "valve", "status", "test", "leak", "alarm"
+
+
+class EventLog:
+    """
+    Sorted, append-mostly event log for one station.
+
+    Events may be recorded from any thread (valve acks and status on the
+    ingest thread, test start/stop on the Tk thread); a lock keeps the
+    index consistent.
+
+    Args:
+        path (str | Path, optional): JSON-lines file. Existing events are
+            loaded; without a path the log is memory-only.
+        readonly (bool): Follow a log written by another process; see refresh().
+    """
+
+    def __init__(self, path=None, readonly=False):
+        self.path = Path(path) if path is not None else None
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        self.times = []
+        self.events = []
+        self.file = None
+        self.read_offset = 0
+
+        if self.path is not None and self.path.exists():
+            self.refresh()
+        if self.path is not None and not readonly:
+            self.file = open(self.path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return len(self.events)
+
+    def record(self, kind, name, value=None, t_ns=None):
+        """Adds an event, stamped now unless t_ns is given, and returns it."""
+        event = Event(now_ns() if t_ns is None else int(t_ns), kind, name, value)
+        with self.lock:
+            self._insert(event)
+            if self.file is not None:
+                self.file.write(json.dumps(event._asdict()) + "\n")
+                self.file.flush()
+        return event
+
+    def append(self, kind, name, value=None, t_ns=None):
+        """
+        Like record(), but on a read-only follower the event is still written
+        to the file, for events that start in an attached GUI (test
+        start/stop) and belong in the run's log. The line goes out in one
+        O_APPEND write, so it never interleaves with the owner's lines, and
+        is loaded back through refresh().
+        """
+        if not self.readonly or self.path is None:
+            return self.record(kind, name, value, t_ns)
+        event = Event(now_ns() if t_ns is None else int(t_ns), kind, name, value)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, (json.dumps(event._asdict()) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+        self.refresh()
+        return event
+
+    def _insert(self, event):
+        # Events nearly always arrive in order; out-of-order ones are placed by bisect
+        if not self.times or event.t >= self.times[-1]:
+            self.times.append(event.t)
+            self.events.append(event)
+        else:
+            i = bisect.bisect_right(self.times, event.t)
+            self.times.insert(i, event.t)
+            self.events.insert(i, event)
+
+    def refresh(self):
+        """Loads events appended to the file since the last call (read-only followers)."""
+        # Polled every few ms: a stat is cheap, opening and reading the file is not
+        if self.path is None:
+            return
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return
+        if size <= self.read_offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.read_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # a partly written last line waits for the next call
+        with self.lock:
+            for line in data[:end].splitlines():
+                try:
+                    self._insert(Event(**json.loads(line)))
+                except (ValueError, TypeError):
+                    continue
+        self.read_offset += end
+
+    def between(self, t_start, t_end, kind=None):
+        """Events with ``t_start <= t <= t_end``, in time order, optionally of one kind."""
+        with self.lock:
+            lo = bisect.bisect_left(self.times, t_start)
+            hi = bisect.bisect_right(self.times, t_end)
+            events = self.events[lo:hi]
+        if kind is not None:
+            events = [e for e in events if e.kind == kind]
+        return events
+
+    def around(self, t_ns, window_s=2.0, kind=None):
+        """Events within ±window_s seconds of t_ns."""
+        window = int(window_s * NS_PER_S)
+        return self.between(t_ns - window, t_ns + window, kind)
+
+    def last_before(self, t_ns, kind=None, name=None):
+        """The latest event at or before t_ns matching kind/name, or None."""
+        with self.lock:
+            for i in range(bisect.bisect_right(self.times, t_ns) - 1, -1, -1):
+                event = self.events[i]
+                if (kind is None or event.kind == kind) and (name is None or event.name == name):
+                    return event
+        return None
+
+    def spans(self, kind, name, start_value, end_value, t_start=0, t_end=None):
+        """
+        Intervals between an event that sets name to start_value and the next
+        one that sets it to end_value, e.g. valve He from "open" to "closed".
+
+        Returns:
+            list[tuple]: (t_open, t_close) pairs; t_close is None while still open.
+        """
+        events = self.between(t_start, t_end if t_end is not None else now_ns(), kind)
+        spans = []
+        opened = None
+        for event in events:
+            if event.name != name:
+                continue
+            if event.value == start_value and opened is None:
+                opened = event.t
+            elif event.value == end_value and opened is not None:
+                spans.append((opened, event.t))
+                opened = None
+        if opened is not None:
+            spans.append((opened, None))
+        return spans
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,167 @@
+"""
+Stream framing for the instrument telemetry link.
+
+TCP does not preserve message boundaries: a single recv() can return half a
+line, several lines, or both. The classes here carry partial lines across
+reads and hand back every complete frame in one batch.
+
+Frames may carry the sender's own timestamp as a trailing ``t=<seconds>``
+field. Parsed samples are (pressure, temperature, sent) tuples, with
+``sent`` NaN when the sender did not stamp the frame. A channel may be left
+out of a frame when it was not sampled (slow thermocouples); it parses as
+NaN, see utils.alignment.
+
+Lines starting with a control keyword (``ack ...``, ``status ...``) are not samples; they
+are collected in ``controls`` for the ingest engine to dispatch.
+"""
+
+NO_TIMESTAMP = float("nan")
+NOT_SAMPLED = float("nan")
+
+CONTROL_PREFIXES = (b"ack ", b"status ")
+
+
+class LineFramer:
+    """
+    Splits a byte stream into newline-terminated frames.
+
+    Bytes after the last newline are kept in an internal bytearray and
+    prepended to the next chunk, so frames split across reads are rebuilt.
+
+    Args:
+        max_line (int): Longest partial line kept before it is discarded as garbage.
+    """
+
+    def __init__(self, max_line=4096):
+        self.buffer = bytearray()
+        self.max_line = max_line
+        self.overflows = 0
+
+    def feed(self, data):
+        """
+        Appends a chunk and returns the complete lines it finished.
+
+        Args:
+            data (bytes | bytearray | memoryview): Raw bytes from the socket.
+
+        Returns:
+            list[bytes]: Complete lines, without their terminators.
+        """
+        buf = self.buffer
+        buf += data
+        end = buf.rfind(b"\n")
+        if end < 0:
+            if len(buf) > self.max_line:
+                # A peer that never sends a newline must not grow us forever
+                buf.clear()
+                self.overflows += 1
+            return []
+
+        lines = bytes(memoryview(buf)[:end]).split(b"\n")
+        del buf[:end + 1]
+        return lines
+
+    def reset(self):
+        self.buffer.clear()
+
+
+class TelemetryParser:
+    """
+    Parses ``pressure=..,temperature=..[,t=..]`` lines from a byte stream.
+
+    Malformed frames are counted and skipped instead of raising, so one bad
+    line never stops ingest.
+
+    Args:
+        recv_size (int): Size of the reusable receive buffer used by read_from().
+    """
+
+    def __init__(self, recv_size=65536):
+        self.framer = LineFramer()
+        self.recv_buffer = bytearray(recv_size)
+        self.recv_view = memoryview(self.recv_buffer)
+        self.frames = 0
+        self.malformed = 0
+        self.controls = []
+
+    def read_from(self, sock):
+        """
+        Reads one chunk from a connected socket and parses it.
+
+        Args:
+            sock (socket.socket): Connected stream socket.
+
+        Returns:
+            list[tuple] | None: Parsed (pressure, temperature, sent) samples,
+            or None once the peer has closed the connection.
+        """
+        n = sock.recv_into(self.recv_buffer)
+        if n == 0:
+            return None
+        return self.feed(self.recv_view[:n])
+
+    def feed(self, data):
+        """
+        Parses every complete line in a chunk.
+
+        Args:
+            data (bytes | bytearray | memoryview): Raw bytes from the socket.
+
+        Returns:
+            list[tuple]: (pressure, temperature, sent) for each well-formed line.
+        """
+        samples = []
+        append = samples.append
+        for line in self.framer.feed(data):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(CONTROL_PREFIXES):
+                self.controls.append(line)
+                continue
+            self.frames += 1
+            sample = parse_telemetry_line(line)
+            if sample is None:
+                self.malformed += 1
+            else:
+                append(sample)
+        return samples
+
+    def reset(self):
+        self.framer.reset()
+
+
+def parse_telemetry_line(line):
+    """
+    Parses a single ``pressure=..,temperature=..[,t=..]`` line.
+
+    Args:
+        line (bytes): One frame, without its newline.
+
+    Returns:
+        tuple | None: (pressure, temperature, sent) as floats, with NaN for
+        a channel or timestamp the frame leaves out, or None if malformed.
+    """
+    # Fast path for the exact layout the station sends
+    if line.startswith(b"pressure="):
+        pressure, sep, temperature = line[9:].partition(b",temperature=")
+        if sep:
+            temperature, stamped, sent = temperature.partition(b",t=")
+            try:
+                return float(pressure), float(temperature), float(sent) if stamped else NO_TIMESTAMP
+            except ValueError:
+                return None
+
+    # Slow path: tolerate reordered fields, stray spaces and unsampled channels
+    fields = {}
+    for part in line.split(b","):
+        key, sep, value = part.partition(b"=")
+        if not sep:
+            return None
+        try:
+            fields[key.strip()] = float(value)
+        except ValueError:
+            return None
+    if b"pressure" not in fields and b"temperature" not in fields:
+        return None
+    return fields.get(b"pressure", NOT_SAMPLED), fields.get(b"temperature", NOT_SAMPLED), fields.get(b"t", NO_TIMESTAMP)
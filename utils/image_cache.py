@@ -0,0 +1,136 @@
+"""
+Process-wide cache of decoded, resized Tk images.
+
+Icons are requested by (file, size, variant). Hits come from an in-memory
+LRU of PhotoImage objects. Misses first try a pre-resized PNG in the on-disk
+cache, keyed by the source file's content hash, which Tk loads natively
+without going through PIL. Only when that is missing too is the source
+decoded and resampled with PIL, and the result written back to disk.
+"""
+import hashlib
+import json
+import os
+import tkinter as tk
+from collections import OrderedDict
+from pathlib import Path
+
+from PIL import Image, ImageOps, ImageTk
+
+ASSETS_PATH = Path(__file__).resolve().parent.parent / "assets"
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "images"
+
+# Optional transforms applied after resizing, selected by the variant name
+VARIANTS = {
+    None: None,
+    "grayscale": lambda image: ImageOps.grayscale(image).convert("RGBA"),
+}
+
+
+class ImageCache:
+    """
+    LRU cache of PhotoImages backed by a content-addressed on-disk cache.
+
+    Widgets must keep their own reference to the images they display (as the
+    pages already do); eviction only drops the cache's reference.
+
+    Args:
+        max_entries (int): PhotoImages kept in memory.
+        cache_dir (Path): Directory for pre-resized PNGs, or None to disable it.
+    """
+
+    def __init__(self, max_entries=128, cache_dir=CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.images = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # path -> [mtime_ns, size, sha1], so unchanged assets are not re-hashed
+        self.manifest_path = cache_dir / "manifest.json" if cache_dir else None
+        self.manifest = {}
+        if self.manifest_path and self.manifest_path.exists():
+            try:
+                self.manifest = json.loads(self.manifest_path.read_text())
+            except (OSError, ValueError):
+                self.manifest = {}
+
+    def get(self, file, size, variant=None):
+        """
+        Returns a PhotoImage of an asset resized to ``size``.
+
+        Args:
+            file (str | Path): File name inside assets/, or an absolute path.
+            size (tuple[int, int]): Target (width, height).
+            variant (str, optional): Key into VARIANTS.
+
+        Returns:
+            tk.PhotoImage | ImageTk.PhotoImage: The cached image.
+        """
+        path = Path(file)
+        if not path.is_absolute():
+            path = ASSETS_PATH / path
+        key = (str(path), tuple(size), variant)
+
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return image
+
+        image = self.load(path, tuple(size), variant)
+        self.images[key] = image
+        if len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+        return image
+
+    def load(self, path, size, variant):
+        cached = None
+        if self.cache_dir:
+            digest = self.content_hash(path)
+            cached = self.cache_dir / f"{digest}_{size[0]}x{size[1]}_{variant or 'normal'}.png"
+            if cached.exists():
+                self.disk_hits += 1
+                return tk.PhotoImage(file=str(cached))
+
+        self.misses += 1
+        image = Image.open(path).resize(size)
+        transform = VARIANTS[variant]
+        if transform:
+            image = transform(image)
+
+        if cached is not None:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp = cached.with_name(cached.name + ".tmp")
+                image.save(tmp, format="PNG")
+                os.replace(tmp, cached)
+                return tk.PhotoImage(file=str(cached))
+            except (OSError, tk.TclError):
+                pass
+        return ImageTk.PhotoImage(image)
+
+    def content_hash(self, path):
+        stat = path.stat()
+        entry = self.manifest.get(str(path))
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+
+        digest = hashlib.sha1(path.read_bytes()).hexdigest()
+        self.manifest[str(path)] = [stat.st_mtime_ns, stat.st_size, digest]
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.manifest_path.with_name("manifest.json.tmp")
+            tmp.write_text(json.dumps(self.manifest))
+            os.replace(tmp, self.manifest_path)
+        except OSError:
+            pass
+        return digest
+
+
+_cache = ImageCache()
+
+
+def load_photo(file, size, variant=None):
+    """Returns a cached PhotoImage of ``file`` resized to ``size``. See ImageCache.get."""
+    return _cache.get(file, size, variant)
@@ -0,0 +1,461 @@
+"""
+asyncio ingest engine for one or more target testing stations.
+
+Every station connection runs as a task on a single event-loop thread. Each
+station has its own framing state, reconnect state, ring buffer and
+(optionally) sample store and trends. Going from 1 to 32 stations adds
+tasks and buffers, not threads.
+
+Connections are supervised: a station that drops, refuses or goes silent is
+retried with jittered exponential backoff. Each outage is written into the
+station's series as a NaN gap marker and kept in its outage log, and the
+station's link state is published on the bus "link" topic.
+
+Commands (valve moves) go back out on the same connection, batched per UI
+frame, and their acks come back in the stream; completed commands are
+published on the "command" topic. Status reports also arrive in the
+stream; a station whose status changed is published on "status". Valve
+moves, status transitions, leak onsets and alarms go into the station's
+event log. Alarms are evaluated on every batch before it is published.
+"""
+import asyncio
+import random
+import threading
+import time
+import traceback
+from collections import deque
+
+import numpy as np
+
+from utils.alarms import RAISED, AlarmEngine
+from utils.alignment import gap_mask, last_readings, native
+from utils.commands import ACKED, CommandChannel
+from utils.derived import DerivedEngine, open_derived_store
+from utils.events import ALARM, LEAK, STATUS, VALVE, EventLog
+from utils.onset import OnsetDetector
+from utils.protocol import ProtocolError, ProtocolParser, parse_control
+from utils.status import StatusTracker, open_status_store
+from utils.telemetry_bus import SampleBatch
+from utils.timebase import NS_PER_S, SenderClock, elapsed_seconds, now_ns
+
+READ_SIZE = 65536
+
+# Station selector entry that shows every station at once
+ALL_STATIONS = "All stations"
+
+# A link that delivers nothing for this long is treated as dead
+STALL_TIMEOUT = 15.0
+
+# How often unacknowledged commands are checked for timeouts and status
+# transitions are committed to disk
+WATCH_INTERVAL = 0.25
+
+LINK_CONNECTING, LINK_UP, LINK_DOWN = "connecting", "up", "down"
+
+
+class Backoff:
+    """
+    Jittered exponential backoff: the nth retry waits between half and all of
+    ``initial * factor**n``, capped at ``maximum``. Jitter keeps stations that
+    dropped together from reconnecting in lockstep.
+    """
+
+    def __init__(self, initial=0.5, maximum=30.0, factor=2.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.attempt = 0
+
+    def next_delay(self):
+        delay = min(self.maximum, self.initial * self.factor ** self.attempt)
+        self.attempt += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self):
+        self.attempt = 0
+
+
+class Station:
+    """
+    Connection settings and per-station state.
+
+    Args:
+        name (str): Display name, also used to tag published batches.
+        host (str): Instrument host.
+        port (int): Instrument port.
+        samples (RingBuffer): Live buffer this station writes.
+        store (SampleStore, optional): On-disk recording.
+        trends (dict, optional): StreamingTrend objects fed with pressure,
+            against seconds since the run origin.
+        parser (optional): Wire decoder, e.g. a LabVIEWParser. Defaults to a
+            ProtocolParser, which negotiates binary frames or falls back to text.
+        leak (StreamingLeak, optional): Temperature-compensated leak fit, fed
+            with compensated pressure.
+        decay (StreamingDecay, optional): Rate of Fall Test fit, fed with
+            pressure while a test runs.
+    """
+
+    def __init__(self, name, host, port, samples, store=None, trends=None, parser=None, leak=None, decay=None):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.samples = samples
+        self.store = store
+        self.trends = trends or {}
+        self.leak = leak
+        self.decay = decay
+        self.parser = parser or ProtocolParser(len(samples.channels))
+        self.clock = SenderClock()
+        self.writer = None
+
+        # Commands to the station, and the valve states it has acknowledged
+        self.commands = CommandChannel(name)
+        self.valves = {}
+
+        # dP/dt, leak rate and compensated pressure, computed as samples arrive
+        self.derived = DerivedEngine(open_derived_store(store))
+
+        # Leak onset, latched from a CUSUM on dP/dt
+        self.onset = OnsetDetector()
+
+        # Threshold, rate and stuck-sensor alarms on the raw channels
+        self.alarms = AlarmEngine(samples.channels)
+
+        # Chamber / leak detector / pump status reported by the station
+        self.status = StatusTracker(open_status_store(store))
+
+        # Valve, status and test events, next to the recording
+        self.events = EventLog(store.path / "events.jsonl" if store is not None else None,
+                               readonly=store is not None and store.readonly)
+
+        # t = 0 for plots, fits and exports; shared with the recording
+        self.origin_ns = store.origin_ns if store is not None else now_ns()
+
+        self.sample_counter = 0
+        self.latest_pressure = 100.0
+        self.latest_temperature = 25.0
+
+        # Link supervision
+        self.link_state = LINK_CONNECTING
+        self.connects = 0
+        self.attempts = 0
+        self.last_error = None
+        self.down_since = now_ns()
+        self.reconnect_latencies = deque(maxlen=100)  # seconds from link loss to reconnect
+        self.outages = deque(maxlen=1000)  # (down wall time, up wall time, seconds)
+
+    @property
+    def connected(self):
+        return self.link_state == LINK_UP
+
+    def link_metrics(self):
+        """Snapshot of link health for the UI and logs."""
+        latencies = self.reconnect_latencies
+        return {
+            "state": self.link_state,
+            "connects": self.connects,
+            "attempts": self.attempts,
+            "outages": len(self.outages),
+            "downtime": sum(seconds for _, _, seconds in self.outages),
+            "last_reconnect": latencies[-1] if latencies else None,
+            "mean_reconnect": sum(latencies) / len(latencies) if latencies else None,
+            "last_error": self.last_error,
+        }
+
+    def elapsed(self, times):
+        """Seconds since the run origin for int64 nanosecond timestamps."""
+        return elapsed_seconds(times, self.origin_ns)
+
+    def link_up(self):
+        now = now_ns()
+        if self.connects:
+            # Reconnect: the time since the link was lost is one outage
+            latency = (now - self.down_since) / NS_PER_S
+            wall = time.time()
+            self.reconnect_latencies.append(latency)
+            self.outages.append((wall - latency, wall, latency))
+            self.mark_gap()
+        self.clock.reset(now)
+        self.link_state = LINK_UP
+        self.connects += 1
+        self.attempts = 0
+
+    def link_down(self, error=None):
+        if self.link_state == LINK_UP:
+            self.down_since = now_ns()
+        self.link_state = LINK_DOWN
+        self.last_error = error
+
+    def mark_gap(self):
+        """Writes one NaN sample, stamped when the link was lost, so plots and fits break at the outage."""
+        times = self.clock.monotonic(np.array([self.down_since], dtype=np.int64))
+        gap = np.full((1, len(self.samples.channels)), np.nan)
+        self.record(SampleBatch(times, gap, self.name))
+
+    def record(self, batch, arrival_ns=None):
+        """
+        Writes a batch into this station's buffers. Ingest thread only.
+
+        arrival_ns is when the batch came off the socket; alarm latency is
+        measured from it.
+        """
+        self.check_alarms(batch, arrival_ns)
+        self.samples.extend(batch.times, batch.values)
+        if self.store is not None:
+            self.store.extend(batch.times, batch.values)
+        self.track(batch)
+
+    def check_alarms(self, batch, arrival_ns=None):
+        """Evaluates the alarm rules on a batch and logs raises and clears."""
+        transitions = self.alarms.evaluate(batch.times, batch.values)
+        if not self.events.readonly:
+            # Attached GUIs evaluate too, but the daemon's log already has the events
+            for transition in transitions:
+                self.events.record(ALARM, transition.name, transition.value, transition.t)
+        if arrival_ns is not None:
+            self.alarms.record_latency(arrival_ns)
+        for transition in transitions:
+            print(f"[Alarm] {'🚨' if transition.value == RAISED else '✅'} {self.name}: {transition.name} {transition.value}"
+                  + (f" ({self.alarms.latencies[-1] * 1000:.2f} ms after arrival)" if arrival_ns is not None else ""))
+
+    def track(self, batch):
+        """Updates derived channels, trends, fits and latest values for samples already in the buffers."""
+        # Channels may arrive at different rates; trends see pressure readings and gaps only
+        times, pressures = native(batch.times, batch.values[:, 0], gap_mask(batch.values.T))
+        seconds = self.elapsed(times)
+        for trend in self.trends.values():
+            trend.extend(seconds, pressures)
+        # Derived rows line up with those pressure readings
+        derived = self.derived.extend(batch, self.origin_ns)
+        onset_ns = self.onset.extend(derived.times, derived.values[:, self.derived.names.index("dpdt")])
+        if onset_ns is not None and not self.events.readonly:
+            # Attached GUIs latch too, but the daemon's log already has the event
+            self.events.record(LEAK, "onset", "detected", onset_ns)
+        if self.leak is not None:
+            self.leak.extend(seconds, derived.values[:, self.derived.names.index("pressure_comp")], np.isnan(pressures))
+        if self.decay is not None:
+            self.decay.extend(seconds, pressures)
+        pressure, temperature = last_readings(batch.values).tolist()
+        if not np.isnan(pressure):
+            self.latest_pressure = pressure
+        if not np.isnan(temperature):
+            self.latest_temperature = temperature
+
+
+class IngestEngine:
+    """
+    Runs all station connections on one asyncio event loop in a background thread.
+
+    Args:
+        bus (TelemetryBus): Parsed batches are published on its "samples"
+            topic, and a Station on "link" whenever its link state changes.
+        backoff (callable): Makes the Backoff used for each station's retries.
+        stall_timeout (float): Seconds without data before a link counts as dead.
+    """
+
+    def __init__(self, bus, backoff=Backoff, stall_timeout=STALL_TIMEOUT):
+        self.bus = bus
+        self.backoff = backoff
+        self.stall_timeout = stall_timeout
+        self.stations = {}
+        self.loop = None
+        self.thread = None
+        self.tasks = {}
+        # Checked by the read loops too: wait_for() can swallow a cancel
+        # that lands as a read completes, leaving the task running
+        self.stopping = False
+
+    def add_station(self, station):
+        self.stations[station.name] = station
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._start_station, station)
+        return station
+
+    def start(self):
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="ingest", daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def stop(self, timeout=5):
+        """
+        Stops every station and waits for the ingest thread to finish.
+
+        Returns:
+            bool: False if the thread is still running after timeout; it may
+            still be writing, so its buffers must not be closed.
+        """
+        if self.loop is None:
+            return True
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._cancel_all)
+        self.thread.join(timeout=timeout)
+        if self.thread.is_alive():
+            print(f"[Ingest] ⚠️ ingest thread still running {timeout} s after stop")
+            return False
+        return True
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.tasks[None] = self.loop.create_task(self.watch_stations())
+        for station in self.stations.values():
+            self._start_station(station)
+        self.loop.call_soon(ready.set)
+        try:
+            self.loop.run_forever()
+            # Let cancelled station tasks close their connections
+            tasks = list(self.tasks.values())
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            self.loop.close()
+            for station in self.stations.values():
+                if station.store is not None:
+                    station.store.sync()
+                station.derived.sync()
+                station.status.sync()
+                station.events.close()
+
+    def _start_station(self, station):
+        self.tasks[station.name] = self.loop.create_task(self.run_station(station))
+
+    def _cancel_all(self):
+        self.stopping = True
+        for task in self.tasks.values():
+            task.cancel()
+        self.loop.stop()
+
+    async def run_station(self, station):
+        backoff = self.backoff()
+        while not self.stopping:
+            station.attempts += 1
+            try:
+                reader, writer = await asyncio.open_connection(station.host, station.port)
+            except OSError as e:
+                self.set_link_down(station, str(e))
+                await asyncio.sleep(backoff.next_delay())
+                continue
+
+            station.link_up()
+            station.writer = writer
+            received = station.sample_counter
+            # Offer the binary protocol; text-only stations just ignore this
+            hello = station.parser.hello()
+            if hello:
+                writer.write(hello)
+            self.bus.publish("link", station)
+            latency = station.reconnect_latencies[-1] if station.connects > 1 else None
+            print(f"[Ingest] ✅ {station.name} connected to {station.host}:{station.port}"
+                  + (f" after {latency:.1f} s" if latency is not None else ""))
+            try:
+                await self.read_station(station, reader)
+                error = "connection closed"
+            except (OSError, asyncio.TimeoutError, ProtocolError) as e:
+                error = str(e) or type(e).__name__
+            except Exception as e:
+                # A bug in the read path must not end the task silently and
+                # leave the station showing as up with no data
+                traceback.print_exc()
+                error = f"internal error: {type(e).__name__}: {e}"
+            finally:
+                station.writer = None
+                station.parser.reset()
+                station.clock.reset()
+                writer.close()
+            if self.stopping:
+                return
+            if station.sample_counter != received:
+                # Only a session that delivered data resets the backoff, so a
+                # peer that accepts and drops at once is still retried slowly
+                backoff.reset()
+            print(f"[Ingest] ❌ {station.name} link lost:", error)
+            self.set_link_down(station, error)
+            await asyncio.sleep(backoff.next_delay())
+
+    def set_link_down(self, station, error):
+        # Published on every failed attempt too, so the UI can show retry progress
+        station.link_down(error)
+        self.bus.publish("link", station)
+        self.publish_commands(station.commands.fail_pending("link lost"))
+
+    async def read_station(self, station, reader):
+        parser = station.parser
+        reported_malformed, reported_lost = parser.malformed, parser.lost
+        while not self.stopping:
+            data = await asyncio.wait_for(reader.read(READ_SIZE), self.stall_timeout)
+            if not data:
+                return
+            samples = parser.feed(data)
+            if len(samples):
+                self.ingest(station, samples)
+            controls = parser.drain_controls()
+            if controls:
+                self.handle_controls(station, controls)
+            if parser.malformed != reported_malformed:
+                print(f"[Ingest] ⚠️ {station.name}: skipped {parser.malformed - reported_malformed} malformed frame(s)")
+                reported_malformed = parser.malformed
+            if parser.lost != reported_lost:
+                print(f"[Ingest] ⚠️ {station.name}: {parser.lost - reported_lost} frame(s) missing from the sequence")
+                reported_lost = parser.lost
+
+    def ingest(self, station, samples):
+        arrival = now_ns()
+        station.sample_counter += len(samples)
+        block = np.asarray(samples, dtype=np.float64)
+        sent = block[:, -1]
+        if np.isnan(sent).any():
+            # Unstamped frames share the time since the previous chunk
+            times = station.clock.spread(len(block), arrival)
+        else:
+            times = station.clock.map(sent, arrival)
+        batch = SampleBatch(times, block[:, :-1], station.name)
+        station.record(batch, arrival)
+        self.bus.publish("samples", batch)
+
+    def handle_controls(self, station, controls):
+        status_changed = False
+        for line in controls:
+            message = parse_control(line)
+            if message is None:
+                continue
+            kind, fields = message
+            if kind == "ack" and fields.get("seq", "").isdigit():
+                command = station.commands.acknowledge(int(fields["seq"]), fields.get("ok", "1") == "1", fields.get("error"))
+                if command is not None:
+                    if command.status == ACKED and "valve" in command.fields:
+                        station.valves[command.fields["valve"]] = command.fields["state"]
+                        station.events.record(VALVE, command.fields["valve"], command.fields["state"], command.done_ns)
+                    self.publish_commands([command])
+            elif kind == "status":
+                changes = station.status.update(fields)
+                for field, _, value in changes:
+                    station.events.record(STATUS, field, value, station.status.last_ns)
+                status_changed |= bool(changes)
+        if status_changed:
+            station.status.flush()
+            # Repeated reports change nothing and publish nothing
+            self.bus.publish("status", station)
+
+    def send_commands(self, station, commands):
+        """Sends one batch of commands in a single write. Any thread."""
+        self.loop.call_soon_threadsafe(self._write_commands, station, commands)
+
+    def _write_commands(self, station, commands):
+        if station.writer is None:
+            self.publish_commands(station.commands.fail(commands, "link down"))
+        elif not station.parser.supports_commands:
+            self.publish_commands(station.commands.fail(commands, "station does not take commands"))
+        else:
+            station.writer.write(b"".join(command.encode() for command in commands))
+            station.commands.mark_sent(commands)
+
+    async def watch_stations(self):
+        while True:
+            await asyncio.sleep(WATCH_INTERVAL)
+            for station in self.stations.values():
+                self.publish_commands(station.commands.expire())
+                station.status.sync()
+
+    def publish_commands(self, commands):
+        for command in commands:
+            self.bus.publish("command", command)
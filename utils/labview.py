@@ -0,0 +1,136 @@
+"""
+Ingest adapter for the LabVIEW TCP bridge (``LabVIEW/EME 185B LabVIEW.vi``).
+
+LabVIEW sends each block the usual way for TCP Write: a big-endian u32
+byte count, then the block flattened to string. Flatten To String is
+big-endian, and a 2D DBL array flattens to two i32 dimension sizes
+followed by the data in row-major order. Blocks come straight from DAQmx
+Read (2D DBL, one row per channel), in one of two layouts:
+
+    "array":    2D DBL [channels][samples]
+    "waveform": cluster {t0 DBL (seconds), dt DBL (seconds), 2D DBL [channels][samples]}
+
+Each block is decoded with one ``numpy.frombuffer`` call and one transpose,
+never one scalar at a time, so a 1 kHz multi-channel stream costs a few
+NumPy calls per block. Output rows match the other parsers:
+(channels..., sent), where sent is the sender-side time of each sample.
+"""
+import struct
+
+import numpy as np
+
+from utils.protocol import ProtocolError
+
+LENGTH = struct.Struct(">I")
+DIMS = struct.Struct(">ii")
+TIMING = struct.Struct(">dd")
+LAYOUTS = ("array", "waveform")
+
+# Largest block accepted; anything bigger is a framing error, not data
+MAX_BLOCK_BYTES = 64 << 20
+
+
+class LabVIEWParser:
+    """
+    Decodes length-prefixed, flattened LabVIEW waveform blocks.
+
+    Args:
+        n_channels (int): Rows expected in each block.
+        layout (str): "array" or "waveform", see the module docstring.
+        sample_rate (float, optional): Samples per second per channel, used to
+            time "array" blocks, which carry no timing of their own. Without
+            it, every sample in a block takes the block's arrival time.
+    """
+
+    protocol = "labview"
+    supports_commands = False
+
+    def __init__(self, n_channels=2, layout="array", sample_rate=None):
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of {LAYOUTS}")
+        self.n_channels = n_channels
+        self.layout = layout
+        self.sample_rate = sample_rate
+        self.buffer = bytearray()
+        self.frames = 0
+        self.malformed = 0
+        self.lost = 0
+        self.samples_seen = 0
+
+    def hello(self):
+        # The VI does not negotiate; it starts streaming on connect
+        return b""
+
+    def drain_controls(self):
+        return []
+
+    def feed(self, data):
+        """
+        Returns an (n, n_channels + 1) float64 array of every sample in the
+        blocks completed by this chunk.
+        """
+        buf = self.buffer
+        buf += data
+        blocks = []
+        offset = 0
+        while len(buf) - offset >= LENGTH.size:
+            (size,) = LENGTH.unpack_from(buf, offset)
+            if size > MAX_BLOCK_BYTES:
+                raise ProtocolError(f"LabVIEW block of {size} bytes; stream out of sync")
+            end = offset + LENGTH.size + size
+            if end > len(buf):
+                break
+            # Slicing copies the block out, so the buffer stays resizable
+            blocks.append(self.decode_block(buf[offset + LENGTH.size:end]))
+            offset = end
+        del buf[:offset]
+
+        if not blocks:
+            return np.empty((0, self.n_channels + 1))
+        self.frames += len(blocks)
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+    def decode_block(self, payload):
+        if len(payload) < DIMS.size + (TIMING.size if self.layout == "waveform" else 0):
+            raise ProtocolError(f"LabVIEW block of {len(payload)} bytes is too short")
+        t0 = dt = None
+        header = 0
+        if self.layout == "waveform":
+            t0, dt = TIMING.unpack_from(payload)
+            header = TIMING.size
+        rows, cols = DIMS.unpack_from(payload, header)
+        header += DIMS.size
+        if rows != self.n_channels or cols < 0 or len(payload) != header + 8 * rows * cols:
+            raise ProtocolError(f"LabVIEW block is {rows}x{cols}, expected {self.n_channels} channels")
+
+        # One call for the whole block, big-endian doubles to native
+        data = np.frombuffer(payload, dtype=">f8", count=rows * cols, offset=header)
+        block = np.empty((cols, rows + 1))
+        block[:, :-1] = data.reshape(rows, cols).T
+
+        index = np.arange(cols, dtype=np.float64)
+        if t0 is not None:
+            block[:, -1] = t0 + index * dt
+        elif self.sample_rate:
+            block[:, -1] = (self.samples_seen + index) / self.sample_rate
+        else:
+            block[:, -1] = np.nan
+        self.samples_seen += cols
+        return block
+
+    def reset(self):
+        self.buffer.clear()
+        self.samples_seen = 0
+
+
+def encode_block(values, t0=None, dt=None):
+    """
+    Flattens a (channels, samples) block the way the VI does, with its
+    length prefix. For simulators and tests.
+    """
+    values = np.asarray(values, dtype=">f8")
+    payload = b""
+    if t0 is not None:
+        payload += TIMING.pack(t0, dt)
+    payload += DIMS.pack(*values.shape) + values.tobytes()
+    return LENGTH.pack(len(payload)) + payload
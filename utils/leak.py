@@ -0,0 +1,195 @@
+"""
+Temperature-compensated leak analysis.
+
+For a fixed amount of gas in a fixed volume, P/T is constant, so a chamber
+that warms or cools changes pressure without leaking. Pressure is first
+normalized to a reference temperature (ideal gas, temperatures in kelvin):
+
+    P_comp = P * T_ref / T
+
+and the leak rate is the slope of P_comp over time, times the chamber volume.
+
+The slope is a blocked-median Theil-Sen fit, so it is robust and still O(n):
+
+ 1. the series is cut into ``blocks`` equal runs of samples, and each is
+    reduced to its median time and median P_comp (a partition per block,
+    not a sort);
+ 2. the slope is the median of the pairwise slopes between those block
+    points (O(blocks²), independent of n), and the intercept the median
+    residual.
+
+A spike or dropout inside a block does not move its median, and a whole
+block thrown off (a valve transient) is outvoted by the other pairs.
+
+leak_fit() takes one run, or a 2D array with one equal-length run per row
+for bulk re-analysis; StreamingLeak applies the same two steps block by
+block for live display.
+"""
+import warnings
+from collections import deque, namedtuple
+
+import numpy as np
+
+from utils.trend import VOLUME_M3
+
+KELVIN = 273.15
+
+# Temperature that compensated pressure is normalized to
+REFERENCE_TEMPERATURE_C = 25.0
+
+# Block points per fit; 32 points make 496 pairwise slopes
+DEFAULT_BLOCKS = 32
+
+# slope and intercept of P_comp in pressure units per second; leak_rate = slope * volume
+LeakFit = namedtuple("LeakFit", "slope intercept leak_rate")
+
+
+def compensate(pressure, temperature_c, reference_c=REFERENCE_TEMPERATURE_C):
+    """Pressure normalized to reference_c by the ideal-gas law; NaN where temperature is unknown."""
+    return np.asarray(pressure, dtype=np.float64) * ((reference_c + KELVIN) / (np.asarray(temperature_c, dtype=np.float64) + KELVIN))
+
+
+def block_medians(times, values, blocks=DEFAULT_BLOCKS):
+    """
+    Reduces a series (or one series per row) to ``blocks`` median points.
+
+    When the length does not divide evenly, the oldest samples are dropped.
+    NaN values are ignored; a block with none left is NaN.
+
+    Returns:
+        tuple: (block times, block values), shape (..., blocks).
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    n = values.shape[-1]
+    blocks = min(blocks, n)
+    if blocks == 0:
+        empty = np.empty(values.shape[:-1] + (0,))
+        return empty, empty
+    size = n // blocks
+    start = n - blocks * size
+    shape = values.shape[:-1] + (blocks, size)
+    t = np.broadcast_to(times, values.shape)[..., start:].reshape(shape)
+    y = values[..., start:].reshape(shape)
+
+    missing = np.isnan(y)
+    if not missing.any():
+        return np.median(t, axis=-1), np.median(y, axis=-1)
+    t = np.where(missing, np.nan, t)
+    return _nanmedian(t), _nanmedian(y)
+
+
+def theil_sen(x, y):
+    """
+    Median pairwise slope and median intercept along the last axis, NaN-aware.
+
+    Returns:
+        tuple: (slope, intercept); NaN with fewer than two usable points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    i, j = np.triu_indices(x.shape[-1], 1)
+    dx = x[..., j] - x[..., i]
+    dy = y[..., j] - y[..., i]
+    if len(i) == 0:
+        nan = np.full(x.shape[:-1], np.nan)
+        return nan, nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(dx != 0, dy / dx, np.nan)
+    slope = _nanmedian(slopes)
+    return slope, _nanmedian(y - np.expand_dims(slope, -1) * x)
+
+
+def leak_fit(times, pressure, temperature_c=None, blocks=DEFAULT_BLOCKS, volume_m3=VOLUME_M3):
+    """
+    Temperature-compensated, robust leak fit of one run or many.
+
+    Args:
+        times (np.ndarray): Seconds, shape (n,) or matching pressure.
+        pressure (np.ndarray): Shape (n,) or (runs, n); NaN gaps are ignored.
+        temperature_c (np.ndarray, optional): Aligned with pressure, in °C.
+            Without it pressure is fitted as is.
+        blocks (int): Block points per fit, see the module docstring.
+        volume_m3 (float): Chamber volume.
+
+    Returns:
+        LeakFit: Floats for one run, arrays of shape (runs,) for many.
+    """
+    values = pressure if temperature_c is None else compensate(pressure, temperature_c)
+    slope, intercept = theil_sen(*block_medians(times, values, blocks))
+    if np.ndim(slope) == 0:
+        slope, intercept = float(slope), float(intercept)
+    return LeakFit(slope, intercept, slope * volume_m3)
+
+
+class StreamingLeak:
+    """
+    leak_fit() over a sliding window of samples, updated as they arrive.
+
+    Samples are collected into blocks of ``window // blocks``; each finished
+    block is reduced to its median point and the fit is redone over the last
+    ``blocks`` points, which costs O(blocks²) once per block, nothing per
+    sample. A gap marker restarts the window, as StreamingTrend does.
+
+    Args:
+        window (int): Samples covered by the fit.
+        blocks (int): Block points per fit.
+    """
+
+    def __init__(self, window, blocks=DEFAULT_BLOCKS):
+        self.blocks = max(2, min(blocks, window // 2))
+        self.block_size = max(1, window // self.blocks)
+        self.points = deque(maxlen=self.blocks)
+        self.pending_t = []
+        self.pending_y = []
+        self.fit = LeakFit(0.0, 0.0, 0.0)
+
+    def reset(self):
+        self.points.clear()
+        self.pending_t, self.pending_y = [], []
+        self.fit = LeakFit(0.0, 0.0, 0.0)
+
+    def extend(self, times, values, gaps=None):
+        """
+        Adds samples in order.
+
+        Args:
+            times (np.ndarray): Seconds.
+            values (np.ndarray): Compensated pressure; NaN (unknown temperature) is skipped.
+            gaps (np.ndarray, optional): Boolean mask of gap-marker rows.
+        """
+        if gaps is not None and gaps.any():
+            # Only what follows the last gap counts
+            last_gap = int(np.flatnonzero(gaps)[-1])
+            self.reset()
+            times, values = times[last_gap + 1:], values[last_gap + 1:]
+        keep = ~np.isnan(values)
+        self.pending_t.extend(np.asarray(times)[keep].tolist())
+        self.pending_y.extend(np.asarray(values)[keep].tolist())
+
+        size = self.block_size
+        full = len(self.pending_y) // size
+        if full == 0:
+            return
+        t, y = block_medians(self.pending_t[:full * size], self.pending_y[:full * size], full)
+        self.points.extend(zip(t.tolist(), y.tolist()))
+        del self.pending_t[:full * size], self.pending_y[:full * size]
+        self._refit()
+
+    def _refit(self):
+        if len(self.points) < 2:
+            return
+        x, y = np.array(self.points).T
+        slope, intercept = theil_sen(x, y)
+        if not np.isnan(slope):
+            self.fit = LeakFit(float(slope), float(intercept), float(slope) * VOLUME_M3)
+
+    def leak_rate(self, volume_m3=VOLUME_M3):
+        return self.fit.slope * volume_m3
+
+
+def _nanmedian(a):
+    # All-NaN slices (empty blocks, too few points) are expected and just come out NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(a, axis=-1)
@@ -0,0 +1,225 @@
+"""
+Leak-onset detection: a one-sided CUSUM on detrended dP/dt.
+
+Readings are first averaged over fixed blocks of time (``block_s``). At
+kHz rates a single difference is mostly noise, while the mean over a
+block is the secant slope across it, so small leaks stand out. Each
+block mean d is standardized against a slowly adapting baseline (an EWMA
+of its mean and variance, so thermal drift and the normal decay of the
+chamber are trended out) and accumulated as
+
+    x = direction * (d - mean) / sigma - drift
+    g = max(0, g + x)
+
+A leak shifts dP/dt in ``direction`` (falling pressure by default) and
+makes g climb; once it passes ``threshold`` the onset is latched. The
+onset time is the start of the first block after g last sat at zero,
+i.e. where the shift began, not where it was noticed. For a step of
+delta standard deviations the expected detection delay is about
+threshold / (delta - drift) blocks, so it is bounded by the tuning, not
+by history.
+
+Warmup and the threshold are set in time, not blocks, so the detector
+behaves the same at 1 kHz and at one reading every 5 s: the baseline is
+learned over WARMUP_S seconds (and at least MIN_WARMUP blocks), and unless
+a threshold is given, it is chosen at the end of warmup from the measured
+block rate so that a false alarm takes FALSE_ALARM_S on average.
+
+The recursion is evaluated a batch at a time without a Python loop:
+g_k = S_k - min(-g_0, min_{j<=k} S_j) with S the running sum of x. The
+state between batches is a handful of floats and the block being
+filled, so the cost is O(1) per reading and O(1) memory per station. The baseline stops learning while
+g is more than halfway to the threshold, so a leak being detected is not
+absorbed into it; it is updated once per batch.
+"""
+import math
+
+import numpy as np
+
+from utils.timebase import NS_PER_S
+
+# CUSUM allowance, in standard deviations of dP/dt
+DEFAULT_DRIFT = 0.25
+
+# Mean time between false alarms the automatic threshold is set for. At 10
+# blocks/s that is a threshold of ~29 sigma, and a 1-sigma shift is caught
+# in ~40 blocks (4 s); at one block per 5 s, ~21 sigma and ~28 blocks
+FALSE_ALARM_S = 30 * 24 * 3600
+MIN_THRESHOLD = 5.0
+
+# dP/dt is averaged over blocks this long before it is tested
+BLOCK_S = 0.1
+
+# Seconds, and fewest blocks, used to learn the baseline before anything
+# can be detected
+WARMUP_S = 20.0
+MIN_WARMUP = 10
+
+# Baseline EWMA weight per block; ~1000 blocks of memory
+BASELINE_ALPHA = 1e-3
+
+
+class OnsetDetector:
+    """
+    CUSUM leak-onset detector for one station's dP/dt. Ingest thread only,
+    apart from rearm(), which may be called from the Tk thread.
+
+    Args:
+        block_s (float): Seconds of readings averaged into one CUSUM step.
+        drift (float): Allowance k, in standard deviations.
+        threshold (float, optional): Decision threshold h, in standard
+            deviations. Chosen at the end of warmup for FALSE_ALARM_S if not given.
+        direction (int): -1 detects dP/dt falling (a pressurized chamber
+            leaking), +1 rising (a vacuum chamber leaking).
+        warmup_s (float): Seconds of blocks before detection starts.
+        min_warmup (int): Fewest blocks before detection starts.
+        alpha (float): Baseline EWMA weight per block.
+    """
+
+    def __init__(self, block_s=BLOCK_S, drift=DEFAULT_DRIFT, threshold=None, direction=-1, warmup_s=WARMUP_S, min_warmup=MIN_WARMUP, alpha=BASELINE_ALPHA):
+        self.block_ns = int(block_s * NS_PER_S)
+        self.drift = drift
+        self.threshold = threshold
+        self.direction = direction
+        self.warmup_ns = int(warmup_s * NS_PER_S)
+        self.min_warmup = min_warmup
+        self.alpha = alpha
+        self.warm = False
+        self.first_ns = None  # first and last blocks learned in warmup, for its length and the block rate
+        self.last_warmup_ns = None
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.origin_ns = None  # block boundaries are counted from the first reading
+        self.pending = None  # (block index, sum, count) of the block being filled
+        self.g = 0.0
+        self.rise_ns = None  # start of the first block of the current excursion of g above zero
+        self.onset_ns = None  # latched onset, None while OK
+        self.rearm_requested = False
+
+    @property
+    def latched(self):
+        return self.onset_ns is not None
+
+    def rearm(self):
+        """Clears a latched onset, e.g. at the start of a test; the baseline is kept."""
+        self.rearm_requested = True
+
+    def extend(self, times, dpdt):
+        """
+        Adds dP/dt readings in order; NaN (gaps, first readings) is skipped.
+        Only completed blocks are tested.
+
+        Args:
+            times (np.ndarray): int64 timestamps.
+            dpdt (np.ndarray): dP/dt at those times.
+
+        Returns:
+            int | None: The onset timestamp if one was latched by this batch.
+        """
+        if self.rearm_requested:
+            self.rearm_requested = False
+            self.g, self.rise_ns, self.onset_ns = 0.0, None, None
+        if self.onset_ns is not None:
+            return None
+
+        times, dpdt = self._blocks(times, dpdt)
+        if not self.warm and len(dpdt):
+            if self.first_ns is None:
+                self.first_ns = int(times[0])
+            # Both conditions hold for a leading run of blocks
+            warming = (times < self.first_ns + self.warmup_ns) | (self.count + np.arange(len(dpdt)) < self.min_warmup)
+            learn = int(np.count_nonzero(warming))
+            self._learn_warmup(dpdt[:learn])
+            if learn:
+                self.last_warmup_ns = int(times[learn - 1])
+            if learn < len(dpdt):
+                self._end_warmup()
+            times, dpdt = times[learn:], dpdt[learn:]
+        if len(dpdt) == 0:
+            return None
+
+        sigma = math.sqrt(self.var) if self.var > 0 else 1.0
+        x = self.direction * (dpdt - self.mean) / sigma - self.drift
+        s = np.cumsum(x)
+        g = s - np.minimum(np.minimum.accumulate(s), -self.g)
+
+        crossed = np.flatnonzero(g > self.threshold)
+        end = int(crossed[0]) + 1 if len(crossed) else len(g)
+        zeros = np.flatnonzero(g[:end] <= 0)
+        if len(zeros):
+            rise_ns = int(times[zeros[-1] + 1]) if zeros[-1] + 1 < len(times) else None
+        else:
+            rise_ns = self.rise_ns if self.g > 0 else int(times[0])
+
+        self._learn(dpdt[:end][g[:end] < self.threshold / 2])
+        self.g = float(g[end - 1])
+        self.rise_ns = rise_ns
+        if len(crossed):
+            self.onset_ns = rise_ns if rise_ns is not None else int(times[end - 1])
+            return self.onset_ns
+        return None
+
+    def _blocks(self, times, dpdt):
+        # Means of the blocks completed by this batch, with their start times
+        dpdt = np.asarray(dpdt, dtype=np.float64)
+        keep = ~np.isnan(dpdt)
+        times, dpdt = np.asarray(times, dtype=np.int64)[keep], dpdt[keep]
+        if len(dpdt) == 0:
+            return times, dpdt
+        if self.origin_ns is None:
+            self.origin_ns = int(times[0])
+        index = (times - self.origin_ns) // self.block_ns
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(index)) + 1))
+        sums = np.add.reduceat(dpdt, starts)
+        counts = np.diff(np.append(starts, len(dpdt))).astype(np.float64)
+        index = index[starts]
+        if self.pending is not None:
+            pending_index, pending_sum, pending_count = self.pending
+            if pending_index == index[0]:
+                sums[0] += pending_sum
+                counts[0] += pending_count
+            else:
+                index = np.concatenate(([pending_index], index))
+                sums = np.concatenate(([pending_sum], sums))
+                counts = np.concatenate(([pending_count], counts))
+        # The last block may still get readings
+        self.pending = (int(index[-1]), float(sums[-1]), float(counts[-1]))
+        return self.origin_ns + index[:-1] * self.block_ns, sums[:-1] / counts[:-1]
+
+    def _end_warmup(self):
+        self.warm = True
+        if self.threshold is None:
+            span_s = max((self.last_warmup_ns - self.first_ns) / NS_PER_S, self.block_ns / NS_PER_S)
+            blocks_per_s = (self.count - 1) / span_s
+            self.threshold = threshold_for(blocks_per_s, self.drift)
+
+    def _learn_warmup(self, readings):
+        # Plain running mean and variance until the EWMA takes over
+        if len(readings) == 0:
+            return
+        n = self.count + len(readings)
+        delta = readings.mean() - self.mean
+        m2 = self.var * self.count + readings.var() * len(readings) + delta ** 2 * self.count * len(readings) / n
+        self.mean += delta * len(readings) / n
+        self.var = m2 / n
+        self.count = n
+
+    def _learn(self, readings):
+        # One EWMA step for the whole batch, weighted as len(readings) steps
+        if len(readings) == 0:
+            return
+        weight = 1.0 - (1.0 - self.alpha) ** len(readings)
+        self.mean += weight * (readings.mean() - self.mean)
+        self.var += weight * (float(np.mean((readings - self.mean) ** 2)) - self.var)
+        self.count += len(readings)
+
+
+def threshold_for(blocks_per_s, drift=DEFAULT_DRIFT, false_alarm_s=FALSE_ALARM_S):
+    """
+    CUSUM threshold, in standard deviations, whose mean time between false
+    alarms is about false_alarm_s at blocks_per_s (Siegmund's approximation
+    of the in-control average run length, exp(2kh') / 2k^2 with h' = h + 1.166).
+    """
+    blocks = max(false_alarm_s * blocks_per_s, 1.0)
+    return max(MIN_THRESHOLD, math.log(2 * drift ** 2 * blocks + 1) / (2 * drift) - 1.166)
@@ -0,0 +1,293 @@
+"""
+Binary telemetry protocol, negotiated on connect, with the text lines as fallback.
+
+On connect the client sends one HELLO line listing the value types it
+accepts. A binary-capable station answers with an 8-byte header and then
+streams fixed-size, length-prefixed frames:
+
+    header: b"TTSB", version u8, value size u8 (4 or 8), channels u8, pad u8
+    frame:  length u32 (bytes after this field), seq u32, t f64 (sender seconds),
+            one float32/float64 per channel; all little-endian
+
+A station that does not know the protocol ignores the HELLO and keeps
+sending ``pressure=..,temperature=..`` lines; ProtocolParser tells the two
+apart from the first bytes it receives.
+
+Data frames are all the same size, so every run of complete frames in a
+chunk is decoded with a single ``numpy.frombuffer`` call instead of
+per-sample parsing.
+
+Control messages share the link in both directions. The client sends
+commands as text lines (``cmd seq=12 valve=He state=closed``) and the
+station answers with control lines (``ack seq=12 ok=1``). In binary mode
+those answers arrive as control frames: the same u32 length prefix with
+CONTROL_FLAG set, followed by the ASCII message.
+"""
+import struct
+
+import numpy as np
+
+from utils.framing import TelemetryParser
+
+MAGIC = b"TTSB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBx")
+HELLO = b"TTS-HELLO bin=f4,f8 text\n"
+LENGTH = struct.Struct("<I")
+CONTROL_FLAG = 0x80000000
+
+VALUE_TYPES = {4: "<f4", 8: "<f8"}
+
+
+class ProtocolError(ValueError):
+    """The peer sent something this side cannot decode; the link is reset."""
+
+
+def frame_dtype(n_channels, value_size):
+    return np.dtype([
+        ("length", "<u4"),
+        ("seq", "<u4"),
+        ("t", "<f8"),
+        ("values", VALUE_TYPES[value_size], (n_channels,)),
+    ])
+
+
+def parse_hello(line):
+    """
+    Returns the value size the client accepts, preferring the compact one,
+    or None for a client that only speaks text.
+    """
+    line = line.strip()
+    if not line.startswith(b"TTS-HELLO"):
+        return None
+    for part in line.split()[1:]:
+        key, _, value = part.partition(b"=")
+        if key == b"bin":
+            accepted = value.split(b",")
+            for code, size in ((b"f4", 4), (b"f8", 8)):
+                if code in accepted:
+                    return size
+    return None
+
+
+def encode_command(seq, fields):
+    """Encodes one command line, e.g. ``cmd seq=12 valve=He state=closed``."""
+    parts = [f"seq={seq}"] + [f"{key}={value}" for key, value in fields.items()]
+    return ("cmd " + " ".join(parts) + "\n").encode()
+
+
+def encode_control(message, binary):
+    """Encodes a station-to-client control message such as b"ack seq=12 ok=1"."""
+    if binary:
+        return LENGTH.pack(len(message) | CONTROL_FLAG) + message
+    return message + b"\n"
+
+
+def parse_control(line):
+    """
+    Splits a command or control line into its keyword and fields.
+
+    Returns:
+        tuple | None: (kind, {key: value}) as str, or None if malformed.
+    """
+    try:
+        words = line.decode().split()
+    except UnicodeDecodeError:
+        return None
+    if not words:
+        return None
+    fields = {}
+    for word in words[1:]:
+        key, sep, value = word.partition("=")
+        if not sep:
+            return None
+        fields[key] = value
+    return words[0], fields
+
+
+def encode_header(n_channels, value_size):
+    return HEADER.pack(MAGIC, VERSION, value_size, n_channels)
+
+
+def encode_frames(seq, times, values, value_size):
+    """
+    Packs a batch of samples into frames. Used by senders (test_server.py).
+
+    Args:
+        seq (int): Sequence number of the first sample.
+        times (array-like): Shape (n,) sender timestamps in seconds.
+        values (array-like): Shape (n, n_channels).
+        value_size (int): 4 for float32 or 8 for float64 values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values.reshape(len(values), -1)
+    dtype = frame_dtype(values.shape[1], value_size)
+    frames = np.empty(len(values), dtype=dtype)
+    frames["length"] = dtype.itemsize - 4
+    frames["seq"] = (seq + np.arange(len(values))) & 0xFFFFFFFF
+    frames["t"] = times
+    frames["values"] = values
+    return frames.tobytes()
+
+
+class BinaryFrameParser:
+    """
+    Decodes fixed-size binary frames in batches.
+
+    Args:
+        n_channels (int): Channels per frame, from the header.
+        value_size (int): Bytes per channel value, from the header.
+    """
+
+    def __init__(self, n_channels, value_size):
+        if value_size not in VALUE_TYPES:
+            raise ProtocolError(f"Unsupported value size {value_size}")
+        self.dtype = frame_dtype(n_channels, value_size)
+        self.frame_size = self.dtype.itemsize
+        self.n_channels = n_channels
+        self.buffer = bytearray()
+        self.next_seq = None
+        self.frames = 0
+        self.lost = 0
+        self.controls = []
+
+    def feed(self, data):
+        """
+        Returns an (n, n_channels + 1) float64 array: channel values, then the
+        sender timestamp, for every complete data frame received so far.
+        Control frames are collected in ``controls``.
+        """
+        buf = self.buffer
+        buf += data
+        blocks = []
+        offset = 0
+        payload_size = self.frame_size - LENGTH.size
+        while len(buf) - offset >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(buf, offset)
+            if length & CONTROL_FLAG:
+                end = offset + LENGTH.size + (length & ~CONTROL_FLAG)
+                if end > len(buf):
+                    break
+                self.controls.append(bytes(buf[offset + LENGTH.size:end]))
+                offset = end
+                continue
+            if length != payload_size:
+                # Fixed-size frames cannot be resynchronized mid-stream
+                raise ProtocolError("Binary frame with unexpected length")
+
+            n = (len(buf) - offset) // self.frame_size
+            if n == 0:
+                break
+            frames = np.frombuffer(buf, dtype=self.dtype, count=n, offset=offset)
+            # Decode up to the next control (or bad) frame in one go
+            odd = np.flatnonzero(frames["length"] != payload_size)
+            if len(odd):
+                n = int(odd[0])
+                frames = frames[:n]
+            blocks.append(self.decode(frames))
+            del frames
+            offset += n * self.frame_size
+        del buf[:offset]
+
+        if not blocks:
+            return np.empty((0, self.n_channels + 1))
+        return blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+
+    def decode(self, frames):
+        self.count_lost(frames["seq"])
+        block = np.empty((len(frames), self.n_channels + 1))
+        block[:, :-1] = frames["values"]
+        block[:, -1] = frames["t"]
+        self.frames += len(frames)
+        return block
+
+    def count_lost(self, seq):
+        expected = np.empty(len(seq), dtype=np.int64)
+        expected[0] = seq[0] if self.next_seq is None else self.next_seq
+        expected[1:] = seq[:-1].astype(np.int64) + 1
+        # Sequence numbers are u32 and wrap
+        skipped = (seq.astype(np.int64) - expected) & 0xFFFFFFFF
+        self.lost += int(skipped.sum())
+        self.next_seq = (int(seq[-1]) + 1) & 0xFFFFFFFF
+
+    def reset(self):
+        self.buffer.clear()
+        self.next_seq = None
+        self.controls.clear()
+
+
+class ProtocolParser:
+    """
+    Station-side parser that speaks whichever protocol the peer answers in.
+
+    Until the first bytes arrive the protocol is unknown; a binary header
+    switches to BinaryFrameParser, anything else is handed to the text
+    TelemetryParser. Both return samples as rows of (channels..., sent).
+
+    Args:
+        n_channels (int): Channels the station is expected to send.
+    """
+
+    supports_commands = True
+
+    def __init__(self, n_channels=2):
+        self.n_channels = n_channels
+        self.text = TelemetryParser()
+        self.binary = None
+        self.pending = bytearray()
+        self.protocol = None
+        self.lost_before = 0  # frames lost on earlier connections
+
+    @property
+    def frames(self):
+        return self.text.frames + (self.binary.frames if self.binary else 0)
+
+    @property
+    def malformed(self):
+        return self.text.malformed
+
+    @property
+    def lost(self):
+        return self.lost_before + (self.binary.lost if self.binary else 0)
+
+    def hello(self):
+        """Bytes the client sends right after connecting."""
+        return HELLO
+
+    def drain_controls(self):
+        """Returns and clears the control messages received so far."""
+        controls = self.text.controls
+        if self.binary is not None and self.binary.controls:
+            controls = controls + self.binary.controls
+            self.binary.controls = []
+        self.text.controls = []
+        return controls
+
+    def feed(self, data):
+        if self.protocol is None:
+            self.pending += data
+            if len(self.pending) < HEADER.size and MAGIC.startswith(bytes(self.pending[:4])):
+                return []
+            data, self.pending = bytes(self.pending), bytearray()
+            if data.startswith(MAGIC):
+                _, version, value_size, n_channels = HEADER.unpack_from(data)
+                if version != VERSION or n_channels != self.n_channels:
+                    raise ProtocolError(f"Binary protocol v{version} with {n_channels} channels is not supported")
+                self.binary = BinaryFrameParser(n_channels, value_size)
+                self.protocol = "binary"
+                data = data[HEADER.size:]
+            else:
+                self.protocol = "text"
+
+        if self.protocol == "binary":
+            return self.binary.feed(data)
+        return self.text.feed(data)
+
+    def reset(self):
+        # The next connection negotiates again
+        self.text.reset()
+        self.text.controls = []
+        self.lost_before = self.lost
+        self.binary = None
+        self.pending.clear()
+        self.protocol = None
@@ -0,0 +1,192 @@
+"""
+Preallocated multi-channel ring buffer for chamber telemetry.
+
+One thread (the socket reader) writes; any number of threads read. Samples
+are stored twice, at ``i`` and ``i + capacity``, so the most recent ``n``
+samples are always one contiguous slice and can be handed to matplotlib or
+np.polyfit as views without copying.
+
+A view is overwritten once the writer wraps around to its oldest sample, so
+views never cover the last SNAPSHOT_MARGIN slots of the ring: every view
+stays intact for at least that many further writes.
+"""
+import numpy as np
+
+from utils.alignment import gap_mask, native
+
+# Slots views stay clear of: 10 s of writes at 1 kHz (half a very small ring)
+SNAPSHOT_MARGIN = 10_000
+
+# Largest ring ring_capacity() sizes: with two channels a sample takes 48
+# bytes (stored twice), so about 190 MB, or 66 min at 1 kHz
+MAX_CAPACITY = 4_000_000
+
+
+def ring_capacity(hours, rate_hz, limit=MAX_CAPACITY):
+    """
+    Samples for ``hours`` of history at ``rate_hz``, capped at ``limit``.
+    History older than the ring is read from the run's SampleStore.
+    """
+    return max(1, min(int(hours * 3600 * rate_hz), limit))
+
+
+class RingSnapshot:
+    """
+    Read-only view of the last ``n`` samples of a RingBuffer.
+
+    Views stay valid until ``capacity - n`` further samples are written. n is
+    at most ``RingBuffer.readable``, so that is at least SNAPSHOT_MARGIN
+    samples, far longer than any UI tick.
+    """
+
+    def __init__(self, channels, times, values):
+        self.channels = channels
+        self.times = times
+        self.values = values
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, name):
+        return self.values[self.channels.index(name)]
+
+    def native(self, name):
+        """
+        (times, values) of one channel at its own rate: rows where it was
+        not sampled are dropped, gap markers kept. See utils.alignment.
+        """
+        return native(self.times, self[name], gap_mask(self.values))
+
+    def rows(self):
+        """Returns the snapshot as a list of (time, *channels) tuples, NaN where a channel was not sampled."""
+        return list(zip(self.times.tolist(), *(v.tolist() for v in self.values)))
+
+
+class RingBuffer:
+    """
+    Fixed-capacity time-series buffer backed by preallocated NumPy arrays.
+
+    Args:
+        channels (tuple[str]): Channel names, e.g. ("pressure", "temperature").
+        capacity (int): Number of samples kept before the oldest are overwritten.
+        dtype: NumPy dtype of the channel values.
+    """
+
+    def __init__(self, channels, capacity, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.channels = tuple(channels)
+        self.capacity = int(capacity)
+        self.times = np.zeros(2 * self.capacity, dtype=np.int64)
+        self.values = np.zeros((len(self.channels), 2 * self.capacity), dtype=dtype)
+
+        # Total samples ever written. Published last, after the data, so a
+        # reader that sees count == k is guaranteed samples < k are complete.
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def readable(self):
+        """Most samples one snapshot or read_since() returns, see SNAPSHOT_MARGIN."""
+        return self.capacity - min(SNAPSHOT_MARGIN, self.capacity // 2)
+
+    def append(self, t, values):
+        """
+        Writes one sample. Must only be called from the writer thread.
+
+        Args:
+            t (int): Sample timestamp.
+            values (sequence[float]): One value per channel, in channel order.
+        """
+        i = self.count % self.capacity
+        j = i + self.capacity
+        self.times[i] = self.times[j] = t
+        self.values[:, i] = self.values[:, j] = values
+        self.count += 1
+
+    def extend(self, times, values):
+        """
+        Writes a batch of samples. Must only be called from the writer thread.
+
+        Args:
+            times (array-like): Shape (n,) timestamps.
+            values (array-like): Shape (n, n_channels) values, one row per sample.
+        """
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=self.values.dtype).reshape(len(times), len(self.channels)).T
+        n = len(times)
+        if n == 0:
+            return
+        if n > self.capacity:
+            times = times[-self.capacity:]
+            values = values[:, -self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+
+        start = (self.count + skipped) % self.capacity
+        first = min(n, self.capacity - start)
+        for offset in (0, self.capacity):
+            lo = start + offset
+            self.times[lo:lo + first] = times[:first]
+            self.values[:, lo:lo + first] = values[:, :first]
+            if first < n:
+                rest = n - first
+                self.times[offset:offset + rest] = times[first:]
+                self.values[:, offset:offset + rest] = values[:, first:]
+
+        self.count += n + skipped
+
+    def snapshot(self, n=None):
+        """
+        Returns a consistent, zero-copy view of the most recent samples.
+
+        Args:
+            n (int, optional): Number of samples wanted. Defaults to everything
+                held, up to ``readable``; larger requests are clipped to it.
+
+        Returns:
+            RingSnapshot: Read-only views of the times and channel values.
+        """
+        count = self.count
+        held = min(count, self.readable)
+        n = held if n is None else max(0, min(n, held))
+        return self._view(count, n)
+
+    def read_since(self, start):
+        """
+        Returns the samples written since total count ``start``, for followers
+        that consume the stream incrementally.
+
+        Args:
+            start (int): Count returned by the previous call (0 the first time).
+
+        Returns:
+            tuple: (new_start, RingSnapshot). If the follower fell more than
+            ``readable`` samples behind, the older ones are skipped.
+        """
+        count = self.count
+        n = max(0, count - max(start, count - self.readable))
+        return count, self._view(count, n)
+
+    def _view(self, end, n):
+        # The n samples ending at total count ``end``, as read-only views
+        start = (end - n) % self.capacity
+        times = self.times[start:start + n]
+        values = self.values[:, start:start + n]
+        times.flags.writeable = False
+        values.flags.writeable = False
+        return RingSnapshot(self.channels, times, values)
+
+    def latest(self):
+        """
+        Returns the newest sample as (time, values), or None when empty.
+        """
+        count = self.count
+        if count == 0:
+            return None
+        i = (count - 1) % self.capacity
+        return int(self.times[i]), self.values[:, i].copy()
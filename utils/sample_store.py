@@ -0,0 +1,261 @@
+"""
+Append-only, memory-mapped on-disk store for chamber samples.
+
+A run directory holds ``meta.json`` and a sequence of fixed-size segment
+files (``seg-000000.bin``, ``seg-000001.bin``, ...). Each segment is a 64-byte
+header followed by preallocated records of (t, channel values...). The header
+holds the committed record count, which is only advanced after the records
+it covers have been flushed, so a crash can lose the last sync interval but
+never exposes a torn record.
+
+Times must be non-decreasing. That lets range reads bisect the segment list
+and then ``searchsorted`` inside the one or two segments that overlap, so a
+12-hour export is a slice rather than a scan.
+"""
+import bisect
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = 0x3130474553535454  # b"TTSSEG01" little-endian
+HEADER_SIZE = 64
+HEADER_MAGIC, HEADER_COUNT, HEADER_CAPACITY, HEADER_RECORD_SIZE = range(4)
+
+
+def record_dtype(channels):
+    return np.dtype([("t", "<i8")] + [(name, "<f8") for name in channels])
+
+
+def _write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Segment:
+    """One preallocated, memory-mapped segment file."""
+
+    def __init__(self, path, dtype, capacity=None, readonly=False):
+        self.path = Path(path)
+        self.readonly = readonly
+        if capacity is not None:
+            self._create(dtype, capacity)
+
+        self.mm = np.memmap(self.path, dtype=np.uint8, mode="r" if readonly else "r+")
+        self.header = self.mm[:HEADER_SIZE].view("<i8")
+        if self.header[HEADER_MAGIC] != MAGIC or self.header[HEADER_RECORD_SIZE] != dtype.itemsize:
+            raise ValueError(f"{self.path} is not a sample segment for this store")
+
+        self.capacity = int(self.header[HEADER_CAPACITY])
+        self.records = self.mm[HEADER_SIZE:HEADER_SIZE + self.capacity * dtype.itemsize].view(dtype)
+        self.times = self.records["t"]
+
+        # In-memory count is what readers see; header count is the durable one
+        self.count = int(self.header[HEADER_COUNT])
+
+    def _create(self, dtype, capacity):
+        header = np.zeros(HEADER_SIZE // 8, dtype="<i8")
+        header[HEADER_MAGIC] = MAGIC
+        header[HEADER_CAPACITY] = capacity
+        header[HEADER_RECORD_SIZE] = dtype.itemsize
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(header.tobytes())
+            f.truncate(HEADER_SIZE + capacity * dtype.itemsize)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+    def first_time(self):
+        return int(self.times[0]) if self.count else None
+
+    def last_time(self):
+        count = self.count
+        return int(self.times[count - 1]) if count else None
+
+    def commit(self):
+        # Data pages first, then the count that makes them visible after a crash
+        self.mm.flush()
+        self.header[HEADER_COUNT] = self.count
+        self.mm.flush()
+
+    def refresh(self):
+        # Read-only followers only ever see what the writer has made durable
+        self.count = int(self.header[HEADER_COUNT])
+
+    def read_range(self, t_start, t_end):
+        count = self.count
+        times = self.times[:count]
+        lo = np.searchsorted(times, t_start, side="left")
+        hi = np.searchsorted(times, t_end, side="right")
+        return self.records[lo:hi].copy()
+
+
+class SampleStore:
+    """
+    Chunked, append-only sample store for one chamber run.
+
+    Only one thread may write (the socket reader). Reads never take a lock:
+    the writer publishes new segments by swapping in a new index tuple, and
+    advances a segment's count only after its records are written.
+
+    A store opened with readonly=True follows a run another process is
+    recording, seeing each segment up to its last durable commit.
+
+    Args:
+        path (str | Path): Run directory. Created if missing, recovered if present.
+        channels (tuple[str]): Channel names stored next to the timestamp.
+        segment_size (int): Records per segment file.
+        sync_interval (float): Seconds between durable commits.
+        readonly (bool): Follow a run written by another process.
+        origin_ns (int, optional): Timestamp that counts as t = 0 for this run,
+            recorded in meta.json. Defaults to now.
+    """
+
+    def __init__(self, path, channels=("pressure", "temperature"), segment_size=1 << 16, sync_interval=1.0, readonly=False, origin_ns=None):
+        self.path = Path(path)
+        self.readonly = readonly
+        if readonly:
+            meta = json.loads((self.path / "meta.json").read_text())
+            self.origin_ns = meta.get("origin_ns", 0)
+            channels = meta["channels"]
+            self.channels = tuple(channels)
+            self.dtype = record_dtype(self.channels)
+            self._index = ([], [])
+            self.refresh()
+            return
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.channels = tuple(channels)
+        self.segment_size = int(segment_size)
+        self.sync_interval = sync_interval
+        self.dtype = record_dtype(self.channels)
+        self.last_sync = time.monotonic()
+
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if tuple(meta["channels"]) != self.channels:
+                raise ValueError(f"{self.path} holds channels {meta['channels']}, not {list(self.channels)}")
+        else:
+            meta = {
+                "channels": list(self.channels),
+                "created": time.time(),
+                "origin_ns": time.monotonic_ns() if origin_ns is None else int(origin_ns),
+            }
+            _write_atomic(meta_path, json.dumps(meta, indent=2).encode())
+        # Runs recorded before timestamps were monotonic_ns counted from 0
+        self.origin_ns = meta.get("origin_ns", 0)
+
+        segments = [Segment(p, self.dtype) for p in sorted(self.path.glob("seg-*.bin"))]
+        if not segments or segments[-1].full:
+            segments.append(self._new_segment(len(segments)))
+
+        # (segments, first_times) is replaced as a whole so readers never see it half-updated
+        self._index = (segments, [s.first_time() for s in segments])
+
+    def _new_segment(self, number):
+        return Segment(self.path / f"seg-{number:06d}.bin", self.dtype, capacity=self.segment_size)
+
+    def __len__(self):
+        return sum(s.count for s in self._index[0])
+
+    def extend(self, times, values):
+        """
+        Appends a batch of samples. Writer thread only.
+
+        Args:
+            times (array-like): Shape (n,) non-decreasing int64 timestamps.
+            values (array-like): Shape (n, n_channels) channel values.
+        """
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64).reshape(len(times), len(self.channels))
+        done = 0
+        while done < len(times):
+            segments, firsts = self._index
+            active = segments[-1]
+            if active.full:
+                self._rollover()
+                continue
+
+            n = min(len(times) - done, active.capacity - active.count)
+            block = active.records[active.count:active.count + n]
+            block["t"] = times[done:done + n]
+            for i, name in enumerate(self.channels):
+                block[name] = values[done:done + n, i]
+            if active.count == 0:
+                firsts = firsts[:-1] + [int(times[done])]
+                self._index = (segments, firsts)
+            active.count += n
+            done += n
+
+        if time.monotonic() - self.last_sync >= self.sync_interval:
+            self.sync()
+
+    def _rollover(self):
+        segments, firsts = self._index
+        segments[-1].commit()
+        new = self._new_segment(len(segments))
+        self._index = (segments + [new], firsts + [None])
+
+    def refresh(self):
+        """Read-only stores: picks up new segments and commits made by the writer."""
+        segments = list(self._index[0])
+        known = {s.path for s in segments}
+        for path in sorted(self.path.glob("seg-*.bin")):
+            if path not in known:
+                segments.append(Segment(path, self.dtype, readonly=True))
+        for segment in segments[-2:]:
+            segment.refresh()
+        self._index = (segments, [s.first_time() for s in segments])
+
+    def sync(self):
+        """Makes everything written so far durable."""
+        if self.readonly:
+            return
+        self._index[0][-1].commit()
+        self.last_sync = time.monotonic()
+
+    def read_range(self, t_start, t_end):
+        """
+        Returns all samples with ``t_start <= t <= t_end``.
+
+        Args:
+            t_start (int): Inclusive lower time bound.
+            t_end (int): Inclusive upper time bound.
+
+        Returns:
+            np.ndarray: Structured array with fields ``t`` and one per channel.
+        """
+        if self.readonly:
+            self.refresh()
+        segments, firsts = self._index
+        known = [f for f in firsts if f is not None]
+        first = max(0, bisect.bisect_right(known, t_start) - 1)
+
+        parts = []
+        for segment in segments[first:]:
+            segment_first = segment.first_time()
+            if segment_first is None or segment_first > t_end:
+                break
+            last = segment.last_time()
+            if last < t_start:
+                continue
+            parts.append(segment.read_range(t_start, t_end))
+
+        if not parts:
+            return np.empty(0, dtype=self.dtype)
+        return np.concatenate(parts)
+
+    def close(self):
+        self.sync()
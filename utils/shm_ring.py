@@ -0,0 +1,114 @@
+"""
+RingBuffer in a ``multiprocessing.shared_memory`` segment.
+
+The acquisition daemon creates the segment and is its only writer. Any number
+of GUI processes attach to it by name, read-only, and get the same zero-copy
+snapshots they would get from an in-process RingBuffer.
+
+Layout: a 4 KiB header (int64 fields, then JSON metadata), followed by the
+int64 times array and the float64 values array, both in RingBuffer's
+doubled layout.
+"""
+import json
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from utils.ring_buffer import RingBuffer
+
+MAGIC = 0x31474E4952535454  # b"TTSRING1" little-endian
+HEADER_SIZE = 4096
+META_OFFSET = 64
+MAGIC_FIELD, CAPACITY_FIELD, CHANNELS_FIELD, COUNT_FIELD, HEARTBEAT_FIELD = range(5)
+
+
+class SharedRingBuffer(RingBuffer):
+    """
+    RingBuffer whose arrays and sample count live in shared memory.
+
+    Use create() in the writer process and attach() in readers.
+    """
+
+    def __init__(self, shm, writable):
+        self.shm = shm
+        self.writable = writable
+        self.header = np.ndarray(HEADER_SIZE // 8, dtype=np.int64, buffer=shm.buf)
+        if self.header[MAGIC_FIELD] != MAGIC:
+            raise ValueError(f"Shared memory '{shm.name}' is not a telemetry ring")
+
+        raw_meta = bytes(shm.buf[META_OFFSET:HEADER_SIZE]).rstrip(b"\0")
+        self.metadata = json.loads(raw_meta)
+        self.channels = tuple(self.metadata["channels"])
+        self.capacity = int(self.header[CAPACITY_FIELD])
+
+        offset = HEADER_SIZE
+        self.times = np.ndarray(2 * self.capacity, dtype=np.int64, buffer=shm.buf, offset=offset)
+        offset += self.times.nbytes
+        self.values = np.ndarray((len(self.channels), 2 * self.capacity), dtype=np.float64, buffer=shm.buf, offset=offset)
+        if not writable:
+            self.times.flags.writeable = False
+            self.values.flags.writeable = False
+
+    @classmethod
+    def create(cls, name, channels, capacity, metadata=None):
+        """
+        Creates the segment. Called once, by the acquisition daemon.
+
+        Args:
+            name (str): Shared memory name readers attach to.
+            channels (tuple[str]): Channel names.
+            capacity (int): Samples kept.
+            metadata (dict, optional): Extra JSON-serializable info for readers,
+                e.g. where the run is being recorded.
+        """
+        meta = dict(metadata or {}, channels=list(channels))
+        raw_meta = json.dumps(meta).encode()
+        if len(raw_meta) > HEADER_SIZE - META_OFFSET:
+            raise ValueError("Ring metadata does not fit in the header")
+
+        size = HEADER_SIZE + 8 * 2 * capacity * (1 + len(channels))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray(HEADER_SIZE // 8, dtype=np.int64, buffer=shm.buf)
+        header[CAPACITY_FIELD] = capacity
+        header[CHANNELS_FIELD] = len(channels)
+        header[COUNT_FIELD] = 0
+        shm.buf[META_OFFSET:META_OFFSET + len(raw_meta)] = raw_meta
+        header[MAGIC_FIELD] = MAGIC  # last, so a half-initialized ring is never attached
+        del header
+        return cls(shm, writable=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attaches read-only to a ring created by another process."""
+        shm = shared_memory.SharedMemory(name=name)
+        # Python < 3.13 registers attached segments too and would unlink the
+        # daemon's ring when this reader exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, writable=False)
+
+    @property
+    def count(self):
+        return int(self.header[COUNT_FIELD])
+
+    @count.setter
+    def count(self, value):
+        # Single aligned int64 store: readers see either the old or the new count
+        self.header[COUNT_FIELD] = value
+
+    def extend(self, times, values):
+        super().extend(times, values)
+        self.header[HEARTBEAT_FIELD] = time.time_ns()
+
+    def writer_age(self):
+        """Seconds since the writer last published samples, or None if it never has."""
+        heartbeat = int(self.header[HEARTBEAT_FIELD])
+        return None if heartbeat == 0 else (time.time_ns() - heartbeat) / 1e9
+
+    def close(self):
+        # Views must go before the buffer can be released
+        self.header = self.times = self.values = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
@@ -0,0 +1,169 @@
+"""
+Instrument status (chamber seal, leak detector, pump) from the telemetry stream.
+
+Stations report status as control lines on the telemetry link
+(``status chamber=sealed leak=not_sealed pump=active``, a control frame in
+binary mode), and may repeat them at any rate. Only changes count as
+transitions. Each transition is written to a small SampleStore in the run
+directory (``status/``), as one row of state codes on the same timebase
+as the pressure samples, so status can be joined with pressure by time.
+"""
+import numpy as np
+
+from utils.sample_store import SampleStore
+from utils.timebase import now_ns
+
+# Wire field -> SystemStatus row label
+STATUS_FIELDS = {"chamber": "Chamber", "leak": "Leak Detector", "pump": "Pump"}
+STATUS_CHANNELS = tuple(STATUS_FIELDS)
+
+# Stored code -> display value, per field
+STATUS_STATES = {
+    "chamber": ("Not Sealed", "Sealed"),
+    "leak": ("Not Sealed", "Sealed"),
+    "pump": ("Not Active", "Active"),
+}
+
+
+def parse_status_value(value):
+    """``not_sealed`` -> ``Not Sealed``."""
+    return value.replace("_", " ").title()
+
+
+def status_code(field, value):
+    """Code stored for a display value; NaN for states the field does not define."""
+    states = STATUS_STATES[field]
+    return float(states.index(value)) if value in states else np.nan
+
+
+def status_value(field, code):
+    """Display value for a stored code, or None if unknown."""
+    if np.isnan(code):
+        return None
+    return STATUS_STATES[field][int(code)]
+
+
+def open_status_store(store):
+    """The status store next to a run's samples, or None without a recording."""
+    if store is None:
+        return None
+    path = store.path / "status"
+    if store.readonly:
+        if not (path / "meta.json").exists():
+            return None
+        return SampleStore(path, readonly=True)
+    return SampleStore(path, channels=STATUS_CHANNELS, segment_size=1 << 12, origin_ns=store.origin_ns)
+
+
+class StatusTracker:
+    """
+    Current status of one station and its transition log.
+
+    update() is called on the ingest thread for every status report and
+    only does work when a value actually changed; flush() then writes the
+    transitions of one read in a single store append. The UI reads
+    ``values`` and redraws only what differs from what it shows.
+
+    Args:
+        store (SampleStore, optional): Transition log, see open_status_store().
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.values = {}  # field -> display value
+        self.changed_ns = {}  # field -> time of its last transition
+        self.reports = 0
+        self.transitions = 0
+        self.pending_times = []
+        self.pending_rows = []
+        self.unsynced = False
+        self.last_ns = None
+
+    def update(self, fields, t_ns=None):
+        """
+        Applies one status report.
+
+        Args:
+            fields (dict): Wire fields, e.g. {"chamber": "sealed"}; unknown keys are ignored.
+            t_ns (int, optional): Time of the report. Defaults to now.
+
+        Returns:
+            list[tuple]: (field, old, new) for every value that changed.
+        """
+        self.reports += 1
+        changes = []
+        for field, raw in fields.items():
+            if field not in STATUS_FIELDS:
+                continue
+            value = parse_status_value(raw)
+            old = self.values.get(field)
+            if value != old:
+                changes.append((field, old, value))
+        if not changes:
+            return changes
+
+        t_ns = now_ns() if t_ns is None else int(t_ns)
+        if self.last_ns is not None:
+            t_ns = max(t_ns, self.last_ns)  # the store needs non-decreasing times
+        self.last_ns = t_ns
+        for field, _, value in changes:
+            self.values[field] = value
+            self.changed_ns[field] = t_ns
+        self.transitions += len(changes)
+        if self.store is not None:
+            self.pending_times.append(t_ns)
+            self.pending_rows.append(self.codes())
+        return changes
+
+    def codes(self):
+        return [status_code(field, self.values[field]) if field in self.values else np.nan for field in STATUS_CHANNELS]
+
+    def flush(self):
+        """Writes the transitions since the last flush. Ingest thread only."""
+        if self.pending_times:
+            self.store.extend(self.pending_times, self.pending_rows)
+            self.pending_times, self.pending_rows = [], []
+            self.unsynced = True
+
+    def sync(self):
+        """
+        Commits flushed transitions. Called periodically rather than per
+        flush, so chatter costs at most one commit per call.
+        """
+        if self.unsynced:
+            self.store.sync()
+            self.unsynced = False
+
+    def follow(self):
+        """
+        Read-only stores (attached GUIs): picks up transitions recorded by
+        the acquisition daemon. Returns True if the status changed.
+        """
+        if self.store is None:
+            return False
+        start = 0 if self.last_ns is None else self.last_ns + 1
+        records = self.store.read_range(start, np.iinfo(np.int64).max)
+        if not len(records):
+            return False
+        last = records[-1]
+        self.last_ns = int(last["t"])
+        changed = False
+        for field in STATUS_CHANNELS:
+            value = status_value(field, last[field])
+            if value is not None and value != self.values.get(field):
+                self.values[field] = value
+                self.changed_ns[field] = self.last_ns
+                changed = True
+        self.transitions += len(records)
+        return changed
+
+    def read_transitions(self, t_start, t_end):
+        """
+        Transitions recorded between two int64 timestamps.
+
+        Returns:
+            np.ndarray: Structured array with ``t`` and one code per field.
+        """
+        if self.store is None:
+            return np.empty(0, dtype=[("t", "<i8")] + [(field, "<f8") for field in STATUS_CHANNELS])
+        return self.store.read_range(t_start, t_end)
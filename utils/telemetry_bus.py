@@ -0,0 +1,148 @@
+"""
+In-process publish/subscribe bus for telemetry, plus a bridge onto the Tk thread.
+
+The ingest thread publishes sample batches on the bus. Subscribers that run
+on the ingest thread (ring buffer, recorder, alarms) are called directly,
+in subscription order. Tk widgets must not be touched from that thread, so
+UI subscribers go through TkBridge, which collects what arrived and delivers
+it on the main thread at most once per frame.
+"""
+import threading
+import time
+from collections import namedtuple
+
+# times: int64 array (n,); values: float64 array (n, n_channels);
+# station: name of the station the samples came from
+SampleBatch = namedtuple("SampleBatch", "times values station", defaults=(None,))
+
+
+class TelemetryBus:
+    """
+    Topic-based publish/subscribe, called synchronously on the publishing thread.
+
+    A subscriber that raises is reported and skipped; it never stops ingest.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+        self.errors = 0
+
+    def subscribe(self, topic, callback):
+        with self.lock:
+            # Copy-on-write so publish() can iterate without holding the lock
+            self.subscribers[topic] = self.subscribers.get(topic, ()) + (callback,)
+        return topic, callback
+
+    def unsubscribe(self, subscription):
+        topic, callback = subscription
+        with self.lock:
+            self.subscribers[topic] = tuple(cb for cb in self.subscribers.get(topic, ()) if cb is not callback)
+
+    def publish(self, topic, payload):
+        for callback in self.subscribers.get(topic, ()):
+            try:
+                callback(payload)
+            except Exception as e:
+                self.errors += 1
+                print(f"[Bus] ⚠️ Subscriber {getattr(callback, '__qualname__', callback)} failed on '{topic}':", e)
+
+
+class TkBridge:
+    """
+    Delivers bus messages to Tk-thread callbacks, coalesced per frame.
+
+    Each subscription either keeps only the newest payload ("latest") or every
+    payload since the last delivery ("batch"). A timer on the Tk thread checks
+    for pending messages once per frame and makes at most one call per
+    subscription, optionally throttled further with max_rate_hz.
+
+    Args:
+        root (tk.Misc): Any widget; its event loop runs the callbacks.
+        bus (TelemetryBus): Bus to listen on.
+        frame_ms (int): Polling period of the Tk-side pump.
+    """
+
+    def __init__(self, root, bus, frame_ms=16):
+        self.root = root
+        self.bus = bus
+        self.frame_ms = frame_ms
+        self.lock = threading.Lock()
+        self.subscriptions = []
+        self.latency_ms = 0.0  # publish -> Tk callback, most recent delivery
+        self.root.after(self.frame_ms, self.pump)
+
+    def subscribe(self, topic, callback, mode="latest", max_rate_hz=None):
+        """
+        Registers a Tk-thread callback for a topic.
+
+        Args:
+            topic (str): Bus topic.
+            callback (callable): Called on the Tk thread with the payload, or a
+                list of payloads in "batch" mode.
+            mode (str): "latest" or "batch".
+            max_rate_hz (float, optional): Upper bound on delivery rate.
+
+        Returns:
+            BridgeSubscription: Handle for unsubscribe().
+        """
+        subscription = BridgeSubscription(self, topic, callback, mode, max_rate_hz)
+        subscription.bus_handle = self.bus.subscribe(topic, subscription.enqueue)
+        with self.lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.bus.unsubscribe(subscription.bus_handle)
+        with self.lock:
+            self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+
+    def pump(self):
+        try:
+            now = time.monotonic()
+            for subscription in list(self.subscriptions):
+                try:
+                    subscription.deliver(now)
+                except Exception as e:
+                    print(f"[Bus] ⚠️ Tk subscriber for '{subscription.topic}' failed:", e)
+        finally:
+            self.root.after(self.frame_ms, self.pump)
+
+
+class BridgeSubscription:
+    """One TkBridge subscription; enqueue() runs on the bus thread, deliver() on Tk."""
+
+    def __init__(self, bridge, topic, callback, mode, max_rate_hz):
+        if mode not in ("latest", "batch"):
+            raise ValueError(f"Unknown bridge mode: {mode}")
+        self.bridge = bridge
+        self.topic = topic
+        self.callback = callback
+        self.mode = mode
+        self.min_interval = 1.0 / max_rate_hz if max_rate_hz else 0.0
+        self.lock = threading.Lock()
+        self.pending = None
+        self.pending_since_ns = None
+        self.last_delivery = 0.0
+        self.bus_handle = None
+
+    def enqueue(self, payload):
+        with self.lock:
+            if self.mode == "latest":
+                self.pending = payload
+            elif self.pending is None:
+                self.pending = [payload]
+            else:
+                self.pending.append(payload)
+            if self.pending_since_ns is None:
+                self.pending_since_ns = time.monotonic_ns()
+
+    def deliver(self, now):
+        if self.pending is None or now - self.last_delivery < self.min_interval:
+            return
+        with self.lock:
+            payload, self.pending = self.pending, None
+            since_ns, self.pending_since_ns = self.pending_since_ns, None
+        self.last_delivery = now
+        self.bridge.latency_ms = (time.monotonic_ns() - since_ns) / 1e6
+        self.callback(payload)
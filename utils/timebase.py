@@ -0,0 +1,92 @@
+"""
+Sample timestamps.
+
+Samples are stamped in int64 nanoseconds on ``time.monotonic_ns``, taken on
+the ingest thread as each chunk arrives, or mapped from the sender's own
+timestamp when the frame carries one. Monotonic time never jumps with NTP or
+DST changes, and it is shared by every process on the host, so a GUI
+attached to the acquisition daemon reads the same clock.
+
+Plots, fits and exports work in seconds elapsed since the run origin.
+"""
+import time
+
+import numpy as np
+
+NS_PER_S = 1_000_000_000
+
+now_ns = time.monotonic_ns
+
+
+def elapsed_seconds(times, origin_ns):
+    """Converts int64 nanosecond timestamps to float seconds since origin_ns."""
+    return (np.asarray(times, dtype=np.int64) - origin_ns) / NS_PER_S
+
+
+class SenderClock:
+    """
+    Maps sender-side timestamps (float seconds, any epoch) onto monotonic_ns.
+
+    The offset is anchored on the smallest observed ``arrival - sent``, i.e.
+    the least-delayed frame, so transport jitter does not leak into the
+    spacing of samples. Mapped times are kept non-decreasing, as the ring
+    buffer and sample store require, including across reconnects.
+
+    Unstamped samples are spread over the time since the previous chunk
+    arrived instead, see spread().
+    """
+
+    def __init__(self):
+        self.offset = None
+        self.last = None
+        self.arrival = None  # previous chunk's arrival, for spread()
+
+    def reset(self, connected_ns=None):
+        """
+        New connection: the sender may have restarted its clock. The first
+        unstamped chunk is spread from connected_ns, when given.
+        """
+        self.offset = None
+        self.arrival = connected_ns
+
+    def map(self, sent_s, arrival_ns):
+        """
+        Args:
+            sent_s (np.ndarray): Sender timestamps in seconds.
+            arrival_ns (int): Local monotonic_ns when the chunk arrived.
+
+        Returns:
+            np.ndarray: int64 local timestamps.
+        """
+        sent = np.round(np.asarray(sent_s, dtype=np.float64) * NS_PER_S).astype(np.int64)
+        offset = arrival_ns - int(sent.max())
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        return self.monotonic(sent + self.offset)
+
+    def spread(self, n, arrival_ns):
+        """
+        Timestamps for n unstamped samples that arrived in one chunk: evenly
+        spaced after the previous chunk's arrival, the last at arrival_ns.
+        They are strictly increasing, so no difference between consecutive
+        samples is taken over zero time.
+
+        Returns:
+            np.ndarray: int64 local timestamps.
+        """
+        steps = np.arange(1, n + 1, dtype=np.int64)
+        start = self.arrival if self.arrival is not None else arrival_ns - n
+        self.arrival = arrival_ns
+        times = start + (arrival_ns - start) * steps // n
+        # At least 1 ns apart, and after everything already stamped
+        floor = self.last if self.last is not None else times[0] - 1
+        times = np.maximum.accumulate(np.maximum(times - steps, floor)) + steps
+        self.last = int(times[-1])
+        return times
+
+    def monotonic(self, times):
+        if self.last is not None:
+            times = np.maximum(times, self.last)
+        times = np.maximum.accumulate(times)
+        self.last = int(times[-1])
+        return times
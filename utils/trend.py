@@ -0,0 +1,224 @@
+"""
+Streaming linear trend and leak-rate estimation.
+
+The Chamber Data trendline and the leak rate used to be recomputed from the
+whole window on every refresh (np.polyfit, plus a Python loop over every
+pair of samples). StreamingTrend keeps running means and co-moments instead,
+so each sample costs O(1) and reading the fit costs O(1), whatever the
+window length.
+
+A NaN value marks a gap in the series (a link outage). Fits never bridge
+one: streaming trends restart after it, and the batch functions pool the
+contiguous runs on either side instead of joining them.
+"""
+from collections import deque
+
+import numpy as np
+
+VOLUME_M3 = 5e-6  # 5 mL chamber, in cubic meters
+
+
+class TrendState:
+    """Immutable fit state. Readers grab one and never see a half-applied update."""
+
+    __slots__ = ("n", "t0", "mean_x", "mean_y", "cxx", "cxy", "first", "last")
+
+    def __init__(self, n=0, t0=0.0, mean_x=0.0, mean_y=0.0, cxx=0.0, cxy=0.0, first=None, last=None):
+        self.n = n
+        self.t0 = t0
+        self.mean_x = mean_x
+        self.mean_y = mean_y
+        self.cxx = cxx
+        self.cxy = cxy
+        self.first = first
+        self.last = last
+
+
+class StreamingTrend:
+    """
+    Least-squares line and end-to-end leak rate over a sliding or expanding window.
+
+    Uses Welford-style updates on times taken relative to the first sample,
+    which stay well conditioned for hours-long runs. Sliding windows remove
+    the evicted sample exactly and periodically rebuild their sums from the
+    window to shed rounding drift, which keeps the cost O(1) amortized.
+
+    Args:
+        window (int, optional): Number of most recent samples to fit. None fits
+            everything since the last reset (expanding window).
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self.samples = deque() if window else None
+        self.evictions = 0
+        self.state = TrendState()
+
+    def reset(self):
+        if self.samples is not None:
+            self.samples.clear()
+        self.evictions = 0
+        self.state = TrendState()
+
+    def add(self, t, value):
+        """Adds one sample. Writer thread only."""
+        s = self.state
+        t0 = t if s.n == 0 else s.t0
+        n, mean_x, mean_y, cxx, cxy = _add(s.n, s.mean_x, s.mean_y, s.cxx, s.cxy, t - t0, value)
+        first = s.first if s.n else (t, value)
+
+        if self.samples is not None:
+            self.samples.append((t, value))
+            if len(self.samples) > self.window:
+                old_t, old_value = self.samples.popleft()
+                first = self.samples[0]
+                self.evictions += 1
+                if self.evictions >= self.window:
+                    self.evictions = 0
+                    self.state = self._rebuild()
+                    return
+                n, mean_x, mean_y, cxx, cxy = _remove(n, mean_x, mean_y, cxx, cxy, old_t - t0, old_value)
+
+        self.state = TrendState(n, t0, mean_x, mean_y, cxx, cxy, first, (t, value))
+
+    def extend(self, times, values):
+        """Adds a batch of samples in order. A NaN value restarts the fit."""
+        if isinstance(times, np.ndarray):
+            times = times.tolist()
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+        for t, value in zip(times, values):
+            if value != value:  # NaN gap marker
+                self.reset()
+            else:
+                self.add(t, value)
+
+    def _rebuild(self):
+        times = np.fromiter((t for t, _ in self.samples), dtype=np.float64, count=len(self.samples))
+        values = np.fromiter((v for _, v in self.samples), dtype=np.float64, count=len(self.samples))
+        t0 = float(times[0])
+        x = times - t0
+        mean_x, mean_y = x.mean(), values.mean()
+        cxx = float(((x - mean_x) ** 2).sum())
+        cxy = float(((x - mean_x) * (values - mean_y)).sum())
+        return TrendState(len(x), t0, float(mean_x), float(mean_y), cxx, cxy, self.samples[0], self.samples[-1])
+
+    def __len__(self):
+        return self.state.n
+
+    def fit(self):
+        """
+        Returns the least-squares line as (slope, intercept) in absolute time, or
+        None with fewer than two distinct times.
+        """
+        s = self.state
+        if s.n < 2 or s.cxx <= 0:
+            return None
+        slope = s.cxy / s.cxx
+        intercept = s.mean_y - slope * (s.mean_x + s.t0)
+        return slope, intercept
+
+    def slope(self):
+        fit = self.fit()
+        return fit[0] if fit else 0.0
+
+    def leak_rate(self, volume_m3=VOLUME_M3):
+        """
+        End-to-end pressure slope over the window times the chamber volume.
+
+        This is what averaging dp/dt over every consecutive pair reduces to for
+        evenly spaced samples, without the per-pair loop.
+        """
+        s = self.state
+        if s.n < 2:
+            return 0.0
+        (t_first, p_first), (t_last, p_last) = s.first, s.last
+        if t_last == t_first:
+            return 0.0
+        return (p_last - p_first) / (t_last - t_first) * volume_m3
+
+
+def fit_line(times, values):
+    """
+    One-shot least-squares line for arrays that are not being streamed.
+
+    Across gaps (NaN values) this is the pooled within-run slope: each
+    contiguous run is centred on its own means, so no run is joined to the
+    next. The intercept places the line through the last run.
+
+    Returns:
+        tuple | None: (slope, intercept), or None with fewer than two distinct times.
+    """
+    x = np.asarray(times, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    runs, x, y = split_runs(x, y)
+    if len(x) < 2:
+        return None
+    counts = np.bincount(runs)
+    mean_x = np.bincount(runs, x)[runs] / counts[runs]
+    mean_y = np.bincount(runs, y)[runs] / counts[runs]
+    dx = x - mean_x
+    cxx = float(np.dot(dx, dx))
+    if cxx <= 0:
+        return None
+    slope = float(np.dot(dx, y - mean_y)) / cxx
+    return slope, float(mean_y[-1] - slope * mean_x[-1])
+
+
+def leak_rate(times, values, volume_m3=VOLUME_M3):
+    """
+    Batch counterpart of StreamingTrend.leak_rate: end-to-end slope times volume.
+
+    Across gaps, the pressure change and elapsed time are summed over the
+    contiguous runs only, so outages count as neither.
+    """
+    x = np.asarray(times, dtype=np.float64)
+    y = np.asarray(values, dtype=np.float64)
+    runs, x, y = split_runs(x, y)
+    if len(x) < 2:
+        return 0.0
+    last = np.flatnonzero(np.diff(runs)).tolist() + [len(runs) - 1]
+    first = [0] + [i + 1 for i in last[:-1]]
+    dt = float((x[last] - x[first]).sum())
+    if dt == 0:
+        return 0.0
+    return float((y[last] - y[first]).sum()) / dt * volume_m3
+
+
+def split_runs(times, values):
+    """
+    Drops NaN gap markers from a series.
+
+    Returns:
+        tuple: (run, times, values), where run[i] numbers the contiguous run
+        sample i belongs to, counting from 0.
+    """
+    gaps = np.isnan(values)
+    if not gaps.any():
+        return np.zeros(len(values), dtype=np.intp), times, values
+    keep = ~gaps
+    runs = np.cumsum(gaps)[keep]
+    # Renumber so runs are consecutive even where gaps were adjacent
+    runs = np.concatenate(([0], np.cumsum(np.diff(runs) != 0))) if len(runs) else runs
+    return runs, times[keep], values[keep]
+
+
+def _add(n, mean_x, mean_y, cxx, cxy, x, y):
+    n += 1
+    dx = x - mean_x
+    mean_x += dx / n
+    mean_y += (y - mean_y) / n
+    cxx += dx * (x - mean_x)
+    cxy += dx * (y - mean_y)
+    return n, mean_x, mean_y, cxx, cxy
+
+
+def _remove(n, mean_x, mean_y, cxx, cxy, x, y):
+    if n <= 1:
+        return 0, 0.0, 0.0, 0.0, 0.0
+    n -= 1
+    new_mean_x = mean_x - (x - mean_x) / n
+    new_mean_y = mean_y - (y - mean_y) / n
+    cxx -= (x - new_mean_x) * (x - mean_x)
+    cxy -= (x - new_mean_x) * (y - mean_y)
+    return n, new_mean_x, new_mean_y, cxx, cxy